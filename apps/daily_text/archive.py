@@ -0,0 +1,128 @@
+#archive.py
+from pathlib import Path
+import datetime
+import json
+import os
+import shutil
+import threading
+import zipfile
+
+import store
+from store import atomic_write_json
+
+PROGRESS_NAME = "backfill.json"
+
+# -------------------- Archive historique --------------------
+
+class HistoryArchive:
+    """
+    Textes des années passées, séparés de la fenêtre glissante du stockage mensuel.
+    Un zip par langue et par année (data/archive/<lang>/<AAAA>.zip), un membre
+    compressé par jour : la lecture d'une date ne décompresse que ce jour, grâce
+    au répertoire central du zip qui sert d'index.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.progress_path = self.root / PROGRESS_NAME
+        self._lock = threading.Lock()
+        self._index = {}  # (langue, année) -> dates présentes
+
+    def _path(self, lang_code, year):
+        return self.root / lang_code / f"{year:04d}.zip"
+
+    def _dates(self, lang_code, year):
+        key = (lang_code, year)
+        if key not in self._index:
+            try:
+                with zipfile.ZipFile(self._path(lang_code, year)) as zf:
+                    self._index[key] = {name[:-len(".json")] for name in zf.namelist()}
+            except FileNotFoundError:
+                self._index[key] = set()
+        return self._index[key]
+
+    # ---- Lecture ----
+
+    def has(self, lang_code, date):
+        return date.isoformat() in self._dates(lang_code, date.year)
+
+    def get(self, lang_code, date):
+        """Retourne (entrée, erreur). (None, None) si la date n'est pas archivée."""
+        if not self.has(lang_code, date):
+            return None, None
+        try:
+            with zipfile.ZipFile(self._path(lang_code, date.year)) as zf:
+                return json.loads(zf.read(f"{date.isoformat()}.json")), None
+        except Exception as e:
+            return None, str(e)
+
+    def years(self, lang_code):
+        return sorted(int(p.stem) for p in (self.root / lang_code).glob("*.zip"))
+
+    def entries(self, lang_code):
+        """Parcourt (date iso, entrée) de toute l'archive d'une langue (construction initiale d'index)."""
+        for year in self.years(lang_code):
+            with zipfile.ZipFile(self._path(lang_code, year)) as zf:
+                for name in sorted(zf.namelist()):
+                    yield name[:-len(".json")], json.loads(zf.read(name))
+
+    # ---- Écriture ----
+
+    def put_month(self, lang_code, year, month, entries):
+        """
+        Ajoute les entrées {date iso: entrée} d'un mois. L'archive de l'année est
+        complétée sur une copie puis remplacée d'un coup : une interruption laisse
+        l'ancienne archive intacte. Retourne le nombre de jours ajoutés.
+        """
+        path = self._path(lang_code, year)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            known = self._dates(lang_code, year)
+            new = {day: entry for day, entry in entries.items() if day not in known}
+            if not new:
+                return 0
+            tmp = path.with_name(f".{path.name}.tmp")
+            if path.exists():
+                shutil.copyfile(path, tmp)
+            with zipfile.ZipFile(tmp, "a", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+                for day, entry in sorted(new.items()):
+                    zf.writestr(f"{day}.json", json.dumps(entry, ensure_ascii=False, separators=(",", ":")))
+            with open(tmp, "rb") as f:
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+            known.update(new)
+        return len(new)
+
+    # ---- Reprise du backfill ----
+
+    def load_progress(self):
+        try:
+            with open(self.progress_path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def save_progress(self, progress):
+        self.root.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(self.progress_path, progress)
+
+
+def backfill_months(start_year, end_year, today=None):
+    """Mois (année, mois) de start_year à end_year inclus, sans dépasser le mois courant."""
+    today = today or datetime.date.today()
+    return [(year, month)
+            for year in range(start_year, end_year + 1)
+            for month in range(1, 13)
+            if (year, month) <= (today.year, today.month)]
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+def get_archive():
+    """Archive partagée par toutes les apps."""
+    global _archive
+    with _archive_lock:
+        if _archive is None or _archive.root != store.DATA_DIR / "archive":
+            _archive = HistoryArchive(store.DATA_DIR / "archive")
+        return _archive
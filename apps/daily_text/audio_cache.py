@@ -0,0 +1,153 @@
+#audio_cache.py
+from pathlib import Path
+import hashlib
+import io
+import json
+import os
+import socket
+import threading
+import wave
+
+DEFAULT_PORT = 10200   # port du serveur Wyoming de l'add-on Piper
+DEFAULT_DAYS = 2       # aujourd'hui et demain
+WYOMING_VERSION = "1.5.4"
+
+# -------------------- Cache audio --------------------
+
+class AudioCache:
+    """
+    Fichiers audio déjà synthétisés (<root>/<lang>/<clé>.<ext>), servis par Home Assistant.
+    La clé est une empreinte du texte lu et de la voix : un texte modifié ou une autre voix
+    donnent un nouveau fichier, jamais un audio périmé.
+    """
+
+    def __init__(self, root, base_url):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text, voice=None):
+        content = f"{voice or ''}\x1f{text}"
+        return hashlib.blake2b(content.encode("utf-8"), digest_size=8).hexdigest()
+
+    def _path(self, lang_code, key, extension):
+        return self.root / lang_code / f"{key}.{extension}"
+
+    def url(self, lang_code, key, extension):
+        """URL de lecture si l'audio est en cache, sinon None."""
+        if not self._path(lang_code, key, extension).exists():
+            return None
+        return f"{self.base_url}/{lang_code}/{key}.{extension}"
+
+    def put(self, lang_code, key, extension, audio):
+        path = self._path(lang_code, key, extension)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.tmp")
+        with self._lock:
+            with open(tmp, "wb") as f:
+                f.write(audio)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        return self.url(lang_code, key, extension)
+
+    def evict(self, lang_code, keep):
+        """Supprime les fichiers d'une langue dont la clé n'est pas dans keep. Retourne le nombre supprimé."""
+        removed = 0
+        with self._lock:
+            for path in (self.root / lang_code).glob("*.*"):
+                if path.name.startswith(".") or path.stem in keep:
+                    continue
+                try:
+                    path.unlink()
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+# -------------------- Synthèse (Wyoming) --------------------
+
+class WyomingSynthesizer:
+    """
+    Client minimal du protocole Wyoming (Piper et les autres moteurs TTS locaux de HA) :
+    un événement synthesize, puis audio-start / audio-chunk... / audio-stop, assemblés en WAV.
+    Tout objet avec un attribut extension et les méthodes voice(lang_code) et
+    synthesize(text, lang_code) -> bytes peut le remplacer (synthétiseur de test, autre moteur).
+    """
+
+    extension = "wav"
+
+    def __init__(self, host, port=DEFAULT_PORT, voices=None, timeout=120):
+        self.host = host
+        self.port = port
+        self.voices = dict(voices or {})
+        self.timeout = timeout
+
+    def voice(self, lang_code):
+        return self.voices.get(lang_code)
+
+    def synthesize(self, text, lang_code):
+        data = {"text": text}
+        if self.voice(lang_code):
+            data["voice"] = {"name": self.voice(lang_code)}
+
+        audio, rate, width, channels = bytearray(), 22050, 2, 1
+        with socket.create_connection((self.host, self.port), timeout=self.timeout) as sock:
+            write_event(sock, "synthesize", data)
+            reader = sock.makefile("rb")
+            while True:
+                event_type, event_data, payload = read_event(reader)
+                if event_type in ("audio-start", "audio-chunk"):
+                    rate = event_data.get("rate", rate)
+                    width = event_data.get("width", width)
+                    channels = event_data.get("channels", channels)
+                    audio += payload
+                elif event_type == "audio-stop":
+                    break
+                elif event_type == "error":
+                    raise RuntimeError(event_data.get("text", "Wyoming error"))
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setframerate(rate)
+            wav.setsampwidth(width)
+            wav.setnchannels(channels)
+            wav.writeframes(bytes(audio))
+        return buffer.getvalue()
+
+
+def write_event(sock, event_type, data):
+    """En-tête JSON sur une ligne, suivi des données JSON (data_length octets)."""
+    body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    header = {"type": event_type, "version": WYOMING_VERSION, "data_length": len(body)}
+    sock.sendall(json.dumps(header).encode("utf-8") + b"\n" + body)
+
+def read_event(reader):
+    """Retourne (type, données, charge binaire) du prochain événement Wyoming."""
+    line = reader.readline()
+    if not line:
+        raise ConnectionError("Wyoming server closed the connection")
+    header = json.loads(line)
+    data = dict(header.get("data") or {})
+    if header.get("data_length"):
+        data.update(json.loads(reader.read(header["data_length"])))
+    payload = reader.read(header["payload_length"]) if header.get("payload_length") else b""
+    return header["type"], data, payload
+
+
+def make_audio_cache(options):
+    """
+    (cache, synthétiseur, jours) depuis l'argument audio_cache de l'app TTS dans apps.yaml,
+    ou (None, None, 0) si l'option est absente.
+    """
+    if not options:
+        return None, None, 0
+    www = Path("/homeassistant/www") if Path("/homeassistant").is_dir() else Path("/config/www")
+    cache = AudioCache(options.get("dir", www / "daily_text"), options.get("url", "/local/daily_text"))
+    synthesizer = WyomingSynthesizer(
+        options.get("host", "core-piper"),
+        int(options.get("port", DEFAULT_PORT)),
+        options.get("voices"),
+    )
+    return cache, synthesizer, int(options.get("days", DEFAULT_DAYS))
@@ -1,9 +1,18 @@
 #base.py
 import appdaemon.plugins.hass.hassapi as hass
-from datetime import time
-from pathlib import Path
-import json
+from datetime import time, timedelta
 import re
+import threading
+from time import perf_counter
+from lang_pack import load_language_pack, language_file, match_book
+from store import get_store
+from archive import get_archive
+from metrics import METRICS, publish_diagnostics
+
+CONFIG_ENTITY = "sensor.daily_text_configuration"
+CONFIG_DEBOUNCE = 2  # secondes : une rafale de modifications des options ne donne qu'un rechargement
+ROLLOVER_TIME = time(0, 0, 0)  # bascule des capteurs sur le texte du jour
+PRELOAD_TIME = time(22, 0, 0)  # à partir de cette heure, le texte du lendemain est lu et rendu à l'avance
 
 # -------------------- Classe de base --------------------
 
@@ -11,21 +20,108 @@ class BaseDailyText(hass.Hass):
 
     def initialize(self):
         self.lang_code = "en"  # valeur par défaut
+        self.languages = [self.lang_code]
+        self.lang_configs = {}
+        self.lang_config = {}  # pack vide tant que la configuration n'est pas chargée
         self.months = 1        # valeur par défaut
+        self.strip_parentheses = False
+        self.config = None
+        self.config_timer = None
+        self.publisher = PublishQueue(self.publish_one, lambda: publish_diagnostics(self))
+        self.preloaded = {}    # langue -> (jour, entrée, config, états des capteurs)
         self.load_config_from_entity()
-        self.listen_state(self.on_config_changed, "sensor.daily_text_configuration")
+        self.listen_state(self.on_config_changed, CONFIG_ENTITY)
 
 
     def on_config_changed(self, entity, attribute, old, new, **kwargs):
-        self.log("Configuration change detected, reloading...")
-        self.load_config_from_entity()
+        schedule_config_reload(self)
 
-        # Si la classe enfant a une méthode fetch_texts, on l'appelle
-        if hasattr(self, "fetch_texts") and callable(self.fetch_texts):
-            self.fetch_texts()
+    def apply_config_change(self, kwargs):
+        self.config_timer = None
+        previous = self.config
+        self.load_config_from_entity()
+        changed = config_delta(previous, self.config)
+        if not changed:
+            self.log("Configuration unchanged, nothing to do.")
+            return
+        self.log(f"Configuration change detected: {', '.join(sorted(changed))}")
+        self.config_changed(changed)
+        if self.preloaded:
+            self.preload_tomorrow({})  # demain préparé avec les nouvelles options
+
+    def config_changed(self, changed):
+        """À redéfinir par les apps : ne refaire que ce que les options modifiées imposent."""
+
+    def sensor_states(self, lang_code, day, entry, error):
+        """À redéfinir par les apps : [(entité, état, attributs)] des capteurs d'une langue pour ce jour."""
+        return []
+
+    def publish_one(self, lang_code):
+        """Publie les capteurs d'une langue : états préparés la veille s'ils sont encore à jour, sinon calculés."""
+        day = self.today()
+        entry, error = self.get_entry(day, lang_code)
+        states = self.take_preloaded(lang_code, day, entry)
+        if states is None:
+            if error:
+                self.error(error)
+            states = self.sensor_states(lang_code, day, entry, error)
+        for entity, state, attributes in states:
+            self.set_state(entity, state=state, attributes=attributes)
+        self.log(f"Daily text for {self.label} exposed ({lang_code}).")
+
+    def request_publish(self, languages=None):
+        """Publie les langues demandées (toutes par défaut), regroupées avec les demandes concurrentes."""
+        self.publisher.request(self.languages if languages is None else languages)
+
+    # ---- Bascule de minuit ----
+
+    def today(self):
+        return local_today(self)
+
+    def schedule_rollover(self, publish):
+        """
+        publish à minuit, avec les états du lendemain préparés dès PRELOAD_TIME :
+        la bascule n'est plus qu'une écriture par capteur, sans lecture ni rendu.
+        """
+        self.run_daily(publish, ROLLOVER_TIME)
+        self.run_daily(self.preload_tomorrow, PRELOAD_TIME)
+        if self.datetime().time() >= PRELOAD_TIME:
+            self.preload_tomorrow({})  # démarrage en soirée
+
+    def preload_tomorrow(self, kwargs):
+        tomorrow = self.today() + timedelta(days=1)
+        with METRICS.timer("preload_ms"):
+            self.preloaded = {code: self.prepare_states(code, tomorrow) for code in self.languages}
+        self.log(f"Text for {tomorrow} preloaded ({', '.join(self.languages)}).")
+
+    def prepare_states(self, lang_code, day):
+        entry, error = self.get_entry(day, lang_code)
+        return day, entry, self.config, self.sensor_states(lang_code, day, entry, error)
+
+    def take_preloaded(self, lang_code, day, entry):
+        """États préparés pour ce jour, si l'entrée stockée et les options n'ont pas changé depuis."""
+        preloaded = self.preloaded.get(lang_code)
+        if preloaded is None or preloaded[0] != day:
+            return None
+        self.preloaded.pop(lang_code, None)
+        _, prepared_entry, config, states = preloaded
+        # Les entrées inchangées gardent le même objet dans les vues du stockage
+        if prepared_entry is not entry or config != self.config:
+            METRICS.incr("preload_stale")
+            return None
+        METRICS.incr("preload_used")
+        return states
+
+    def update_preload(self, data):
+        """Sur DAILY_TEXT_FILES_UPDATED : prépare de nouveau le lendemain si son texte vient de changer."""
+        data = data or {}
+        dates = data.get("dates")
+        for lang_code, (day, *_) in list(self.preloaded.items()):
+            if data.get("lang", lang_code) == lang_code and (dates is None or day.isoformat() in dates):
+                self.preloaded[lang_code] = self.prepare_states(lang_code, day)
 
     def load_config_from_entity(self):
-        entity_id = "sensor.daily_text_configuration"
+        entity_id = CONFIG_ENTITY
         state = self.get_state(entity_id, attribute="all")
 
         if not state or "attributes" not in state:
@@ -35,170 +131,477 @@ class BaseDailyText(hass.Hass):
         # Mémorise et partage les paramètre
         attributes = state["attributes"]
         self.lang_code = attributes.get("language", "en")
+        self.languages = config_languages(attributes)
         self.months = int(attributes.get("months", 1))
         self.strip_parentheses = attributes.get("strip_parentheses", False)
 
-        lang_file = Path(__file__).resolve().parent / "lang" / f"{self.lang_code}.json"
-        if not lang_file.exists():
-            self.error(f"Language file not found: {lang_file}")
-            self.lang_config = {}
-        else:
-            with open(lang_file, encoding="utf-8") as f:
-                self.lang_config = json.load(f)
+        # Packs de langue partagés entre les apps, relus seulement si le fichier change
+        self.lang_configs = {}
+        for code in self.languages:
+            pack = load_language_pack(code)
+            if pack is None:
+                self.error(f"Language file not found: {language_file(code)}")
+                pack = {}
+            self.lang_configs[code] = pack
+        self.lang_config = self.lang_configs[self.lang_code]
+        self.config = config_snapshot(attributes)
+
+        self.log(f"Configuration loaded: lang = {self.lang_code}, languages = {','.join(self.languages)}, months = {self.months}")
+
+    def sensor_ids(self, base, lang_code):
+        """Capteur par langue (<base>_<lang>), plus <base> sans suffixe pour la langue principale."""
+        ids = [f"{base}_{lang_code}"]
+        if lang_code == self.lang_code:
+            ids.append(base)
+        return ids
+
+    def event_languages(self, data):
+        """
+        Langues à republier pour un DAILY_TEXT_FILES_UPDATED : celle de l'événement
+        (toutes s'il n'en précise pas), et aucune si le texte du jour n'est pas parmi les dates modifiées.
+        """
+        data = data or {}
+        dates = data.get("dates")
+        if dates is not None and self.today().isoformat() not in dates:
+            return []
+        lang = data.get("lang")
+        return [lang] if lang in self.languages else list(self.languages)
+
+    def get_entry(self, day, lang_code):
+        """Retourne (entrée, erreur) depuis le stockage mensuel."""
+        with METRICS.timer("entry_read_ms"):
+            return get_store(lang_code).get(day)
+
+    def get_entry_for_today(self, force_date=None, lang_code=None):
+        """Retourne (entrée, date, erreur) depuis l'index du stockage mensuel (ou l'archive pour une date forcée)."""
+        today = force_date or self.today()
+        lang_code = lang_code or self.lang_code
+        data, error = self.get_entry(today, lang_code)
+        # Date passée (force_date) : on cherche dans l'archive historique
+        if data is None and error is None and force_date is not None:
+            data, error = get_archive().get(lang_code, today)
+        return data, today, error
+
+    def refresh_entries(self, data):
+        """Sur DAILY_TEXT_FILES_UPDATED : vide le cache mémoire seulement si les fichiers ont changé ailleurs."""
+        lang = (data or {}).get("lang", self.lang_code)
+        if lang not in self.languages:
+            # Le nom de langue sert de dossier : rien n'est ouvert hors des langues configurées
+            self.log(f"Files update for unconfigured language {lang!r} ignored.", level="WARNING")
+            return
+        if get_store(lang).refresh((data or {}).get("generation")):
+            self.log(f"Entry cache for {lang} invalidated")
+
+    def get_rendered_entry(self, data, lang_code=None):
+        """Rendu de l'entrée (précalculé si le pack de langue n'a pas changé), avec mesures."""
+        lang_config = self.lang_configs.get(lang_code or self.lang_code, self.lang_config)
+        METRICS.incr("render_cache_hits" if is_render_current(data, lang_config) else "render_cache_misses")
+        with METRICS.timer("render_ms"):
+            return get_rendered(data, lang_config)
+
+    def error_state(self, entity, message, date):
+        self.log(f"{message} ({date})")
+        return entity, message, {
+            "friendly_name": entity.replace("_", " ").title(),
+            "date": date.isoformat()
+        }
 
-        self.fire_event("DAILY_TEXT_CONFIG_CHANGED")
-        self.log(f"Configuration loaded: lang = {self.lang_code}, months = {self.months}")
 
-    def get_file_for_today(self, force_filename=None):
-        today = self.datetime().date()
-        filename = force_filename or f"{today:%Y-%m-%d}.json"
-        data_dir = Path(__file__).resolve().parent / "data" / self.lang_code
-        filepath = data_dir / filename
-        return filepath, today
+# -------------------- Publication --------------------
 
-    def read_json_file(self, filepath):
-        try:
-            with open(filepath, encoding="utf-8") as f:
-                return json.load(f), None
-        except Exception as e:
-            return None, str(e)
+class PublishQueue:
+    """
+    Publications demandées par plusieurs workers AppDaemon à la fois (timer de minuit,
+    rafale de DAILY_TEXT_FILES_UPDATED, changement de config) : un seul worker publie,
+    les autres ajoutent leurs langues à la file et rendent la main tout de suite.
+    Le worker qui publie repasse tant que des langues attendent : la dernière demande
+    est toujours servie, avec l'état du stockage au moment où elle est traitée.
+    """
 
-    def set_error_state(self, entity, message, date):
-        self.set_state(entity, state=message, attributes={
-            "friendly_name": entity.replace("_", " ").title(),
-            "date": date.isoformat()
-        })
-        self.log(message)
+    def __init__(self, publish_one, done=None):
+        self._publish_one = publish_one
+        self._done = done
+        self._pending = {}      # langue -> instant de la première demande pas encore servie
+        self._running = False
+        self._lock = threading.Lock()
+
+    def request(self, languages):
+        """Retourne True si cet appel a publié, False si la demande a été confiée au worker en cours."""
+        now = perf_counter()
+        with self._lock:
+            for lang_code in languages:
+                self._pending.setdefault(lang_code, now)
+            if self._running:
+                METRICS.incr("publish_coalesced")
+                return False
+            self._running = True
+        try:
+            while True:
+                with self._lock:
+                    if not self._pending:
+                        self._running = False
+                        return True
+                    batch, self._pending = self._pending, {}
+                for lang_code, requested in batch.items():
+                    self._publish_one(lang_code)
+                    # Délai entre la demande et la publication, attente derrière un autre worker comprise
+                    METRICS.observe("publish_latency_ms", (perf_counter() - requested) * 1000)
+                if self._done:
+                    self._done()
+        except BaseException:
+            with self._lock:
+                self._running = False
+            raise
 
 
 # -------------------- Fonctions utilitaires --------------------
 
+def local_today(app):
+    """
+    Date du jour selon l'horloge d'AppDaemon (fuseau time_zone, celui de Home Assistant).
+    Le fetcher et les apps d'exposition passent tous par là : ils changent de jour ensemble.
+    """
+    return app.datetime().date()
+
+def config_languages(attributes):
+    """Langue principale puis langues supplémentaires du capteur de configuration, sans doublon."""
+    primary = attributes.get("language", "en")
+    return list(dict.fromkeys([primary, *(attributes.get("languages") or [])]))
+
+def config_snapshot(attributes):
+    """Options utiles aux apps, comparables d'un rechargement à l'autre."""
+    return {
+        "languages": tuple(config_languages(attributes)),
+        "months": int(attributes.get("months", 1)),
+        "strip_parentheses": attributes.get("strip_parentheses", False),
+    }
+
+def config_delta(previous, current):
+    """Noms des options qui ont changé (toutes au premier chargement)."""
+    if current is None:
+        return set()
+    if previous is None:
+        return set(current)
+    return {key for key, value in current.items() if previous.get(key) != value}
+
+def schedule_config_reload(app):
+    """Regroupe les modifications rapprochées : app.apply_config_change n'est appelé qu'après la dernière."""
+    if app.config_timer is not None:
+        app.cancel_timer(app.config_timer)
+    app.config_timer = app.run_in(app.apply_config_change, CONFIG_DEBOUNCE)
+
 def clean_body(self, text: str) -> str:
     """
     Nettoie le corps du texte pour une lecture vocale plus fluide.
     Il supprime les références entre le dernier et l'avant-dernier point final.
     Le seuil de séparation dépend de la langue (paramètre tts_split_threshold).
     """
-    threshold = self.lang_config.get("tts_split_threshold", 3)  # valeur par défaut à 3
+    return clean_body_text(text, self.lang_config)
+
+def body_cut(text: str, lang_config) -> int:
+    """Position de coupe de clean_body : juste après le n-ième point en partant de la fin."""
+    threshold = lang_config.get("tts_split_threshold", 3)  # valeur par défaut à 3
     point_positions = [m.start() for m in re.finditer(r'\.', text)] # Trouver tous les points finaux dans la chaîne
     if len(point_positions) < threshold:
-        return text.strip()  # Pas assez de points, on ne modifie rien
-    cut_position = point_positions[-threshold] + 1 # On garde tout jusqu'au 3ᵉ point en partant de la fin
-    return text[:cut_position].strip()
+        return len(text)  # Pas assez de points, on ne modifie rien
+    return point_positions[-threshold] + 1 # On garde tout jusqu'au 3ᵉ point en partant de la fin
+
+def clean_body_text(text: str, lang_config) -> str:
+    """Version de clean_body utilisable hors d'une app (rendu au moment du téléchargement)."""
+    return text[:body_cut(text, lang_config)].strip()
 
-def clean_part(text):# Nettoyage des espaces insécables 
+def clean_part(text):# Nettoyage des espaces insécables
     text = text.replace('\u00A0', ' ')
-    return ''.join(c for c in text if c.isprintable()).strip()
+    if not text.isprintable():
+        text = ''.join(c for c in text if c.isprintable())
+    return text.strip()
 
-def try_add(a, b):
+def is_next_verse(a, b):
     try:
-        if int(a)+1 == int(b):
-            return f"{a}-{b}"
+        return int(a) + 1 == int(b)
     except ValueError:
-        return None  # Conversion impossible
-    return None
+        return False  # Conversion impossible
+
+# -------------------- Références bibliques --------------------
+
+_GROUP = re.compile(r'\(([^()]+)\)')
+
+class Reference:
+    """
+    Une référence d'un groupe entre parenthèses, telle qu'écrite : livre (abréviation
+    du pack, None si non reconnu), chapitre (None si seuls des versets sont cités) et
+    versets [(début, fin ou None)]. carried : livre repris de la référence précédente ("Ps. 23:1; 24:2").
+    """
+
+    __slots__ = ("text", "book", "chapter", "verses", "carried")
+
+    def __init__(self, text, book=None, chapter=None, verses=(), carried=False):
+        self.text = text
+        self.book = book
+        self.chapter = chapter
+        self.verses = verses
+        self.carried = carried
+
+    def as_dict(self, lang_config):
+        """Forme publiée dans l'attribut references (nombres convertis quand c'est possible)."""
+        def number(value):
+            return int(value) if value and value.isdigit() else value
+        return {
+            "text": self.text,
+            "book": lang_config["book_names"][self.book],
+            "chapter": number(self.chapter.strip()) if self.chapter is not None else None,
+            "verses": [[number(start), number(end if end is not None else start)] for start, end in self.verses],
+        }
+
+class RefGroup:
+    """Groupe "(...)" du texte : ses références, et s'il s'agit d'un lien "(*...*)"."""
+
+    __slots__ = ("raw", "refs", "link", "_speech")
+
+    def __init__(self, raw, refs, link):
+        self.raw = raw
+        self.refs = refs
+        self.link = link
+        self._speech = None
+
+    def speech(self, lang_config):
+        """Lecture du groupe (calculée une fois) : en ligne pour un lien, sinon ". ( ... )"."""
+        if self._speech is None:
+            spoken = "; ".join(spoken_reference(ref, lang_config) for ref in self.refs)
+            self._speech = f" {spoken}" if self.link else f". ( {spoken} )"
+        return self._speech
+
+def parse_reference(part, lang_config, last_book):
+    """Une référence d'un groupe (déjà nettoyée); last_book sert si aucun livre n'est cité."""
+    book = match_book(part, lang_config)  # plus long préfixe, via le trie du pack
+    carried = book is None
+    if carried:
+        if not last_book:
+            return Reference(part)  # Livre inconnu ou impossible à reconstruire
+        book = last_book
+        rest = part
+    else:
+        rest = part[len(book):].strip()
+
+    chapter = None  # cas rare : versets seul
+    if ':' in rest:
+        chapter, rest = rest.split(":", 1)
 
-def merge_pairs(lst):
+    # Versets : "1, 2, 5-7" -> [("1", "2"), ("5", "7")]; deux versets consécutifs forment une plage
+    items = [v.strip() for v in rest.strip().split(",")]
+    verses = []
     i = 0
-    while i < len(lst) - 1:
-        #print(f"i: {i}  len(lst) - 1: {len(lst) - 1}")
-        res = try_add(lst[i], lst[i+1])
-        #print(f"try_add(lst[i], lst[i+1]) : {lst[i]} , {lst[i+1]} = res : {res}")
-        if res is not None:
-            lst[i] = res      # remplace la case i par la somme
-            del lst[i+1]      # supprime la case i+1
-            # ne pas incrémenter i car après suppression la prochaine paire commence à i+1
+    while i < len(items):
+        if i + 1 < len(items) and is_next_verse(items[i], items[i + 1]):
+            verses.append((items[i], items[i + 1]))
+            i += 2
+            continue
+        if "-" in items[i]:
+            start, end = [v.strip() for v in items[i].split("-", 1)]
+            verses.append((start, end))
         else:
-            i += 1            # on passe à la suivante
-    return lst
-
-# Fonction de conversion d'une référence
-def convert_ref(ref, lang_config):
-    ref = ref.strip()
-    for book in sorted(lang_config["book_names"], key=len, reverse=True):
-        if ref.startswith(book):
-            long_book = lang_config["book_names"][book]
-            rest = ref[len(book):].strip()
-
-            if ':' not in rest:
-                chapter = ""  # cas rare : versets seul
-                verses = rest
-            else:
-                chapter, verses = rest.split(":", 1)
-                chapter = f"{long_book} {chapter}, "
-            verses = verses.strip()
-
-            parts = [v.strip() for v in verses.split(",")]
-            parts = merge_pairs(parts)
-            joined = []
-            for part in parts:
-                if "-" in part:
-                    start, end = [v.strip() for v in part.split("-", 1)]
-                    joined.append(f"{start} {lang_config['to']} {end}")
-                else:
-                    joined.append(part)
-
-            if len(joined) > 1:
-                joined_text = f"{lang_config['verse_plural']} {', '.join(joined[:-1])} {lang_config['and']} {joined[-1]}"
-            else:
-                joined_text = f"{lang_config['verse_singular']} {joined[0]}"
-
-            return f"{chapter}{joined_text}"
-    return ref  # pas reconnu
-
-# Fonction de conversion de plusieurs références
-def convert_multiple_refs(ref_string, lang_config):
-    ref_string = ref_string.strip()
-    starred = "*" in ref_string  # repère si c’est un lien transformé
-    parts = [part.strip("* ") for part in ref_string.split(";")]
-
-    result = []
-    last_book = None
-    #print(f"len(parts): {len(parts)}")
-    #print(f"parts: {parts}")
-    for part in parts:
-        part = clean_part(part)
-        #print(f"part: {part}")
-
-        matched = False
-        for book in sorted(lang_config["book_names"], key=len, reverse=True):
-            if part.startswith(book):
-                #print(f"book: {book}")
-                last_book = book
-                result.append(convert_ref(part, lang_config))
-                matched = True
-                break
-
-        #print(f"not matched: {not matched} and last_book: {last_book}")
-        if not matched and last_book: 
-            # Même livre, mais nouveau chapitre
-            reconstructed = f"{last_book} {part}"
-            converted = convert_ref(reconstructed, lang_config)
-            
-            # Ajouter "puis chapitre" pour TTS fluide
-            converted = converted.replace(lang_config["book_names"][last_book], lang_config["then_chapter"], 1) # Remplacer une seule fois
-            result.append(converted)
-        elif not matched:
-            result.append(part) # Livre inconnu ou impossible à reconstruire
-
-    if starred:
-        return f" {'; '.join(result)}"
-    else:
-        return f". ( {'; '.join(result)} )"
+            verses.append((items[i], None))
+        i += 1
+    return Reference(part, book, chapter, verses, carried)
 
-def replace_bible_references(text, lang_config, preserve_non_starred=True):
-    def repl(match):
+def parse_references(text, lang_config):
+    """
+    Découpe le texte en une suite de morceaux de texte (str) et de groupes de références
+    (RefGroup), en un seul passage : chaque groupe "(...)" est analysé une fois, puis
+    le rendu TTS, l'affichage Lovelace et l'attribut references en sont tirés.
+    """
+    nodes = []
+    position = 0
+    for match in _GROUP.finditer(text):
+        if match.start() > position:
+            nodes.append(text[position:match.start()])
         content = match.group(1)
-        if "*" in content:
-            # Référence cliquable → on garde toujours
-            return convert_multiple_refs(content, lang_config)
-        elif preserve_non_starred:
-            # Comportement habituel (on garde les parenthèses avec la conversion)
-            return convert_multiple_refs(content, lang_config)
+        refs, last_book = [], None
+        for part in content.strip().split(";"):
+            ref = parse_reference(clean_part(part.strip("* ")), lang_config, last_book)
+            if ref.book and not ref.carried:
+                last_book = ref.book
+            refs.append(ref)
+        nodes.append(RefGroup(match.group(0), refs, "*" in content))
+        position = match.end()
+    if position < len(text):
+        nodes.append(text[position:])
+    return nodes
+
+def truncate_references(nodes, cut):
+    """Morceaux correspondant à text[:cut].strip() (un groupe coupé redevient du texte)."""
+    kept, position = [], 0
+    for node in nodes:
+        if position >= cut:
+            break
+        raw = node.raw if isinstance(node, RefGroup) else node
+        if position + len(raw) <= cut:
+            kept.append(node)
         else:
-            # On supprime complètement la référence
-            return ""
-        
-    return re.sub(r'\(([^()]+)\)', repl, text)
+            kept.append(raw[:cut - position])
+        position += len(raw)
+    if kept and isinstance(kept[0], str):
+        kept[0] = kept[0].lstrip()
+    if kept and isinstance(kept[-1], str):
+        kept[-1] = kept[-1].rstrip()
+    return kept
+
+def spoken_reference(ref, lang_config):
+    if ref.book is None:
+        return ref.text
+    long_book = lang_config["book_names"][ref.book]
+    chapter = f"{long_book} {ref.chapter}, " if ref.chapter is not None else ""
+
+    joined = [f"{start} {lang_config['to']} {end}" if end is not None else start for start, end in ref.verses]
+    if len(joined) > 1:
+        joined_text = f"{lang_config['verse_plural']} {', '.join(joined[:-1])} {lang_config['and']} {joined[-1]}"
+    else:
+        joined_text = f"{lang_config['verse_singular']} {joined[0]}"
+
+    spoken = f"{chapter}{joined_text}"
+    if ref.carried:
+        # Même livre, mais nouveau chapitre : "puis chapitre" pour un TTS fluide
+        spoken = spoken.replace(long_book, lang_config["then_chapter"], 1)
+    return spoken
+
+def spoken_text(nodes, lang_config, preserve_non_starred=True):
+    """Texte lu : références converties en toutes lettres, sans les groupes non cliquables si demandé."""
+    parts = []
+    for node in nodes:
+        if isinstance(node, str):
+            parts.append(node)
+        elif node.link or preserve_non_starred:
+            parts.append(node.speech(lang_config))
+    return "".join(parts)
+
+def display_text(nodes):
+    """Texte affiché (Lovelace) : les références restent telles qu'écrites, sans le balisage des liens."""
+    return "".join(strip_link_marks(node if isinstance(node, str) else node.raw) for node in nodes)
+
+def references_attribute(nodes, lang_config):
+    """Références reconnues, dans l'ordre du texte (attribut references des capteurs)."""
+    return [
+        {**ref.as_dict(lang_config), "link": node.link}
+        for node in nodes if isinstance(node, RefGroup)
+        for ref in node.refs if ref.book is not None
+    ]
+
+def replace_bible_references(text, lang_config, preserve_non_starred=True):
+    return spoken_text(parse_references(text, lang_config), lang_config, preserve_non_starred)
+
+
 
+# -------------------- Rendu des textes --------------------
 
+def strip_link_marks(text):
+    """Retire le balisage (*...*) des liens pour l'affichage Lovelace."""
+    return text.replace("(*", "").replace("*)", "")
+
+def render_tts(title, verse, body, lang_config, strip_parentheses):
+    """title, puis verse et body déjà analysés par parse_references."""
+    tts = f"{title}\n{spoken_text(verse, lang_config, True)}\n{spoken_text(body, lang_config, strip_parentheses)}"
+    if not tts.endswith("."):
+        tts += "."
+    return tts
+
+# Saut de ligne et bords de référence : toujours une coupure.
+_CHUNK_BREAK = re.compile(r"\n+|\s+(?=\()|(?<=\))\s*")
+# Fin de phrase possible : point (éventuellement suivi d'un guillemet fermant, « Venez. ») puis espaces.
+# Un point collé à une majuscule ("verset 6.Nous") vient d'un lien suivi du commentaire : c'est aussi une fin de phrase.
+_SENTENCE_END = re.compile(r"(?<=[.!?])(?P<quote>(?:\s?[\"”»’])?)\s+|(?<=[a-zà-ÿ\d][.!?])(?=[A-ZÀ-ÖØ-Þ])")
+_NEXT_CAPITAL = re.compile(r"(?:[\"“«‘—–]\s?)?[A-ZÀ-ÖØ-Þ]")  # majuscule, après un guillemet ou un tiret d'ouverture
+_LAST_WORD = re.compile(r"[^\s\"“«‘(]+$")
+
+def sentence_breaks(tts, abbreviations):
+    """
+    Coupures (début, fin) après les fins de phrase : le mot suivant commence par une
+    majuscule et le mot qui finit par le point n'est pas une abréviation du pack ("Mr.", "M.").
+    """
+    for match in _SENTENCE_END.finditer(tts):
+        if not _NEXT_CAPITAL.match(tts, match.end()):
+            continue  # "e.g. the", "vs. them" : la phrase continue
+        word = _LAST_WORD.search(tts, 0, match.start())
+        if word and word.group().casefold() in abbreviations:
+            continue
+        yield match.start() + len(match.group("quote") or ""), match.end()
+
+def split_tts_chunks(tts, lang_config):
+    """
+    Découpe le texte TTS en morceaux prononçables l'un après l'autre : après chaque
+    fin de phrase (le repère de clean_body), à chaque saut de ligne et autour des
+    références entre parenthèses. Un reste sans lettre ni chiffre (ponctuation seule)
+    rejoint le morceau précédent.
+    """
+    abbreviations = {word.casefold() for word in lang_config.get("abbreviations", ())}
+    breaks = sorted([match.span() for match in _CHUNK_BREAK.finditer(tts)] + list(sentence_breaks(tts, abbreviations)))
+    parts, position = [], 0
+    for start, end in breaks:
+        if start >= position:
+            parts.append(tts[position:start])
+        position = max(position, end)
+    parts.append(tts[position:])
+
+    chunks = []
+    for part in parts:
+        part = part.strip()
+        if not part:
+            continue
+        if chunks and not any(c.isalnum() for c in part):
+            chunks[-1] += part
+        else:
+            chunks.append(part)
+    return chunks
+
+def render_entry(entry, lang_config):
+    """
+    Précalcule les charges utiles publiées à minuit : Lovelace, références, TTS
+    complet et TTS découpé en phrases, pour chaque valeur de strip_parentheses.
+    Le verset et le commentaire ne sont analysés qu'une fois. Le résultat est stocké
+    à côté du texte brut avec l'empreinte du pack de langue qui a servi au rendu.
+    """
+    title = entry.get("title", "Daily text")
+    body_text = entry.get("body", "")
+    verse = parse_references(entry.get("verse", ""), lang_config)
+    body = parse_references(body_text, lang_config)
+    spoken_body = truncate_references(body, body_cut(body_text, lang_config))
+    tts_title = entry.get("title", "Texte du jour")
+    tts_full = {
+        "true": render_tts(tts_title, verse, spoken_body, lang_config, True),
+        "false": render_tts(tts_title, verse, spoken_body, lang_config, False),
+    }
+    return {
+        "lang_pack": getattr(lang_config, "fingerprint", None),
+        "lovelace": {
+            "title": title,
+            "verse": display_text(verse),
+            "comment": display_text(body),
+        },
+        "references": references_attribute(verse + body, lang_config),
+        "tts_full": tts_full,
+        "tts_chunks": {key: split_tts_chunks(tts, lang_config) for key, tts in tts_full.items()},
+    }
+
+def is_render_current(entry, lang_config):
+    rendered = entry.get("rendered")
+    fingerprint = getattr(lang_config, "fingerprint", None)
+    return bool(rendered) and fingerprint is not None and rendered.get("lang_pack") == fingerprint
+
+def get_rendered(entry, lang_config):
+    """Rendu stocké s'il correspond au pack de langue courant, sinon rendu à la volée."""
+    if is_render_current(entry, lang_config):
+        return entry["rendered"]
+    return render_entry(entry, lang_config)
+
+def strip_key(strip_parentheses):
+    return "true" if strip_parentheses else "false"
+
+def day_texts(date, rendered, strip_parentheses):
+    """Textes rendus d'un jour : attributs des capteurs Lovelace et TTS réunis (service get_texts)."""
+    key = strip_key(strip_parentheses)
+    return {
+        "date": date.isoformat(),
+        **rendered["lovelace"],
+        "references": rendered["references"],
+        "tts_full": rendered["tts_full"][key],
+        "tts_chunks": rendered["tts_chunks"][key],
+    }
@@ -1,85 +1,193 @@
 #expose.py
-from base import BaseDailyText, clean_body, replace_bible_references
-from datetime import time
+from base import BaseDailyText, strip_key
+from metrics import METRICS, publish_diagnostics
+from profiling import PROFILER, profile_request
+from audio_cache import AudioCache, make_audio_cache
+from store import get_store
+from datetime import timedelta
 
 class ExposeDailyTextLovelace(BaseDailyText):
 
+    label = "Lovelace"
+
     def initialize(self):
         self.log("Initializing ExposeDailyTextLovelace...")
         super().initialize()
         self.listen_event(self.on_text_updated, "DAILY_TEXT_FILES_UPDATED")
-        self.run_daily(self.publish_text, time(0, 0, 2)) #MAJ à 0h02 tous les jours
+        self.schedule_rollover(self.publish_text) #MAJ à minuit, texte du lendemain préparé le soir
+        # Le fetcher ne signale plus que les changements : publication initiale depuis le stockage
+        # (sans configuration, la publication attend son premier chargement : config_changed)
+        if self.config is not None:
+            self.publish_text({})
 
     def on_text_updated(self, event_name, data, kwargs):
         self.log("DAILY_TEXT_FILES_UPDATED received, refreshing sensor...")
-        self.publish_text({})
+        self.refresh_entries(data)
+        self.update_preload(data)
+        languages = self.event_languages(data)
+        if not languages:
+            self.log("Today's text unchanged, nothing to publish.")
+            return
+        self.request_publish(languages)
+
+    def config_changed(self, changed):
+        # Le texte affiché ne dépend que des langues (strip_parentheses ne concerne que le TTS)
+        if "languages" in changed:
+            self.publish_text({})
 
     def publish_text(self, kwargs):
-        filepath, today = self.get_file_for_today()#"2025-08-07.json")
-        if not filepath.exists():
-            self.set_error_state("sensor.daily_text_lovelace", "No text available", today)
-            return
+        self.request_publish()
 
-        data, error = self.read_json_file(filepath)
-        if error:
-            self.set_error_state("sensor.daily_text_lovelace", "JSON reading error", today)
-            self.error(error)
-            return
+    def sensor_states(self, lang_code, today, data, error):
+        states = []
+        for entity in self.sensor_ids("sensor.daily_text_lovelace", lang_code):
+            if error:
+                states.append(self.error_state(entity, "JSON reading error", today))
+                continue
+            if data is None:
+                states.append(self.error_state(entity, "No text available", today))
+                continue
 
-        title = data.get("title", "Daily text")
-        verse = data.get("verse", "").replace("(*", "").replace("*)", "")
-        body = data.get("body", "").replace("(*", "").replace("*)", "")
-
-        self.set_state("sensor.daily_text_lovelace", state=title, attributes={
-            "title": title,
-            "verse": verse,
-            "comment": body,
-            "date": today.isoformat(),
-            "friendly_name": "Daily text for Lovelace"
-        })
-        self.log("Daily text for Lovelace exposed.")
+            # Rendu précalculé par le fetcher (recalculé seulement si le pack de langue a changé)
+            rendered = self.get_rendered_entry(data, lang_code)
+            lovelace = rendered["lovelace"]
+            title = lovelace["title"]
+
+            states.append((entity, title, {
+                "title": title,
+                "verse": lovelace["verse"],
+                "comment": lovelace["comment"],
+                "references": rendered["references"],
+                "date": today.isoformat(),
+                "language": lang_code,
+                "friendly_name": f"Daily text for Lovelace ({lang_code})"
+            }))
+        return states
         
 class ExposeDailyTextTTS(BaseDailyText):
 
+    label = "TTS"
+
     def initialize(self):
         self.log("Initializing ExposeDailyTextTTS...")
-        self.last_config_update = None 
         self.listen_event(self.on_text_updated_tts, "DAILY_TEXT_FILES_UPDATED")
+        self.listen_event(self.on_profile, "DAILY_TEXT_PROFILE")
+        # Cache audio optionnel (argument audio_cache dans apps.yaml), rempli pendant le nettoyage de 3h30
+        self.audio_cache, self.synthesizer, self.audio_days = make_audio_cache(self.args.get("audio_cache"))
+        self.audio_queue = []
+        if self.audio_cache:
+            self.listen_event(self.on_cleanup_done, "DAILY_TEXT_CLEANUP_DONE")
         super().initialize()
-        self.run_daily(self.publish_text_tts, time(0, 0, 3)) #MAJ à 0h03 tous les jours
+        self.schedule_rollover(self.publish_text_tts) #MAJ à minuit, texte du lendemain préparé le soir
+        # Le fetcher ne signale plus que les changements : publication initiale depuis le stockage
+        # (sans configuration, la publication attend son premier chargement : config_changed)
+        if self.config is not None:
+            self.publish_text_tts({})
 
     def on_text_updated_tts(self, event_name, data, kwargs):
         self.log("DAILY_TEXT_FILES_UPDATED received, refreshing sensor...")
-        self.publish_text_tts({})
+        self.refresh_entries(data)
+        self.update_preload(data)
+        languages = self.event_languages(data)
+        if not languages:
+            self.log("Today's text unchanged, nothing to publish.")
+            return
+        self.request_publish(languages)
+
+    def config_changed(self, changed):
+        # Les deux variantes du TTS sont déjà rendues : changer strip_parentheses ne fait que republier
+        if "languages" in changed or "strip_parentheses" in changed:
+            self.publish_text_tts({})
+
+    def on_profile(self, event_name, data, kwargs):
+        # data : target ("publish_text_tts" ou "all"), memory, run_now (publication tout de suite)
+        if profile_request(data, ["publish_text_tts"], self.log) and data.get("run_now"):
+            self.run_in(self.publish_text_tts, 0)
 
     def publish_text_tts(self, kwargs):
-        filepath, today = self.get_file_for_today()#"2025-08-07.json")
-        if not filepath.exists():
-            self.set_error_state("sensor.daily_text_tts", "No text available", today)
-            return
+        self.request_publish()
 
-        data, error = self.read_json_file(filepath)
-        if error:
-            self.set_error_state("sensor.daily_text_tts", "JSON reading error", today)
-            self.error(error)
-            return
+    def publish_one(self, lang_code):
+        # Profil sur le travail réel (lecture, rendu, set_state) : request_publish peut rendre la main tout de suite
+        with PROFILER.profiled("publish_text_tts", self.log):
+            super().publish_one(lang_code)
+
+    def sensor_states(self, lang_code, today, data, error):
+        states = []
+        for entity in self.sensor_ids("sensor.daily_text_tts", lang_code):
+            if error:
+                states.append(self.error_state(entity, "JSON reading error", today))
+                continue
+            if data is None:
+                states.append(self.error_state(entity, "No text available", today))
+                continue
+
+            title = data.get("title", "Texte du jour")
+            # Rendu précalculé par le fetcher pour chaque valeur de strip_parentheses
+            rendered = self.get_rendered_entry(data, lang_code)
+            key = strip_key(self.strip_parentheses)
+
+            states.append((entity, title, {
+                "tts_full": rendered["tts_full"][key],
+                "tts_chunks": rendered["tts_chunks"][key],  # phrases à lire l'une après l'autre
+                "tts_audio_url": self.audio_url(lang_code, rendered["tts_full"][key]),
+                "date": today.isoformat(),
+                "language": lang_code,
+                "friendly_name": f"Daily text for text to speech ({lang_code})"
+            }))
+        return states
 
-        title = data.get("title", "Texte du jour")
-        #verse = data.get("verse", "")
-        verse = replace_bible_references(data.get("verse", ""), self.lang_config, True)
-        #body = clean_body(self, data.get("body", ""))
-        body = replace_bible_references(clean_body(self, data.get("body", "")), self.lang_config, self.strip_parentheses)
-
-        tts = f"{title}\n{verse}\n{body}"
-        if not tts.endswith("."):
-            tts += "."
-
-        #full_tts = replace_bible_references(tts, self.lang_config, False)
-
-        self.set_state("sensor.daily_text_tts", state=title, attributes={
-            #"tts_full": full_tts,
-            "tts_full": tts,
-            "date": today.isoformat(),
-            "friendly_name": "Daily text for text to speech"
-        })
-        self.log("Daily text for TTS exposed.")
+    # ---- Cache audio ----
+
+    def audio_url(self, lang_code, text):
+        """URL de l'audio déjà synthétisé pour ce texte, sinon None (lecture par le moteur TTS)."""
+        if not self.audio_cache:
+            return None
+        key = AudioCache.key(text, self.synthesizer.voice(lang_code))
+        return self.audio_cache.url(lang_code, key, self.synthesizer.extension)
+
+    def on_cleanup_done(self, event_name, data, kwargs):
+        # Le fetcher vient de retirer les jours passés : on aligne le cache audio sur les prochains jours
+        today = self.today()
+        key = strip_key(self.strip_parentheses)
+        self.audio_queue = []
+        for lang_code in self.languages:
+            store, voice, keep = get_store(lang_code), self.synthesizer.voice(lang_code), set()
+            for offset in range(self.audio_days):
+                day = today + timedelta(days=offset)
+                entry, _ = store.get(day)
+                if entry is None:
+                    continue
+                text = self.get_rendered_entry(entry, lang_code)["tts_full"][key]
+                audio_key = AudioCache.key(text, voice)
+                keep.add(audio_key)
+                if self.audio_cache.url(lang_code, audio_key, self.synthesizer.extension) is None:
+                    self.audio_queue.append((lang_code, day, text, audio_key))
+            removed = self.audio_cache.evict(lang_code, keep)
+            if removed:
+                self.log(f"Evicted {removed} cached audio files ({lang_code}).")
+        if self.audio_queue:
+            self.log(f"Synthesizing {len(self.audio_queue)} upcoming texts.")
+            self.run_in(self.audio_step, 1)
+
+    def audio_step(self, kwargs):
+        # Un texte par rappel : une synthèse lente ne bloque pas un worker AppDaemon pour toute la file
+        if not self.audio_queue:
+            return
+        lang_code, day, text, audio_key = self.audio_queue.pop(0)
+        try:
+            with METRICS.timer("tts_synthesis_ms"):
+                audio = self.synthesizer.synthesize(text, lang_code)
+            self.audio_cache.put(lang_code, audio_key, self.synthesizer.extension, audio)
+            METRICS.incr("tts_audio_cached")
+            if day == self.today():
+                self.request_publish([lang_code])
+            elif lang_code in self.preloaded and self.preloaded[lang_code][0] == day:
+                self.preloaded[lang_code] = self.prepare_states(lang_code, day)  # avec l'URL audio
+        except Exception as e:
+            METRICS.incr("tts_audio_errors")
+            self.log(f"Audio synthesis failed for {day} ({lang_code}): {e}", level="WARNING")
+        if self.audio_queue:
+            self.run_in(self.audio_step, 1)
+        else:
+            publish_diagnostics(self)
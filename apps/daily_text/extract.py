@@ -0,0 +1,96 @@
+#extract.py
+import datetime
+
+from bs4 import BeautifulSoup, CData, NavigableString
+
+from store import entry_hash
+
+# Types de chaînes gardés par get_text() (les commentaires, scripts, etc. sont ignorés)
+TEXT_TYPES = (NavigableString, CData)
+
+_END = object()
+
+def extract_clean_text(element):
+    """
+    Transforme un bloc HTML en texte propre en un seul parcours de l'arbre.
+    Un lien <a> est remplacé par (*texte*) sauf si la dernière parenthèse vue avant lui,
+    parmi les chaînes de même niveau, est une parenthèse ouvrante.
+    """
+    pieces = []
+    # Pile de (enfants restant à parcourir, [dernière parenthèse vue à ce niveau])
+    stack = [(iter((element,)), [None])]
+
+    while stack:
+        children, paren = stack[-1]
+        child = next(children, _END)
+        if child is _END:
+            stack.pop()
+            continue
+
+        if isinstance(child, NavigableString):
+            if type(child) in TEXT_TYPES:
+                pieces.append(child)
+            # Toute chaîne sœur (même un commentaire) compte pour l'état des parenthèses
+            last = max(child.rfind("("), child.rfind(")"))
+            if last >= 0:
+                paren[0] = child[last]
+            continue
+
+        if child.name == "a" and child.string and paren[0] != "(":
+            pieces.append(f"(*{child.string}*)")
+            paren[0] = ")"  # le texte inséré se termine par une parenthèse fermante
+            continue
+
+        stack.append((iter(child.contents), [None]))
+
+    return " ".join("".join(pieces).split())
+
+
+def _no_log(msg, level="INFO"):
+    pass
+
+def parse_month_days(year, month, html, log=_no_log):
+    """
+    Retourne [(date, entrée brute avec hash)] pour tous les jours d'une page mensuelle,
+    ou None si la page est inutilisable. log(msg, level=...) reçoit les erreurs (ex. self.log d'une app).
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    content_block = soup.find("div", class_="scalableui")
+    if not content_block:
+        log("Could not locate main content block.", level="ERROR")
+        return None
+
+    elements = content_block.find_all(["header", "p", "div"], recursive=False)
+    day = 1
+    i = 0
+    days = []
+
+    while i < len(elements) - 2:
+        try:
+            h = elements[i]
+            p = elements[i + 1]
+            d = elements[i + 2]
+
+            if h.name == "header" and h.find("h2") and p.name == "p" and d.get("class") == ["bodyTxt"]:
+                try:
+                    date = datetime.date(year, month, day)
+                except ValueError:
+                    break
+
+                entry = {
+                    "title": h.find("h2").get_text().replace("\u00A0", " ").strip(),
+                    "verse": extract_clean_text(p),
+                    "body": extract_clean_text(d)
+                }
+                entry["hash"] = entry_hash(entry)
+                days.append((date, entry))
+                day += 1
+                i += 3
+            else:
+                i += 1
+
+        except Exception as e:
+            log(f"Error at day {day}: {e}", level="WARNING")
+            i += 1
+
+    return days
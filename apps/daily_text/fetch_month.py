@@ -1,141 +1,591 @@
 #fetch_month.py
 import appdaemon.plugins.hass.hassapi as hass
-from bs4 import BeautifulSoup
-import requests
-import os
 import datetime
-import json
-from pathlib import Path
-from dateutil.relativedelta import relativedelta
+import random
+import threading
+from lang_pack import load_language_pack, language_file
+from store import get_store
+from raw_cache import get_raw_cache
+from archive import get_archive, backfill_months
+from search import get_search_index
+from sync_state import get_sync_state
+from http_client import MonthFetcher
+from metrics import METRICS, publish_diagnostics
+from profiling import PROFILER, profile_request
+from base import (
+    render_entry, is_render_current, get_rendered, day_texts, config_languages, config_snapshot, config_delta,
+    schedule_config_reload, local_today, CONFIG_ENTITY,
+)
+
+# bs4, requests et dateutil ne sont importés qu'au premier téléchargement ou nettoyage :
+# l'app démarre (et AppDaemon la recharge) sans charger l'analyse HTML ni la pile HTTP.
+
+SYNC_INTERVAL = 7 * 24 * 60 * 60  # synchronisation complète hebdomadaire (secondes)
+MONTH_FRESH_FOR = 6 * 24 * 60 * 60  # un mois vérifié depuis moins longtemps n'est pas revalidé
+CATCH_UP_DELAY = (30, 300)          # rattrapage après démarrage, étalé aléatoirement (secondes)
+RETRY_DELAY = (3600, 5400)          # nouvel essai après une synchronisation incomplète
+MAX_TEXT_DAYS = 31                  # jours rendus au plus par une requête DAILY_TEXT_GET_TEXTS
+BACKFILL_SAVE_EVERY = 10            # lots de backfill entre deux sauvegardes de l'index et de la progression
+MAX_SEARCH_LIMIT = 50               # résultats au plus par une requête DAILY_TEXT_SEARCH (comme le service HA)
 
 class FetchDailyText(hass.Hass):
     def initialize(self):
         self.log("FetchDailyText initialized")
-        self.last_config_update = None 
+        self.config = None
+        self.config_timer = None
+        self.rendered_fingerprints = {}
+        # Dates modifiées par langue depuis le dernier DAILY_TEXT_FILES_UPDATED
+        self.changed_dates = {}
+        # Session HTTP unique (keep-alive) partagée par tous les téléchargements
+        self.http = MonthFetcher(workers=4)
+        # Pages brutes compressées, pour regénérer les entrées sans retélécharger
+        self.raw_cache = get_raw_cache()
+        # Archive historique, remplie par le backfill (séparée de la fenêtre glissante)
+        self.archive = get_archive()
+        self.backfill_http = None
+        self.backfill_failed = set()
+        self.backfill_progress = None  # progression en mémoire, écrite avec les index tous les BACKFILL_SAVE_EVERY lots
+        self.backfill_unsaved = set()  # langues dont l'index a changé depuis la dernière sauvegarde
+        self.backfill_batches = 0
+        # Dernière synchronisation et fraîcheur des mois, conservées entre deux redémarrages
+        self.sync_state = get_sync_state()
+        self.sync_timer = None
+        # Les rappels AppDaemon tournent sur plusieurs workers : une seule écriture (synchro, nettoyage,
+        # changement de config, retraitement) à la fois; les lectures passent par les vues du stockage
+        self.sync_lock = threading.RLock()
+        # Miroir LAN (mirror.py) : mois déjà analysés, en JSON, au lieu des pages de jw.org
+        self.mirror_url = (self.args.get("mirror_url") or "").rstrip("/") or None
         self.load_config()
         # Si aucune config chargeable, on réessaie dans 30s
-        if self.lang_config == None:
-            self.run_every(self.delayed_retry_config, now, 30)
+        if not self.lang_configs:
+            self.run_in(self.delayed_retry_config, 30)
             return
 
+        self.start_schedules()
+
+    def start_schedules(self):
+        self.listen_state(self.on_config_state, CONFIG_ENTITY)
         self.listen_event(self.on_config_changed, "DAILY_TEXT_CONFIG_CHANGED")
-        # appelle self.run_main tous les 7 jours (en secondes)
-        now = datetime.datetime.now()
-        self.run_every(self.run_main, now, 7 * 24 * 60 * 60)
+        self.listen_event(self.on_reprocess, "DAILY_TEXT_REPROCESS")
+        self.listen_event(self.on_backfill, "DAILY_TEXT_BACKFILL")
+        self.listen_event(self.on_search, "DAILY_TEXT_SEARCH")
+        self.listen_event(self.on_get_texts, "DAILY_TEXT_GET_TEXTS")
+        self.listen_event(self.on_profile, "DAILY_TEXT_PROFILE")
         # exécuter tous les jours à 3h30 du matin.
         self.run_daily(self.scheduled_cleanup, datetime.time(3, 30, 0))
-        # immédiat
-        self.run_main({}) 
+        # Au démarrage, les apps servent le stockage : la synchronisation hebdomadaire reprend
+        # à sa date prévue, et seuls les mois manquants sont rattrapés, un peu plus tard
+        due = self.schedule_next_sync()
+        if due is not None and due > 0:
+            self.run_in(self.catch_up, random.uniform(*CATCH_UP_DELAY))
+        # Backfill interrompu (redémarrage) : reprise là où il s'était arrêté
+        if self.archive.load_progress().get("job"):
+            self.log("Resuming interrupted backfill.")
+            self.run_in(self.backfill_step, 5)
 
     def load_config(self):
         # Valeurs par défaut
         self.lang_code = "en"
+        self.languages = [self.lang_code]
         self.months_to_download = 1
         self.lang_config = None
-        base_dir = Path(__file__).resolve().parent
-        self.data_dir = base_dir / "data" / self.lang_code
-        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.lang_configs = {}
+        self.stores = {self.lang_code: get_store(self.lang_code)}
+        self.store = self.stores[self.lang_code]
+        self.data_dir = self.store.data_dir
 
         # Lire la config depuis le capteur Home Assistant
-        sensor_entity = "sensor.daily_text_configuration"
+        sensor_entity = CONFIG_ENTITY
         state = self.get_state(sensor_entity, attribute="all")
         if not state:
             self.log(f"Sensor {sensor_entity} not found. Using default config.")
             return
 
-        # Lecture des options
+        # Lecture des options (language = langue principale, languages = toutes les langues tenues à jour)
         attrs = state.get("attributes", {})
         self.lang_code = attrs.get("language", self.lang_code)
+        self.languages = config_languages(attrs)
         self.months_to_download = int(attrs.get("months", self.months_to_download))
+        self.config = config_snapshot(attrs)
+
+        # Un stockage par langue (les anciens fichiers journaliers sont migrés au premier accès)
+        self.stores = {code: get_store(code) for code in self.languages}
+        self.store = self.stores[self.lang_code]
+        self.data_dir = self.store.data_dir
+
+        # Packs de langue partagés avec les apps d'exposition
+        for code in self.languages:
+            pack = load_language_pack(code)
+            if pack is None:
+                self.log(f"Language file not found: {language_file(code)}. Skipping {code}.", level="WARNING")
+                continue
+            self.lang_configs[code] = pack
+            self.rerender_stale_entries(code)
+            self.ensure_search_index(code)
+        self.lang_config = self.lang_configs.get(self.lang_code)
+
+        self.log(f"Loaded config: lang={self.lang_code}, languages={','.join(self.languages)}, months={self.months_to_download}")
+
+    def ensure_search_index(self, lang_code):
+        """Index de recherche d'une langue; construit une seule fois depuis le stockage et l'archive s'il est vide."""
+        index = get_search_index(lang_code, self.lang_configs[lang_code])
+        if len(index):
+            return index
+        store = self.stores.get(lang_code) or get_store(lang_code)
+        with METRICS.timer("search_index_build_ms"):
+            for year, month in sorted({(d.year, d.month) for d in store.dates()}):
+                index.update(store.month_entries(year, month))
+            for day, entry in self.archive.entries(lang_code):
+                index.update({day: entry})
+        if len(index):
+            index.save()
+            self.log(f"Search index for {lang_code} built: {len(index)} days.")
+        return index
+
+    def active_languages(self):
+        """Langues configurées dont le pack de langue est chargé."""
+        return [code for code in self.languages if code in self.lang_configs]
+
+    def rerender_stale_entries(self, lang_code=None):
+        """Recalcule les rendus stockés seulement si le pack de langue a changé depuis le dernier passage."""
+        lang_code = lang_code or self.lang_code
+        pack = self.lang_configs[lang_code]
+        if self.rendered_fingerprints.get(lang_code) == pack.fingerprint:
+            return
 
-        # Recalcul du chemin avec la bonne langue
-        self.data_dir = base_dir / "data" / self.lang_code
-        self.data_dir.mkdir(parents=True, exist_ok=True)
+        def rerender(entry):
+            if is_render_current(entry, pack):
+                return None
+            return {**entry, "rendered": render_entry(entry, pack)}
 
-        # Chargement du fichier de configuration des langues
-        lang_file = base_dir / "lang" / f"{self.lang_code}.json"
-        if not lang_file.exists():
-            self.log(f"Language file not found: {lang_file}. Continuing with empty config.")
-            self.lang_config = None
-        else:
-            with open(lang_file, encoding="utf-8") as f:
-                self.lang_config = json.load(f)
+        try:
+            changed = self.stores[lang_code].update_entries(rerender)
+        except Exception as e:
+            self.log(f"Error while rendering stored entries: {e}", level="WARNING")
+            return
 
-        self.log(f"Loaded config: lang={self.lang_code}, months={self.months_to_download}")
+        self.rendered_fingerprints[lang_code] = pack.fingerprint
+        if changed:
+            self.changed_dates.setdefault(lang_code, set()).update(changed)
+            self.log(f"Re-rendered {len(changed)} entries for language pack {pack.fingerprint}.")
 
-    def on_config_changed(self, event_name, data, kwargs):
+    def terminate(self):
+        self.http.close()
+        if self.backfill_http:
+            self.backfill_http.close()
+
+    def on_config_state(self, entity, attribute, old, new, **kwargs):
         # L'utilisateur a changé la configuration.
+        schedule_config_reload(self)
+
+    def on_config_changed(self, event_name, data, kwargs):
         self.log("Config changed event received.")
-        # now = self.datetime()
-        # if self.last_config_update and (now - self.last_config_update).total_seconds() < 2:
-        #     self.log("Config update ignored (likely loop)", level="WARNING")
-        #     return
-        # self.last_config_update = now
+        schedule_config_reload(self)
+
+    def apply_config_change(self, kwargs):
+        """Recharge la configuration et ne fait que le travail imposé par les options modifiées."""
+        self.config_timer = None
+        with self.sync_lock:
+            self._apply_config_change()
+        publish_diagnostics(self)
 
+    def _apply_config_change(self):
+        previous = self.config
         self.load_config()
-        self.run_main({})
+        changed = config_delta(previous, self.config)
+        if not changed:
+            self.log("Configuration unchanged, nothing to do.")
+            return
+        self.log(f"Configuration change detected: {', '.join(sorted(changed))}")
+
+        with METRICS.timer("config_apply_ms"):
+            old_languages = set(previous["languages"]) if previous else set()
+            old_months = previous["months"] if previous else 0
+            added = [code for code in self.active_languages() if code not in old_languages]
+            kept = [code for code in self.active_languages() if code in old_languages]
+
+            # Fenêtre réduite : on retire seulement les jours qui en sortent
+            if self.months_to_download < old_months:
+                self.clean_files(local_today(self))
+            # Nouvelles langues : toute la fenêtre; langues déjà tenues : seulement les mois ajoutés.
+            # Changer de langue principale parmi les langues tenues ne coûte rien.
+            # strip_parentheses ne concerne que les apps d'exposition (les deux rendus sont stockés).
+            self.fetch_months(added, range(self.months_to_download), revalidate=False)
+            self.fetch_months(kept, range(old_months, self.months_to_download), revalidate=False)
+            self.notify_updated()
 
     def delayed_retry_config(self, kwargs):
         self.log("Retrying configuration load after delay...")
         self.load_config()
-        if self.lang_config:
-            self.listen_event(self.on_config_changed, "DAILY_TEXT_CONFIG_CHANGED")
-            now = datetime.datetime.now()
-            self.run_every(self.run_main, now, 7 * 24 * 60 * 60)
-            self.run_daily(self.scheduled_cleanup, datetime.time(3, 30, 0))
-            self.run_main({})
+        if self.lang_configs:
+            self.start_schedules()
         else:
             self.log("Still no config available. Aborting retry.", level="WARNING")
 
-    def run_main(self, kwargs):
-        # Nettoyage des fichiers obsolètes
-        today = datetime.date.today()
-        self.clean_files(today)
+    def on_reprocess(self, event_name, data, kwargs):
+        # Regénère les entrées depuis le cache des pages brutes, sans réseau
+        self.log("Reprocess event received.")
+        if self.lang_configs:
+            self.reprocess()
+
+    def reprocess(self):
+        """Reconstruit toutes les entrées stockées à partir des pages brutes en cache."""
+        with self.sync_lock, METRICS.timer("reprocess_ms"):
+            for lang_code in self.active_languages():
+                total = 0
+                for doc_id in self.raw_cache.doc_ids(lang_code):
+                    html = self.raw_cache.get(lang_code, doc_id)
+                    year, month = self.month_from_doc_id(doc_id)
+                    if html and self.parse_month(year, month, html, lang_code):
+                        total += 1
+                self.log(f"Reprocessed {total} cached months for {lang_code}.")
+            self.notify_updated()
+        publish_diagnostics(self)
+
+    def notify_updated(self):
+        """
+        Un événement par langue réellement modifiée, avec les dates concernées :
+        les apps d'exposition ne republient que si le texte du jour en fait partie.
+        """
+        changed, self.changed_dates = self.changed_dates, {}
+        for lang_code in self.active_languages():
+            dates = sorted(changed.get(lang_code, ()))
+            if not dates:
+                continue
+            self.fire_event("DAILY_TEXT_FILES_UPDATED", lang=lang_code, dates=dates,
+                            generation=self.stores[lang_code].generation)
 
-        # Télécharger jusqu'à 4 mois à partir du mois courant
-        for i in range(self.months_to_download):
-            target_date = self.get_target_date(i)
-            year, month = target_date.year, target_date.month
+    # -------------------- Archive historique --------------------
 
-            if not self.should_fetch_month(year, month):
-                self.log(f"Skipping {year}-{month:02d}, already downloaded.")
+    def on_backfill(self, event_name, data, kwargs):
+        # data : start_year, end_year (défaut start_year), languages (défaut : langues configurées), workers
+        try:
+            start_year = int(data["start_year"])
+            end_year = int(data.get("end_year") or start_year)
+            workers = max(1, int(data.get("workers") or 4))
+        except (KeyError, TypeError, ValueError):
+            self.log(f"Invalid backfill request: {data}", level="ERROR")
+            return
+        languages = data.get("languages") or self.active_languages()
+        self.start_backfill(start_year, end_year, languages, workers)
+
+    def start_backfill(self, start_year, end_year, languages, workers=4):
+        """Enregistre le travail demandé puis le traite par lots; les mois déjà archivés ne sont pas retéléchargés."""
+        progress = self.archive.load_progress()
+        progress["job"] = {
+            "start_year": min(start_year, end_year),
+            "end_year": max(start_year, end_year),
+            "languages": list(languages),
+            "workers": workers,
+        }
+        progress.setdefault("done", {})
+        self.archive.save_progress(progress)
+        self.backfill_progress = progress
+        self.backfill_failed = set()
+        self.log(f"Backfill requested: {start_year}-{end_year} for {','.join(languages)} with {workers} workers.")
+        self.run_in(self.backfill_step, 0)
+
+    def backfill_pending(self, progress):
+        job = progress.get("job")
+        if not job:
+            return []
+        done = progress.get("done", {})
+        return [(lang_code, year, month)
+                for lang_code in job["languages"]
+                for year, month in backfill_months(job["start_year"], job["end_year"], local_today(self))
+                if self.get_doc_id(year, month) not in done.get(lang_code, ())
+                and (lang_code, year, month) not in self.backfill_failed]
+
+    def backfill_step(self, kwargs):
+        # Un lot par rappel : AppDaemon garde la main entre deux lots
+        if self.run_backfill_batch():
+            self.run_in(self.backfill_step, 0)
+
+    def run_backfill_batch(self):
+        """Télécharge, analyse et archive un lot de mois. Retourne True s'il reste du travail."""
+        progress = self.backfill_progress or self.archive.load_progress()
+        self.backfill_progress = progress
+        job = progress.get("job")
+        pending = self.backfill_pending(progress)
+        if not pending:
+            self.backfill_progress = None
+            if job:
+                progress.pop("job")
+                self.save_backfill(progress)
+                failed = len(self.backfill_failed)
+                self.log(f"Backfill {job['start_year']}-{job['end_year']} complete"
+                         + (f", {failed} months failed (retry by requesting it again)." if failed else "."))
+                self.fire_event("DAILY_TEXT_BACKFILL_DONE", failed=failed, **job)
+            if self.backfill_http:
+                self.backfill_http.close()
+                self.backfill_http = None
+            return False
+
+        # Pool dédié : la synchro hebdomadaire garde le sien
+        workers = job["workers"]
+        if self.backfill_http is None or self.backfill_http.workers != workers:
+            if self.backfill_http:
+                self.backfill_http.close()
+            self.backfill_http = MonthFetcher(workers=workers)
+
+        batch = pending[:workers * 2]
+        jobs = []
+        pack_for = {}
+        for lang_code, year, month in batch:
+            pack = pack_for[lang_code] = self.lang_configs.get(lang_code) or load_language_pack(lang_code)
+            if pack is None:
+                self.log(f"Language file not found: {language_file(lang_code)}", level="ERROR")
+                self.backfill_failed.add((lang_code, year, month))
                 continue
+            doc_id = self.get_doc_id(year, month)
+            jobs.append(((lang_code, year, month), (f"{lang_code}/{doc_id}", self.month_url(year, month, lang_code, pack), False)))
+
+        with METRICS.timer("backfill_batch_ms"):
+            results = self.backfill_http.fetch_all([job for _, job in jobs])
+            for ((lang_code, year, month), _), result in zip(jobs, results):
+                done = progress["done"].setdefault(lang_code, [])
+                if result.status == 404:
+                    # Mois absent du site (trop ancien) : inutile de réessayer
+                    self.log(f"No page for {lang_code} {year}-{month:02d}, skipped.", level="WARNING")
+                    done.append(self.get_doc_id(year, month))
+                    continue
+                days = self.parse_month_days(year, month, result.text) if result.ok else None
+                if days is None:
+                    self.log(f"Backfill failed for {lang_code} {year}-{month:02d}: {result.error or 'unusable page'}", level="ERROR")
+                    self.backfill_failed.add((lang_code, year, month))
+                    continue
+                entries = {d.isoformat(): e for d, e in days}
+                added = self.archive.put_month(lang_code, year, month, entries)
+                get_search_index(lang_code, pack_for[lang_code]).update(entries)
+                self.backfill_unsaved.add(lang_code)
+                done.append(self.get_doc_id(year, month))
+                METRICS.incr("backfill_months")
+                METRICS.incr("backfill_entries", added)
+
+        # Index réécrits en entier à chaque sauvegarde : une tous les BACKFILL_SAVE_EVERY lots, pas à chaque lot.
+        # La progression est écrite avec eux : une interruption refait au plus ces lots (archive et index idempotents).
+        self.backfill_batches += 1
+        if self.backfill_batches % BACKFILL_SAVE_EVERY == 0:
+            self.save_backfill(progress)
+        remaining = len(pending) - len(batch)
+        self.log(f"Backfill: {len(batch)} months processed, {remaining} remaining.")
+        return True
+
+    def save_backfill(self, progress):
+        for lang_code in self.backfill_unsaved:
+            get_search_index(lang_code).save()
+        self.backfill_unsaved.clear()
+        self.archive.save_progress(progress)
+
+    # -------------------- Recherche --------------------
+
+    def on_search(self, event_name, data, kwargs):
+        # data : query, language (défaut : langue principale), limit, request_id (renvoyé tel quel)
+        query = (data.get("query") or "").strip()
+        lang_code = data.get("language") or self.lang_code
+        try:
+            limit = min(max(int(data.get("limit") or 10), 1), MAX_SEARCH_LIMIT)
+        except (TypeError, ValueError):
+            limit = 10
+        results = []
+        # Langue non tenue à jour : pas de stockage ni d'index créé pour elle (et pas de chemin hors de data/)
+        if lang_code not in self.active_languages():
+            self.log(f"Search for unconfigured language {lang_code!r} ignored.", level="WARNING")
+        elif query:
+            with METRICS.timer("search_ms"):
+                results = self.search_texts(query, lang_code, limit)
+        self.fire_event("DAILY_TEXT_SEARCH_RESULT", request_id=data.get("request_id"), query=query,
+                        language=lang_code, results=results)
+        self.log(f"Search '{query}' ({lang_code}): {len(results)} results.")
+
+    def search_texts(self, query, lang_code, limit=10):
+        """Résultats de l'index, complétés du verset du jour (stockage ou archive)."""
+        results = get_search_index(lang_code, self.lang_configs.get(lang_code)).search(query, limit)
+        store = get_store(lang_code)
+        for result in results:
+            date = datetime.date.fromisoformat(result["date"])
+            entry, _ = store.get(date)
+            if entry is None:
+                entry, _ = self.archive.get(lang_code, date)
+            result["verse"] = (entry or {}).get("verse", "").replace("(*", "(").replace("*)", ")")
+        return results
+
+    # -------------------- Textes à venir --------------------
+
+    def on_get_texts(self, event_name, data, kwargs):
+        # data : start (date iso, défaut : aujourd'hui), days, language, request_id (renvoyé tel quel)
+        lang_code = data.get("language") or self.lang_code
+        try:
+            start = datetime.date.fromisoformat(data["start"]) if data.get("start") else local_today(self)
+        except (TypeError, ValueError):
+            start = local_today(self)
+        try:
+            days = min(max(int(data.get("days") or 7), 1), MAX_TEXT_DAYS)
+        except (TypeError, ValueError):
+            days = 7
+        with METRICS.timer("get_texts_ms"):
+            texts = self.get_texts(start, days, lang_code)
+        self.fire_event("DAILY_TEXT_TEXTS", request_id=data.get("request_id"), language=lang_code,
+                        start=start.isoformat(), texts=texts)
+
+    def get_texts(self, start, days, lang_code=None):
+        """
+        Textes rendus de start à start + days - 1, lus dans les mois gardés en mémoire par le
+        stockage (archive pour les jours passés). Les jours absents sont omis.
+        """
+        lang_code = lang_code or self.lang_code
+        pack = self.lang_configs.get(lang_code)
+        if pack is None:
+            return []
+        # Une seule vue pour toute la plage : un nettoyage concurrent ne coupe pas la réponse en deux
+        view = self.stores[lang_code].snapshot()
+        strip = self.config["strip_parentheses"] if self.config else False
+        texts = []
+        for offset in range(days):
+            date = start + datetime.timedelta(days=offset)
+            entry, _ = view.get(date)
+            if entry is None:
+                entry, _ = self.archive.get(lang_code, date)
+            if entry is not None:
+                texts.append(day_texts(date, get_rendered(entry, pack), strip))
+        return texts
+
+    # -------------------- Synchronisation --------------------
+
+    def schedule_next_sync(self):
+        """
+        Planifie la synchronisation complète à sa date due (dernière réussite + 7 jours),
+        ou bientôt, avec un délai aléatoire, si elle est en retard. Retourne le délai prévu.
+        """
+        if self.sync_timer is not None:
+            self.cancel_timer(self.sync_timer)
+        due = self.sync_state.seconds_until_sync(SYNC_INTERVAL)
+        if due is None or due <= 0:
+            delay = random.uniform(*CATCH_UP_DELAY)
+            self.log(f"Weekly sync overdue, running it in {delay:.0f}s.")
+        else:
+            delay = due
+            self.log(f"Next weekly sync in {delay / 3600:.1f}h.")
+        self.sync_timer = self.run_in(self.scheduled_sync, delay)
+        return due
+
+    def scheduled_sync(self, kwargs):
+        self.sync_timer = None
+        if self.run_main({}):
+            self.schedule_next_sync()
+        else:
+            # Réseau ou site indisponible : nouvel essai plus tard, sans marteler le serveur
+            delay = random.uniform(*RETRY_DELAY)
+            self.log(f"Sync incomplete, retrying in {delay / 60:.0f} min.", level="WARNING")
+            self.sync_timer = self.run_in(self.scheduled_sync, delay)
+
+    def catch_up(self, kwargs):
+        """Après un redémarrage : nettoyage local et mois manquants seulement (aucune revalidation)."""
+        with self.sync_lock, METRICS.timer("catch_up_ms"):
+            self.clean_files(local_today(self))
+            self.fetch_months(self.active_languages(), range(self.months_to_download), revalidate=False)
+            self.notify_updated()
+        publish_diagnostics(self)
+
+    def on_profile(self, event_name, data, kwargs):
+        # data : target ("run_main" ou "all"), memory, run_now (synchronisation lancée tout de suite)
+        if profile_request(data, ["run_main"], self.log) and data.get("run_now"):
+            self.run_in(self.run_main, 0)
 
-            self.download_month(year, month)
-        self.fire_event("DAILY_TEXT_FILES_UPDATED", lang=self.lang_code)
+    def run_main(self, kwargs):
+        """Synchronisation complète. Retourne True si aucun mois n'a échoué."""
+        with self.sync_lock:
+            with PROFILER.profiled("run_main", self.log), METRICS.timer("run_main_ms"):
+                ok = self.sync_months(kwargs.get("revalidate", True))
+            if ok:
+                self.sync_state.mark_sync(local_today(self))
+        publish_diagnostics(self)
+        return ok
+
+    def sync_months(self, revalidate=True):
+        # Nettoyage des fichiers obsolètes
+        today = local_today(self)
+        self.clean_files(today)
+        failed = self.fetch_months(self.active_languages(), range(self.months_to_download), revalidate)
+        self.notify_updated()
+        return not failed
+
+    def fetch_months(self, languages, offsets, revalidate=True):
+        """
+        Télécharge les mois manquants (ou à revalider) des décalages offsets pour chaque langue.
+        Retourne le nombre de mois en échec.
+        """
+        # Jusqu'à 4 mois à partir du mois courant pour chaque langue, tous en parallèle sur la même session
+        months, jobs = [], []
+        for lang_code in languages:
+            for i in offsets:
+                target_date = self.get_target_date(i)
+                year, month = target_date.year, target_date.month
+                missing = self.should_fetch_month(year, month, lang_code)
+
+                # Mois complet : on ne le revalide que si le serveur nous a donné un ETag / Last-Modified,
+                # et s'il n'a pas déjà été vérifié récemment (nouvelle langue ajoutée hier, par exemple)
+                age = self.sync_state.month_age(lang_code, year, month)
+                stale = age is None or age >= MONTH_FRESH_FOR
+                if not missing and not (revalidate and stale and self.http.has_validators(self.cache_key(year, month, lang_code))):
+                    self.log(f"Skipping {lang_code} {year}-{month:02d}, already downloaded.")
+                    METRICS.incr("months_skipped")
+                    continue
+                url = self.month_url(year, month, lang_code)
+                self.log(f"Fetching from: {url}")
+                months.append((year, month, lang_code))
+                jobs.append((self.cache_key(year, month, lang_code), url, not missing))
+
+        if not jobs:
+            return 0
+        failed = 0
+        for (year, month, lang_code), result in zip(months, self.http.fetch_all(jobs)):
+            if self.handle_month_response(year, month, result, lang_code):
+                self.sync_state.mark_month(lang_code, year, month)
+            else:
+                failed += 1
+        self.sync_state.save()
+        return failed
 
     def clean_files(self, today):
-        if not self.data_dir.exists():
-            return
-
+        from dateutil.relativedelta import relativedelta
         # Déterminer la date max autorisée
         last_valid_date = today + relativedelta(months=self.months_to_download)
-        
-        for file in self.data_dir.glob("*.json"):
+
+        for lang_code, store in self.stores.items():
+            # Dates du passé ou trop futures, retirées via le manifest
             try:
-                date = datetime.date.fromisoformat(file.stem)
-                
-                # Fichier du passé
-                if date < today:
-                    file.unlink()
-                    self.log(f"Deleted outdated file: {file.name}")
-                # Fichier trop futur
-                elif date >= last_valid_date:
-                    file.unlink()
-                    self.log(f"Deleted file beyond configured range: {file.name}")
+                removed = store.prune(today, last_valid_date)
             except Exception as e:
                 self.log(f"Error while cleaning files: {e}", level="WARNING")
+                continue
+            if removed:
+                self.log(f"Deleted {len(removed)} {lang_code} entries outside {today} .. {last_valid_date}")
+                # Les jours archivés restent cherchables
+                index = get_search_index(lang_code)
+                if index.remove([d for d in removed if not self.archive.has(lang_code, datetime.date.fromisoformat(d))]):
+                    index.save()
+
+            # Pages brutes des mois entièrement passés
+            for doc_id in self.raw_cache.doc_ids(lang_code):
+                year, month = self.month_from_doc_id(doc_id)
+                if (year, month) < (today.year, today.month):
+                    self.raw_cache.discard(lang_code, doc_id)
 
 
     # Exécuter tous les jours à 3h30 du matin.
     def scheduled_cleanup(self, kwargs):
-        today = datetime.date.today()
+        today = local_today(self)
         # Nettoyage des fichiers obsolètes
-        self.clean_files(today)
+        with self.sync_lock:
+            self.clean_files(today)
+        # Les apps d'exposition alignent leurs caches (audio) sur les jours restants
+        self.fire_event("DAILY_TEXT_CLEANUP_DONE", languages=self.active_languages())
 
     # Vérifie si tous les fichiers d’un mois existent
-    def should_fetch_month(self, year, month):
-        today = datetime.date.today()
+    def should_fetch_month(self, year, month, lang_code=None):
+        store = self.stores[lang_code or self.lang_code]
+        today = local_today(self)
         for day in range(1, 32):
             try:
                 date = datetime.date(year, month, day)
@@ -143,113 +593,130 @@ class FetchDailyText(hass.Hass):
                 break
             if date < today:
                 continue  # Ignore les jours passés
-            file = self.data_dir / f"{date.isoformat()}.json"
-            if not file.exists():
+            if not store.has(date):
                 return True
         return False
 
-    # Téléchargement du texte pour un mois donné
-    def download_month(self, year, month):
+    def get_doc_id(self, year, month):
         month_index = month - 1  # 0-based
-        doc_id = f"110{year}{200 + month_index}"
-        url = f"{self.lang_config['url']}{doc_id}"
-        self.log(f"Fetching from: {url}")
-        today = datetime.date.today()
+        return f"110{year}{200 + month_index}"
+
+    def month_from_doc_id(self, doc_id):
+        return int(doc_id[3:7]), int(doc_id[7:]) - 199
+
+    def month_url(self, year, month, lang_code=None, pack=None):
+        lang_code = lang_code or self.lang_code
+        if self.mirror_url:
+            return f"{self.mirror_url}/{lang_code}/{year:04d}-{month:02d}.json"
+        pack = pack or self.lang_configs[lang_code]
+        return f"{pack['url']}{self.get_doc_id(year, month)}"
+
+    def cache_key(self, year, month, lang_code=None):
+        return f"{lang_code or self.lang_code}/{self.get_doc_id(year, month)}"
 
+    # Téléchargement du texte pour un mois donné
+    def download_month(self, year, month, lang_code=None):
+        url = self.month_url(year, month, lang_code)
+        self.log(f"Fetching from: {url}")
+        result = self.http.fetch(self.cache_key(year, month, lang_code), url)
+        self.handle_month_response(year, month, result, lang_code)
+
+    def handle_month_response(self, year, month, result, lang_code=None):
+        """Traite une réponse de MonthFetcher. Retourne True si le mois est à jour dans le stockage."""
+        lang_code = lang_code or self.lang_code
+        METRICS.incr("http_requests")
+        METRICS.observe("http_latency_ms", result.elapsed * 1000)
+        if result.attempts > 1:
+            METRICS.incr("http_retries", result.attempts - 1)
+        if result.not_modified:
+            METRICS.incr("http_not_modified")
+            self.log(f"{year}-{month:02d} not modified since last download, skipping parse.")
+            return True
+        if not result.ok:
+            METRICS.incr("http_errors")
+            self.log(f"Failed to fetch page for {year}-{month:02d}: {result.error}", level="ERROR")
+            return False
+        METRICS.incr("bytes_downloaded", result.size)
         try:
-            response = requests.get(url)
-            response.raise_for_status()
+            self.raw_cache.put(lang_code, self.get_doc_id(year, month), result.text)
         except Exception as e:
-            self.log(f"Failed to fetch page for {year}-{month:02d}: {e}", level="ERROR")
-            return
+            self.log(f"Failed to cache page for {year}-{month:02d}: {e}", level="WARNING")
 
-        response.encoding = "utf-8"
-        soup = BeautifulSoup(response.text, "html.parser")
-        content_block = soup.find("div", class_="scalableui")
-        if not content_block:
-            self.log("Could not locate main content block.", level="ERROR")
-            return
-
-        elements = content_block.find_all(["header", "p", "div"], recursive=False)
-        day = 1
-        i = 0
-        total_saved = 0
+        if self.parse_month(year, month, result.text, lang_code):
+            # Contenu stocké : les prochaines requêtes pour ce mois peuvent être conditionnelles
+            self.http.remember(result)
+            return True
+        return False
 
-        while i < len(elements) - 2:
+    def parse_month(self, year, month, html, lang_code=None):
+        """Découpe la page mensuelle en entrées journalières et les stocke. Retourne True si stocké."""
+        lang_code = lang_code or self.lang_code
+        with METRICS.timer("parse_month_ms"):
+            entries = self.extract_month_entries(year, month, html, lang_code)
+        if entries is None:
+            return False
+
+        # Une seule écriture atomique pour le mois, seulement si un jour a changé
+        changed = []
+        if entries:
             try:
-                h = elements[i]
-                p = elements[i + 1]
-                d = elements[i + 2]
-
-                if h.name == "header" and h.find("h2") and p.name == "p" and d.get("class") == ["bodyTxt"]:
-                    title = h.find("h2").get_text().replace("\u00A0", " ").strip()
-                    #verse = self.extract_clean_text_from_html(p.get_text().replace("\u00A0", " ").strip())
-                    verse = self.extract_clean_text_from_html(p)
-                    body = self.extract_clean_text_from_html(d)
-
-                    try:
-                        date = datetime.date(year, month, day)
-                    except ValueError:
-                        break
-                    if date < today:
-                        day += 1 # Ignore les jours passés
-                        i += 3
-                        continue  
-
-                    filename = date.isoformat() + ".json"
-                    filepath = self.data_dir / filename
-                    with open(filepath, "w", encoding="utf-8") as f:
-                        json.dump({
-                            "title": title,
-                            "verse": verse,
-                            "body": body
-                        }, f, ensure_ascii=False, indent=2)
-
-                    self.log(f"Saved: {filename}")
-                    total_saved += 1
-                    day += 1
-                    i += 3
-                else:
-                    i += 1
-
+                with METRICS.timer("store_write_ms"):
+                    changed = self.stores[lang_code].put_month(year, month, entries)
             except Exception as e:
-                self.log(f"Error at day {day}: {e}", level="WARNING")
-                i += 1
-
-        self.log(f"Download complete for {month:02d}/{year}: {total_saved} entries saved.")
+                self.log(f"Failed to save {year}-{month:02d}: {e}", level="ERROR")
+                return False
+        METRICS.incr("entries_written", len(changed))
+        METRICS.incr("entries_unchanged", len(entries) - len(changed))
+        if changed:
+            self.changed_dates.setdefault(lang_code, set()).update(changed)
+            # Index de recherche mis à jour en place, seulement pour les jours modifiés
+            index = get_search_index(lang_code, self.lang_configs[lang_code])
+            if index.update({day: entries[day] for day in changed}):
+                index.save()
+
+        self.log(f"Download complete for {lang_code} {month:02d}/{year}: {len(changed)} of {len(entries)} entries changed.")
+        return True
+
+    def extract_month_entries(self, year, month, html, lang_code=None):
+        """Retourne {date iso: entrée} pour les jours à venir du mois, ou None si la page est inutilisable."""
+        lang_code = lang_code or self.lang_code
+        pack = self.lang_configs[lang_code]
+        days = self.parse_month_days(year, month, html)
+        if days is None:
+            return None
+
+        # Entrées déjà stockées : un jour au contenu identique garde son rendu
+        stored = self.stores[lang_code].month_entries(year, month)
+        today = local_today(self)
+        entries = {}
+        for date, entry in days:
+            if date < today:
+                continue  # Ignore les jours passés
+            previous = stored.get(date.isoformat())
+            if previous and previous.get("hash") == entry["hash"] and is_render_current(previous, pack):
+                entry = previous  # contenu inchangé : pas de nouveau rendu
+            else:
+                # Rendu Lovelace/TTS précalculé, la publication n'a plus qu'à le lire
+                entry["rendered"] = render_entry(entry, pack)
+            entries[date.isoformat()] = entry
+        return entries
+
+    def parse_month_days(self, year, month, html):
+        """Retourne [(date, entrée brute avec hash)] pour tous les jours de la page, ou None si la page est inutilisable."""
+        if html.lstrip().startswith("{"):
+            # Mois déjà analysé par un miroir (mirror.py) : aucun HTML à parser
+            from mirror import parse_mirror_month
+            return parse_mirror_month(year, month, html, self.log)
+        from extract import parse_month_days
+        return parse_month_days(year, month, html, self.log)
 
     def extract_clean_text_from_html(self, element):
         """Transforme un bloc HTML en texte propre, en remplaçant certains liens par (*texte*)."""
-        clone = BeautifulSoup(str(element), "html.parser")  # Traiter chaque lien dans la section
-        for a in clone.find_all("a"):
-            if not a.string:
-                continue
-            paren = self.first_paren_before(a)
-            if paren == "(":
-                continue  # Ne pas toucher si dans une parenthèse ouvrante
-            else: # Sinon : première parenthèse est une parenthèse fermante ou rien → on remplace
-                a.insert_before(f"(*{a.string}*)")
-                a.decompose()
-        return " ".join(clone.get_text().split()) # Récupérer le texte propre avec les liens remplacés
+        from extract import extract_clean_text
+        return extract_clean_text(element)  # un seul parcours, sans re-parser l'élément
 
     #Date décalé par un offset de x-mois.
     def get_target_date(self, offset):
-        today = datetime.date.today()
+        from dateutil.relativedelta import relativedelta
+        today = local_today(self)
         return today + relativedelta(months=offset)
-
-    def first_paren_before(self, tag):
-        """Retourne la première parenthèse rencontrée avant le lien, ou None."""
-        prev = tag.previous_sibling
-        collected = ""
-
-        # Rassembler le texte avant la balise
-        while prev:
-            if isinstance(prev, str):
-                collected = prev + collected
-            prev = prev.previous_sibling
-
-        # On remonte la chaîne pour trouver la 1re parenthèse
-        for c in reversed(collected):
-            if c in ("(", ")"):
-                return c
-        return None
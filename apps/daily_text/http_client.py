@@ -0,0 +1,165 @@
+#http_client.py
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import json
+import random
+import threading
+import time
+
+from store import DATA_DIR, atomic_write_json
+
+VALIDATORS_FILE = DATA_DIR / "http_validators.json"
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def _requests():
+    """requests n'est importé qu'au premier téléchargement (démarrage et rechargement plus rapides)."""
+    import requests
+    return requests
+
+
+@dataclass
+class FetchResult:
+    key: str
+    url: str
+    status: int = 0
+    text: str = ""
+    etag: str = None
+    last_modified: str = None
+    elapsed: float = 0.0
+    size: int = 0
+    attempts: int = 0
+    error: str = None
+
+    @property
+    def not_modified(self):
+        return self.status == 304
+
+    @property
+    def ok(self):
+        return self.error is None and self.status == 200
+
+
+class MonthFetcher:
+    """
+    Récupère les pages mensuelles en parallèle sur une seule session keep-alive.
+    Mémorise ETag / Last-Modified par clé (langue/doc_id) pour envoyer des requêtes
+    conditionnelles, et réessaie avec un backoff exponentiel aléatoire.
+    """
+
+    def __init__(self, workers=4, timeout=(5, 30), retries=3, backoff=1.0, validators_file=VALIDATORS_FILE):
+        self.workers = workers
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.validators_file = validators_file
+        self._lock = threading.Lock()
+        self._validators = self._load_validators()
+        self._session = None
+
+    @property
+    def session(self):
+        """Session keep-alive, créée à la première requête."""
+        with self._lock:
+            if self._session is None:
+                from requests.adapters import HTTPAdapter
+                session = _requests().Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.workers)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+            return self._session
+
+    def _load_validators(self):
+        try:
+            with open(self.validators_file, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def has_validators(self, key):
+        return key in self._validators
+
+    def remember(self, result):
+        """À appeler une fois le contenu stocké : la prochaine requête pourra être conditionnelle."""
+        if not (result.etag or result.last_modified):
+            return
+        with self._lock:
+            self._validators[result.key] = {"etag": result.etag, "last_modified": result.last_modified}
+            atomic_write_json(self.validators_file, self._validators)
+
+    def forget(self, key):
+        with self._lock:
+            if self._validators.pop(key, None) is not None:
+                atomic_write_json(self.validators_file, self._validators)
+
+    def _headers(self, key, conditional):
+        validators = self._validators.get(key) if conditional else None
+        if not validators:
+            return {}
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    def _sleep_before_retry(self, attempt):
+        # Backoff exponentiel avec jitter complet
+        time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+    def fetch(self, key, url, conditional=False):
+        requests = _requests()
+        result = FetchResult(key=key, url=url)
+        headers = self._headers(key, conditional)
+        start = time.monotonic()
+
+        for attempt in range(self.retries + 1):
+            result.attempts = attempt + 1
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                result.error = str(e)
+            except requests.RequestException as e:
+                result.error = str(e)  # erreur non transitoire : inutile de réessayer
+                result.elapsed = time.monotonic() - start
+                return result
+            else:
+                result.status = response.status_code
+                if response.status_code not in RETRY_STATUS:
+                    break
+                result.error = f"HTTP {response.status_code}"
+            if attempt < self.retries:
+                self._sleep_before_retry(attempt)
+        else:
+            result.elapsed = time.monotonic() - start
+            return result
+
+        result.elapsed = time.monotonic() - start
+        result.error = None
+        if response.status_code == 304:
+            return result
+        try:
+            response.raise_for_status()
+        except requests.HTTPError as e:
+            result.error = str(e)
+            return result
+
+        response.encoding = "utf-8"
+        result.text = response.text
+        result.size = len(response.content)
+        result.etag = response.headers.get("ETag")
+        result.last_modified = response.headers.get("Last-Modified")
+        return result
+
+    def fetch_all(self, jobs):
+        """jobs : liste de (clé, url, conditionnel). Les résultats sont rendus dans l'ordre des jobs."""
+        if not jobs:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(jobs))) as pool:
+            return list(pool.map(lambda job: self.fetch(*job), jobs))
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
@@ -0,0 +1,105 @@
+#lang_pack.py
+from collections.abc import Mapping
+from pathlib import Path
+from types import MappingProxyType
+import json
+import threading
+
+LANG_DIR = Path(__file__).resolve().parent / "lang"
+
+_END = ""  # clé marquant la fin d'une abréviation dans le trie (jamais un caractère)
+RENDER_VERSION = 4  # à incrémenter quand le contenu du rendu change : les rendus stockés sont alors refaits
+
+# -------------------- Trie des livres --------------------
+
+class BookTrie:
+    """Arbre de préfixes des noms de livres : la recherche coûte la longueur de la référence."""
+
+    __slots__ = ("_root",)
+
+    def __init__(self, book_names):
+        root = {}
+        for book in book_names:
+            node = root
+            for c in book:
+                node = node.setdefault(c, {})
+            node[_END] = book
+        self._root = root
+
+    def longest_prefix(self, text):
+        """Retourne le nom de livre le plus long qui commence text, ou None."""
+        node = self._root
+        found = node.get(_END)
+        for c in text:
+            node = node.get(c)
+            if node is None:
+                break
+            if _END in node:
+                found = node[_END]
+        return found
+
+# -------------------- Pack de langue compilé --------------------
+
+class LanguagePack(Mapping):
+    """
+    Fichier lang/<code>.json chargé une seule fois, en lecture seule.
+    Se comporte comme le dict d'origine (lang_config["to"], .get(...)) et
+    embarque le trie des livres pour la conversion des références.
+    """
+
+    def __init__(self, code, data, mtime_ns=0):
+        data = dict(data)
+        data["book_names"] = MappingProxyType(dict(data.get("book_names", {})))
+        self.code = code
+        self.mtime_ns = mtime_ns
+        self.fingerprint = f"{code}:{mtime_ns}:{RENDER_VERSION}"
+        self._data = MappingProxyType(data)
+        self._books = BookTrie(data["book_names"])
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def match_book(self, text):
+        return self._books.longest_prefix(text)
+
+
+_packs = {}
+_packs_lock = threading.Lock()
+
+def language_file(lang_code):
+    return LANG_DIR / f"{lang_code}.json"
+
+def load_language_pack(lang_code):
+    """
+    Retourne le pack compilé de la langue, partagé par toutes les apps du processus.
+    Le fichier n'est relu que si son mtime a changé. None si le fichier est absent.
+    """
+    lang_file = language_file(lang_code)
+    try:
+        mtime_ns = lang_file.stat().st_mtime_ns
+    except FileNotFoundError:
+        with _packs_lock:
+            _packs.pop(lang_code, None)
+        return None
+
+    with _packs_lock:
+        pack = _packs.get(lang_code)
+        if pack is not None and pack.mtime_ns == mtime_ns:
+            return pack
+
+        with open(lang_file, encoding="utf-8") as f:
+            pack = LanguagePack(lang_code, json.load(f), mtime_ns)
+        _packs[lang_code] = pack
+        return pack
+
+def match_book(text, lang_config):
+    """Nom de livre le plus long au début de text (accepte aussi un simple dict de langue)."""
+    if isinstance(lang_config, LanguagePack):
+        return lang_config.match_book(text)
+    return BookTrie(lang_config["book_names"]).longest_prefix(text)
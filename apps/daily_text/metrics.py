@@ -0,0 +1,90 @@
+#metrics.py
+from collections import deque
+from contextlib import contextmanager
+import threading
+import time
+
+DIAGNOSTICS_ENTITY = "sensor.daily_text_diagnostics"
+
+# -------------------- Mesures partagées --------------------
+
+class Metrics:
+    """
+    Compteurs et séries de mesures partagés par toutes les apps du processus.
+    Chaque série garde une fenêtre glissante des dernières valeurs pour les percentiles.
+    """
+
+    def __init__(self, window=200):
+        self.window = window
+        self._series = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, value):
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = deque(maxlen=self.window)
+            series.append(value)
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    @contextmanager
+    def timer(self, name):
+        """Mesure la durée du bloc en millisecondes."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000)
+
+    def last(self, name, default=None):
+        with self._lock:
+            series = self._series.get(name)
+            return series[-1] if series else default
+
+    def snapshot(self):
+        """Attributs à plat (<série>_p50, <série>_p95...) faciles à utiliser dans les templates HA."""
+        with self._lock:
+            series = {name: (values[-1], sorted(values)) for name, values in self._series.items() if values}
+            counters = dict(self._counters)
+
+        attributes = dict(sorted(counters.items()))
+        for name, (last, values) in sorted(series.items()):
+            attributes[f"{name}_count"] = len(values)
+            attributes[f"{name}_last"] = round(last, 2)
+            for p in (50, 95, 99):
+                attributes[f"{name}_p{p}"] = round(percentile(values, p), 2)
+            attributes[f"{name}_max"] = round(values[-1], 2)
+        return attributes
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+            self._counters.clear()
+
+
+def percentile(sorted_values, p):
+    """Percentile par interpolation linéaire sur une liste déjà triée."""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    k = (len(sorted_values) - 1) * p / 100
+    lower = int(k)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+
+METRICS = Metrics()
+
+def publish_diagnostics(app):
+    """Publie sensor.daily_text_diagnostics; l'état est la durée du dernier run_main (ms)."""
+    state = METRICS.last("run_main_ms")
+    app.set_state(DIAGNOSTICS_ENTITY, state=round(state, 1) if state is not None else "unknown", attributes={
+        **METRICS.snapshot(),
+        "unit_of_measurement": "ms",
+        "state_class": "measurement",
+        "icon": "mdi:speedometer",
+        "friendly_name": "Daily text diagnostics",
+    })
@@ -0,0 +1,259 @@
+#mirror.py
+"""
+Miroir LAN : télécharge et analyse chaque mois (langue, mois) une seule fois, puis sert
+les entrées journalières prêtes à l'emploi en JSON, avec ETag / Last-Modified / Cache-Control.
+Les apps FetchDailyText configurées avec mirror_url lisent ce JSON au lieu de la page HTML :
+le trafic vers jw.org et l'analyse HTML ne dépendent plus du nombre d'instances.
+
+    python apps/daily_text/mirror.py --port 8780
+    python apps/daily_text/mirror.py --port 8780 --upstream en=http://127.0.0.1:8000/en/wol/d/r1/lp-e/
+
+GET /<langue>/<AAAA>-<MM>.json -> {"language", "year", "month", "days": [{"date", "title", "verse", "body"}]}
+"""
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import datetime
+import hashlib
+import json
+import re
+import threading
+import time
+
+import store
+from store import atomic_write_json, entry_hash
+from lang_pack import load_language_pack
+from http_client import MonthFetcher
+
+MIRROR_PORT = 8780
+MIRROR_TTL = 24 * 60 * 60   # un mois servi est revalidé auprès de jw.org au plus une fois par jour
+CLIENT_MAX_AGE = 60 * 60    # Cache-Control envoyé aux instances
+
+_PATH = re.compile(r"^/([a-z]{1,3}(?:-[a-z0-9]{1,8})?)/(\d{4})-(\d{2})\.json$")
+
+# -------------------- Format échangé --------------------
+
+def mirror_payload(lang_code, year, month, days):
+    """Corps JSON servi pour un mois : [(date, entrée)] de parse_month_days."""
+    return json.dumps({
+        "language": lang_code,
+        "year": year,
+        "month": month,
+        "days": [
+            {"date": date.isoformat(), "title": entry["title"], "verse": entry["verse"], "body": entry["body"]}
+            for date, entry in days
+        ],
+    }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def parse_mirror_month(year, month, text, log=None):
+    """
+    Pendant de extract.parse_month_days pour un mois servi par le miroir :
+    [(date, entrée brute avec hash)], ou None si le JSON est inutilisable.
+    """
+    try:
+        data = json.loads(text)
+        if (data["year"], data["month"]) != (year, month):
+            raise ValueError(f"mirror sent {data['year']}-{data['month']:02d}")
+        days = []
+        for day in data["days"]:
+            entry = {"title": day["title"], "verse": day["verse"], "body": day["body"]}
+            entry["hash"] = entry_hash(entry)
+            days.append((datetime.date.fromisoformat(day["date"]), entry))
+        return days
+    except (ValueError, KeyError, TypeError) as e:
+        if log:
+            log(f"Unusable mirror data for {year}-{month:02d}: {e}", level="ERROR")
+        return None
+
+# -------------------- Miroir --------------------
+
+class MonthMirror:
+    """
+    Mois analysés, en mémoire et dans <data_dir>/<langue>/<AAAA-MM>.json. Un mois absent ou plus
+    vieux que ttl est retéléchargé (requête conditionnelle) par la première requête qui le demande;
+    les requêtes simultanées pour le même mois attendent ce téléchargement au lieu d'en lancer un autre.
+    upstream : {langue: URL de base} remplaçant lang_config['url'] (serveur de test, autre miroir).
+    """
+
+    def __init__(self, data_dir, upstream=None, ttl=MIRROR_TTL, workers=4, log=None):
+        self.data_dir = data_dir
+        self.upstream = dict(upstream or {})
+        self.ttl = ttl
+        data_dir.mkdir(parents=True, exist_ok=True)
+        self.log = log or (lambda msg, level="INFO": print(f"{level}: {msg}", flush=True))
+        self.http = MonthFetcher(workers=workers, validators_file=data_dir / "http_validators.json")
+        self._months = {}  # clé -> (corps, etag, last_modified, vérifié à (epoch))
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.upstream_requests = 0
+
+    def base_url(self, lang_code):
+        if lang_code in self.upstream:
+            return self.upstream[lang_code]
+        pack = load_language_pack(lang_code)
+        return pack["url"] if pack else None
+
+    def _path(self, lang_code, year, month):
+        return self.data_dir / lang_code / f"{year:04d}-{month:02d}.json"
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _cached(self, key, lang_code, year, month):
+        cached = self._months.get(key)
+        if cached is None:
+            # Mois déjà servi avant un redémarrage du miroir
+            try:
+                with open(self._path(lang_code, year, month), encoding="utf-8") as f:
+                    saved = json.load(f)
+                cached = (saved["body"].encode("utf-8"), saved["etag"], saved["last_modified"], saved["checked"])
+                self._months[key] = cached
+            except (FileNotFoundError, ValueError, KeyError):
+                return None
+        return cached
+
+    def get(self, lang_code, year, month):
+        """(corps, etag, last_modified) du mois, ou None s'il est introuvable."""
+        key = f"{lang_code}/{year:04d}-{month:02d}"
+        cached = self._cached(key, lang_code, year, month)
+        if cached and time.time() - cached[3] < self.ttl:
+            return cached[:3]
+
+        with self._key_lock(key):
+            cached = self._cached(key, lang_code, year, month)
+            if cached and time.time() - cached[3] < self.ttl:
+                return cached[:3]  # téléchargé entre-temps par une autre requête
+            found = self._refresh(key, lang_code, year, month, cached) or cached
+        return found[:3] if found else None
+
+    def _refresh(self, key, lang_code, year, month, cached):
+        base_url = self.base_url(lang_code)
+        if base_url is None:
+            return None
+        doc_id = f"110{year}{200 + month - 1}"  # même doc_id que FetchDailyText.get_doc_id
+        self.upstream_requests += 1
+        result = self.http.fetch(f"{lang_code}/{doc_id}", f"{base_url}{doc_id}", conditional=cached is not None)
+
+        if result.not_modified and cached:
+            return self._keep(key, lang_code, year, month, cached[:3])
+        if not result.ok:
+            # jw.org injoignable : l'ancienne version reste servie
+            self.log(f"Upstream fetch failed for {key}: {result.error or result.status}", level="WARNING")
+            return None
+
+        from extract import parse_month_days
+        days = parse_month_days(year, month, result.text, self.log)
+        if days is None:
+            return None
+        body = mirror_payload(lang_code, year, month, days)
+        etag = f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+        if cached and cached[1] == etag:
+            # Page modifiée (mise en page) mais mêmes textes : les instances gardent leur 304
+            value = cached[:3]
+        else:
+            value = (body, etag, formatdate(usegmt=True))
+            self.log(f"Mirrored {key}: {len(days)} days.")
+        self.http.remember(result)
+        return self._keep(key, lang_code, year, month, value)
+
+    def _keep(self, key, lang_code, year, month, value):
+        body, etag, last_modified = value
+        cached = (body, etag, last_modified, time.time())
+        self._months[key] = cached
+        path = self._path(lang_code, year, month)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(path, {"body": body.decode("utf-8"), "etag": etag,
+                                 "last_modified": last_modified, "checked": cached[3]})
+        return cached
+
+# -------------------- Serveur HTTP --------------------
+
+class MirrorServer:
+    """Serveur HTTP du miroir (thread dédié), utilisable comme gestionnaire de contexte."""
+
+    def __init__(self, mirror, host="0.0.0.0", port=MIRROR_PORT):
+        self.mirror = mirror
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{'127.0.0.1' if host == '0.0.0.0' else host}:{port}"
+
+    def _handler(self):
+        mirror = self.mirror
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                match = _PATH.match(self.path.split("?", 1)[0])
+                if not match or not 1 <= int(match.group(3)) <= 12 or mirror.base_url(match.group(1)) is None:
+                    self.send_error(404)
+                    return
+                found = mirror.get(match.group(1), int(match.group(2)), int(match.group(3)))
+                if found is None:
+                    self.send_error(502, "Month unavailable upstream")
+                    return
+                body, etag, last_modified = found
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", last_modified)
+                self.send_header("Cache-Control", f"public, max-age={CLIENT_MAX_AGE}")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.mirror.http.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LAN mirror for the daily_text apps.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=MIRROR_PORT)
+    parser.add_argument("--data-dir", default=str(store.DATA_DIR / "mirror"))
+    parser.add_argument("--ttl", type=int, default=MIRROR_TTL, help="seconds before a month is revalidated upstream")
+    parser.add_argument("--upstream", action="append", default=[], metavar="LANG=URL",
+                        help="replace lang_config['url'] for one language")
+    args = parser.parse_args()
+
+    from pathlib import Path
+    upstream = dict(item.split("=", 1) for item in args.upstream)
+    server = MirrorServer(MonthMirror(Path(args.data_dir), upstream, args.ttl), args.host, args.port)
+    print(f"Serving daily_text mirror on {server.url}", flush=True)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#profiling.py
+from contextlib import contextmanager, nullcontext
+import cProfile
+import io
+import pstats
+import threading
+import time
+import tracemalloc
+
+import store
+from metrics import METRICS
+
+PROFILE_DIR_NAME = "profiles"
+KEEP_REPORTS = 20    # rapports gardés par cible (les plus anciens sont supprimés)
+REPORT_LINES = 40    # fonctions listées dans le rapport texte
+SUMMARY_LINES = 5    # points chauds et allocations repris dans le journal
+
+_OFF = nullcontext()
+
+# cProfile et tracemalloc sont globaux au processus : un seul profil à la fois,
+# et tracemalloc arrêté une seule fois, par celui qui l'a démarré
+_SESSION = threading.Lock()
+_tracing_lock = threading.Lock()
+_tracing = {"users": 0, "owned": False}
+
+
+def _start_tracing():
+    with _tracing_lock:
+        if _tracing["users"] == 0:
+            _tracing["owned"] = not tracemalloc.is_tracing()
+            if _tracing["owned"]:
+                tracemalloc.start(10)
+        _tracing["users"] += 1
+
+
+def _stop_tracing():
+    with _tracing_lock:
+        _tracing["users"] -= 1
+        if _tracing["users"] == 0 and _tracing["owned"]:
+            tracemalloc.stop()
+            _tracing["owned"] = False
+
+# -------------------- Profilage à la demande --------------------
+
+class Profiler:
+    """
+    Profilage ponctuel demandé depuis Home Assistant (événement DAILY_TEXT_PROFILE) :
+    la prochaine exécution d'une cible armée (run_main, publish_text_tts) tourne sous
+    cProfile et, si demandé, sous tracemalloc. Rapports dans data/profiles/, résumé au journal.
+    Tant que rien n'est armé, profiled() ne coûte qu'une recherche dans un dictionnaire.
+    """
+
+    def __init__(self):
+        self._armed = {}  # cible -> {"memory": bool}
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self):
+        return store.DATA_DIR / PROFILE_DIR_NAME
+
+    def arm(self, target, memory=True):
+        with self._lock:
+            self._armed[target] = {"memory": memory}
+
+    def profiled(self, target, log):
+        """Contexte à placer autour d'une cible : profilage si elle est armée, rien sinon."""
+        if target not in self._armed:
+            return _OFF
+        with self._lock:
+            options = self._armed.pop(target, None)
+        if options is None:
+            return _OFF  # déjà prise par un autre thread
+        return self._profile(target, options["memory"], log)
+
+    @contextmanager
+    def _profile(self, target, memory, log):
+        if not _SESSION.acquire(blocking=False):
+            # Un autre profil tourne : cette exécution passe sans profil, la cible reste armée
+            self.arm(target, memory)
+            log(f"Profile of {target} postponed: another profile is running.")
+            yield
+            return
+        profile = cProfile.Profile()
+        tracing = False
+        before = None
+        start = time.perf_counter()
+        try:
+            if memory:
+                _start_tracing()
+                tracing = True
+                tracemalloc.reset_peak()
+                before = tracemalloc.take_snapshot()
+            start = time.perf_counter()
+            profile.enable()
+            yield
+        finally:
+            profile.disable()
+            elapsed = (time.perf_counter() - start) * 1000
+            after, peak = None, None
+            try:
+                if before is not None:
+                    after = tracemalloc.take_snapshot()
+                    peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                if tracing:
+                    _stop_tracing()
+                _SESSION.release()
+            try:
+                self._report(target, elapsed, profile, before, after, peak, log)
+            except Exception as e:
+                log(f"Could not write the {target} profile: {e}", level="ERROR")
+
+    def _report(self, target, elapsed, profile, before, after, peak, log):
+        directory = self.directory
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        base = directory / f"{stamp}_{target}"
+
+        # .prof : pstats binaire (snakeviz, pstats.Stats); .txt : lecture directe
+        profile.dump_stats(f"{base}.prof")
+        stats = pstats.Stats(profile, stream=io.StringIO()).sort_stats("cumulative")
+        hot = [
+            (func[2] if func[0] == "~" else f"{func[0].rsplit('/', 1)[-1]}:{func[1]}({func[2]})", ct * 1000)
+            for func, (cc, nc, tt, ct, callers) in sorted(stats.stats.items(), key=lambda item: -item[1][3])
+            if func[0] != __file__
+        ]
+        allocations = []
+        if after is not None:
+            ignored = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+            diff = after.filter_traces(ignored).compare_to(before.filter_traces(ignored), "lineno")
+            allocations = [(str(stat.traceback[0]), stat.size_diff / 1024, stat.count_diff) for stat in diff]
+            allocations.sort(key=lambda item: -item[1])
+
+        with open(f"{base}.txt", "w", encoding="utf-8") as f:
+            f.write(f"{target}: {elapsed:.1f} ms\n")
+            if peak is not None:
+                f.write(f"tracemalloc peak: {peak / 1024:.0f} KiB\n")
+            f.write("\nCumulative time\n")
+            stats.stream = f
+            stats.print_stats(REPORT_LINES)
+            if allocations:
+                f.write("\nAllocations (size difference)\n")
+                for line, kib, count in allocations[:REPORT_LINES]:
+                    f.write(f"{kib:10.1f} KiB {count:+8d} blocks  {line}\n")
+        self._prune(target)
+        METRICS.incr("profiles_written")
+
+        summary = "; ".join(f"{name} {ms:.1f} ms" for name, ms in hot[:SUMMARY_LINES])
+        log(f"Profile of {target}: {elapsed:.1f} ms, report {base}.txt. Hot spots: {summary}", level="WARNING")
+        if allocations:
+            top = "; ".join(f"{line} {kib:+.0f} KiB" for line, kib, _ in allocations[:SUMMARY_LINES])
+            log(f"Profile of {target}: peak {peak / 1024:.0f} KiB. Allocations: {top}", level="WARNING")
+
+    def _prune(self, target):
+        for suffix in ("prof", "txt"):
+            reports = sorted(self.directory.glob(f"*_{target}.{suffix}"))
+            for old in reports[:-KEEP_REPORTS]:
+                old.unlink(missing_ok=True)
+
+
+PROFILER = Profiler()
+
+def profile_request(data, targets, log):
+    """
+    Traite un événement DAILY_TEXT_PROFILE pour les cibles d'une app.
+    data : target (une cible ou "all", défaut "all"), memory (défaut True).
+    Retourne les cibles armées.
+    """
+    requested = data.get("target") or "all"
+    armed = [target for target in targets if requested in ("all", target)]
+    for target in armed:
+        PROFILER.arm(target, memory=data.get("memory", True) not in (False, "false", "off", 0))
+    if armed:
+        log(f"Profiling armed for the next {', '.join(armed)}.")
+    return armed
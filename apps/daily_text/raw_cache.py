@@ -0,0 +1,51 @@
+#raw_cache.py
+from pathlib import Path
+import gzip
+import os
+import threading
+
+from store import DATA_DIR
+
+# -------------------- Cache des pages brutes --------------------
+
+class RawPageCache:
+    """
+    Pages mensuelles brutes compressées (data/raw/<lang>/<doc_id>.html.gz).
+    Permet de regénérer les entrées hors ligne quand l'extraction ou les packs de langue changent.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    def _path(self, lang_code, doc_id):
+        return self.root / lang_code / f"{doc_id}.html.gz"
+
+    def put(self, lang_code, doc_id, html):
+        path = self._path(lang_code, doc_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.tmp")
+        with self._lock:
+            with open(tmp, "wb") as f:
+                f.write(gzip.compress(html.encode("utf-8"), compresslevel=6))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+
+    def get(self, lang_code, doc_id):
+        try:
+            with open(self._path(lang_code, doc_id), "rb") as f:
+                return gzip.decompress(f.read()).decode("utf-8")
+        except FileNotFoundError:
+            return None
+
+    def doc_ids(self, lang_code):
+        return sorted(p.name[:-len(".html.gz")] for p in (self.root / lang_code).glob("*.html.gz"))
+
+    def discard(self, lang_code, doc_id):
+        with self._lock:
+            self._path(lang_code, doc_id).unlink(missing_ok=True)
+
+
+def get_raw_cache():
+    return RawPageCache(DATA_DIR / "raw")
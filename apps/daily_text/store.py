@@ -0,0 +1,339 @@
+#store.py
+from pathlib import Path
+import datetime
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from metrics import METRICS
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+MANIFEST_NAME = "manifest.json"
+
+_LEGACY_NAME = re.compile(r"^\d{4}-\d{2}-\d{2}\.json$")
+
+# -------------------- Écriture atomique --------------------
+
+def atomic_write_json(path, obj):
+    """Écrit obj dans path via un fichier temporaire, un seul fsync puis un rename."""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.tmp")
+    data = json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def month_key(date):
+    return f"{date.year:04d}-{date.month:02d}"
+
+def entry_hash(entry):
+    """Empreinte du contenu brut (titre, verset, commentaire), indépendante du rendu."""
+    content = "\x1f".join((entry.get("title", ""), entry.get("verse", ""), entry.get("body", "")))
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=8).hexdigest()
+
+def same_entry(old, new):
+    """Même contenu (hash) et même pack de langue pour le rendu : inutile de réécrire."""
+    if old is None:
+        return False
+    old_hash = old.get("hash") or entry_hash(old)
+    new_hash = new.get("hash") or entry_hash(new)
+    return (old_hash == new_hash
+            and (old.get("rendered") or {}).get("lang_pack") == (new.get("rendered") or {}).get("lang_pack"))
+
+# -------------------- Stockage par mois --------------------
+
+class StoreView:
+    """
+    Vue figée du stockage : manifest et mois décodés d'une même génération.
+    Une écriture publie une nouvelle vue au lieu de modifier celle-ci : un lecteur qui
+    garde une vue voit un état cohérent, même pendant un nettoyage ou un téléchargement,
+    et n'attend un écrivain que pour décoder un mois absent du cache.
+    Les entrées retournées ne doivent pas être modifiées.
+    """
+
+    __slots__ = ("data_dir", "months", "bundles", "generation", "successor", "_lock")
+
+    def __init__(self, data_dir, months, bundles, generation, lock):
+        self.data_dir = data_dir
+        self.months = months      # {AAAA-MM: frozenset(dates iso)}, jamais modifié
+        self.bundles = bundles    # {AAAA-MM: {date iso: entrée}}, complété au fil des lectures
+        self.generation = generation
+        self.successor = None     # vue suivante, posée par l'écriture qui remplace celle-ci
+        self._lock = lock
+
+    def bundle(self, key):
+        bundle = self.bundles.get(key)
+        if bundle is not None:
+            METRICS.incr("entry_cache_hits")
+            return bundle
+        # Sous le verrou des écrivains : le fichier ne peut pas changer entre la recherche et la lecture
+        with self._lock:
+            bundle = self.bundles.get(key)
+            if bundle is None:
+                METRICS.incr("entry_cache_misses")
+                bundle = self._inherited(key)
+                if bundle is None:
+                    try:
+                        with open(self.data_dir / f"{key}.json", encoding="utf-8") as f:
+                            bundle = json.load(f)
+                    except FileNotFoundError:
+                        bundle = {}
+                self.bundles[key] = bundle
+            return bundle
+
+    def _inherited(self, key):
+        """
+        Mois déjà décodé par une vue plus récente où il n'a pas changé (même frozenset).
+        Une écriture décode toujours le mois dans la vue courante avant de remplacer son fichier :
+        si le fichier n'est plus celui de cette vue, l'ancien contenu se trouve dans cette chaîne.
+        """
+        dates = self.months.get(key)
+        view = self.successor
+        while view is not None and view.months.get(key) is dates:
+            bundle = view.bundles.get(key)
+            if bundle is not None:
+                return bundle
+            view = view.successor
+        return None
+
+    def has(self, date):
+        return date.isoformat() in self.months.get(month_key(date), ())
+
+    def dates(self):
+        return sorted(datetime.date.fromisoformat(d) for dates in self.months.values() for d in dates)
+
+    def get(self, date):
+        """Retourne (entrée, erreur). (None, None) si la date n'est pas stockée."""
+        if not self.has(date):
+            return None, None
+        try:
+            return self.bundle(month_key(date)).get(date.isoformat()), None
+        except Exception as e:
+            return None, str(e)
+
+    def month_entries(self, year, month):
+        """Copie modifiable des entrées du mois."""
+        return dict(self.bundle(f"{year:04d}-{month:02d}"))
+
+
+class MonthStore:
+    """
+    Un fichier compact par mois (data/<lang>/<AAAA-MM>.json) et un manifest
+    qui liste les dates présentes. Les vérifications d'existence et le nettoyage
+    se font sur le manifest, sans parcourir le disque.
+
+    Les mois décodés restent en mémoire : les apps d'exposition lisent les entrées
+    sans ouvrir de fichier tant que rien n'a changé. Les lectures passent par la vue
+    courante (StoreView), remplacée d'un bloc par chaque écriture : un lecteur ne voit
+    jamais un mois à moitié écrit ni un manifest en avance sur les fichiers. Chaque écriture incrémente generation, transmise dans
+    DAILY_TEXT_FILES_UPDATED pour détecter une écriture faite par un autre processus.
+    """
+
+    def __init__(self, data_dir):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.data_dir / MANIFEST_NAME
+        self._lock = threading.RLock()
+        self.generation = time.time_ns()  # base unique : deux processus ne partagent pas la même valeur
+        self._manifest_mtime = None
+        self._view = StoreView(self.data_dir, self._load_manifest(), {}, self.generation, self._lock)
+
+    def _load_manifest(self):
+        try:
+            self._manifest_mtime = os.stat(self.manifest_path).st_mtime_ns
+            with open(self.manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            return {m: frozenset(dates) for m, dates in manifest.get("months", {}).items()}
+        except FileNotFoundError:
+            self._manifest_mtime = None
+            return {}
+
+    def _save_manifest(self, months):
+        atomic_write_json(self.manifest_path, {
+            "version": 1,
+            "months": {m: sorted(dates) for m, dates in sorted(months.items())},
+        })
+        self._manifest_mtime = os.stat(self.manifest_path).st_mtime_ns
+
+    def _month_path(self, key):
+        return self.data_dir / f"{key}.json"
+
+    def _read_month(self, key):
+        """Copie modifiable du mois (les écritures ne touchent jamais au cache en place)."""
+        return dict(self._view.bundle(key))
+
+    def _commit(self, changes):
+        """
+        Écrit les mois modifiés {clé: entrées} ({} supprime le mois) puis publie une seule
+        nouvelle vue : un lecteur voit tous les mois d'une écriture changer ensemble. À appeler sous verrou.
+        """
+        view = self._view
+        for key in changes:
+            view.bundle(key)  # l'ancienne vue garde l'ancien contenu avant que le fichier ne change
+        months, bundles = dict(view.months), dict(view.bundles)
+        for key, entries in changes.items():
+            if entries:
+                atomic_write_json(self._month_path(key), entries)
+                months[key] = frozenset(entries)
+                bundles[key] = entries
+            else:
+                self._month_path(key).unlink(missing_ok=True)
+                months.pop(key, None)
+                bundles.pop(key, None)
+        self.generation += 1
+        self._publish(StoreView(self.data_dir, months, bundles, self.generation, self._lock))
+        if months != view.months:
+            self._save_manifest(months)
+
+    def _publish(self, view):
+        self._view.successor = view
+        self._view = view
+
+    # ---- Lecture ----
+
+    def snapshot(self):
+        """Vue courante, à garder pour plusieurs lectures cohérentes entre elles (plage de dates...)."""
+        return self._view
+
+    def has(self, date):
+        return self._view.has(date)
+
+    def dates(self):
+        return self._view.dates()
+
+    def get(self, date):
+        """Retourne (entrée, erreur). (None, None) si la date n'est pas stockée."""
+        return self._view.get(date)
+
+    def month_entries(self, year, month):
+        return self._view.month_entries(year, month)
+
+    # ---- Cache ----
+
+    def refresh(self, generation=None):
+        """
+        Appelé sur DAILY_TEXT_FILES_UPDATED. Si l'événement vient de ce stockage
+        (même generation), le cache est déjà à jour; sinon on vérifie le mtime du
+        manifest et on repart d'une vue vide s'il a changé. Retourne True si vidé.
+        """
+        if generation is not None and generation == self.generation:
+            return False
+        with self._lock:
+            try:
+                mtime = os.stat(self.manifest_path).st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+            if mtime == self._manifest_mtime:
+                return False
+            self._publish(StoreView(self.data_dir, self._load_manifest(), {}, self.generation, self._lock))
+            return True
+
+    # ---- Écriture ----
+
+    def put_month(self, year, month, entries):
+        """
+        Fusionne les entrées {date iso: entrée} dans le fichier du mois.
+        Seuls les jours dont le contenu a changé comptent : si aucun n'a changé,
+        rien n'est écrit. Retourne la liste triée des dates modifiées.
+        """
+        key = f"{year:04d}-{month:02d}"
+        with self._lock:
+            bundle = self._read_month(key)
+            changed = sorted(day for day, entry in entries.items() if not same_entry(bundle.get(day), entry))
+            if not changed:
+                return []
+            for day in changed:
+                bundle[day] = entries[day]
+            self._commit({key: dict(sorted(bundle.items()))})
+        return changed
+
+    def update_entries(self, fn):
+        """Applique fn(entrée) -> entrée|None à chaque entrée; réécrit seulement les mois modifiés. Retourne les dates modifiées."""
+        changed_days = []
+        changes = {}
+        with self._lock:
+            for key in self._view.months:
+                bundle = self._read_month(key)
+                changed = False
+                for day, entry in list(bundle.items()):
+                    updated = fn(entry)
+                    if updated is not None:
+                        bundle[day] = updated
+                        changed = True
+                        changed_days.append(day)
+                if changed:
+                    changes[key] = bundle
+            if changes:
+                self._commit(changes)
+        return sorted(changed_days)
+
+    def prune(self, first_valid, last_valid):
+        """Supprime les dates hors de [first_valid, last_valid[. Retourne les dates supprimées."""
+        removed = []
+        changes = {}
+        with self._lock:
+            for key, dates in self._view.months.items():
+                outdated = sorted(d for d in dates
+                                  if not first_valid <= datetime.date.fromisoformat(d) < last_valid)
+                if not outdated:
+                    continue
+                if len(outdated) == len(dates):
+                    changes[key] = {}
+                else:
+                    bundle = self._read_month(key)
+                    for d in outdated:
+                        bundle.pop(d, None)
+                    changes[key] = bundle
+                removed.extend(outdated)
+            if changes:
+                self._commit(changes)
+        return removed
+
+    # ---- Migration ----
+
+    def migrate_legacy_files(self):
+        """Regroupe les anciens fichiers journaliers AAAA-MM-JJ.json dans les fichiers mensuels (une seule fois)."""
+        legacy = [f for f in self.data_dir.glob("*.json") if _LEGACY_NAME.match(f.name)]
+        if not legacy:
+            return 0
+
+        by_month = {}
+        for file in legacy:
+            try:
+                with open(file, encoding="utf-8") as f:
+                    by_month.setdefault(file.stem[:7], {})[file.stem] = json.load(f)
+            except Exception:
+                continue  # fichier illisible : il sera retéléchargé
+
+        with self._lock:
+            changes = {}
+            for key, entries in by_month.items():
+                bundle = self._read_month(key)
+                for day, entry in entries.items():
+                    bundle.setdefault(day, entry)
+                changes[key] = dict(sorted(bundle.items()))
+            if changes:
+                self._commit(changes)
+
+        for file in legacy:
+            file.unlink(missing_ok=True)
+        return len(legacy)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_store(lang_code):
+    """Stockage partagé par toutes les apps pour une langue (migration des anciens fichiers au premier accès)."""
+    with _stores_lock:
+        store = _stores.get(lang_code)
+        if store is None:
+            store = MonthStore(DATA_DIR / lang_code)
+            store.migrate_legacy_files()
+            _stores[lang_code] = store
+        return store
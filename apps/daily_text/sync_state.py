@@ -0,0 +1,81 @@
+#sync_state.py
+import json
+import threading
+import time
+
+import store
+from store import atomic_write_json
+
+STATE_NAME = "sync_state.json"
+
+# -------------------- État du planificateur --------------------
+
+class SyncState:
+    """
+    Dernière synchronisation complète réussie et fraîcheur de chaque mois
+    (data/sync_state.json, horodatages epoch). Survit aux redémarrages : la cadence
+    hebdomadaire reprend là où elle en était au lieu de repartir de l'heure du démarrage.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.last_sync = None
+        self.months = {}  # "<langue>/<AAAA-MM>" -> dernier téléchargement ou 304
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.last_sync = data.get("last_sync")
+            self.months = data.get("months", {})
+        except (FileNotFoundError, ValueError):
+            pass
+
+    @staticmethod
+    def month_key(lang_code, year, month):
+        return f"{lang_code}/{year:04d}-{month:02d}"
+
+    def save(self):
+        # Écriture sous verrou : deux sauvegardes simultanées partageraient le même fichier temporaire
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_json(self.path, {"last_sync": self.last_sync, "months": self.months})
+
+    def mark_month(self, lang_code, year, month, when=None):
+        with self._lock:
+            self.months[self.month_key(lang_code, year, month)] = when or time.time()
+
+    def month_age(self, lang_code, year, month, now=None):
+        """Secondes depuis le dernier téléchargement ou 304 du mois, None s'il n'a jamais été vérifié."""
+        checked = self.months.get(self.month_key(lang_code, year, month))
+        return None if checked is None else (now or time.time()) - checked
+
+    def mark_sync(self, today, when=None):
+        """
+        Synchronisation complète réussie; les mois antérieurs à today sont oubliés.
+        today vient de l'horloge des apps (local_today), pas du fuseau de la machine.
+        """
+        when = when or time.time()
+        current = f"{today.year:04d}-{today.month:02d}"
+        with self._lock:
+            self.last_sync = when
+            self.months = {key: checked for key, checked in self.months.items() if key.split("/", 1)[1] >= current}
+        self.save()
+
+    def seconds_until_sync(self, interval, now=None):
+        """Délai avant la prochaine synchronisation due (négatif si en retard, None si jamais synchronisé)."""
+        if self.last_sync is None:
+            return None
+        return self.last_sync + interval - (now or time.time())
+
+
+_state = None
+_state_lock = threading.Lock()
+
+def get_sync_state():
+    """État partagé, relu si le dossier de données change."""
+    global _state
+    with _state_lock:
+        path = store.DATA_DIR / STATE_NAME
+        if _state is None or _state.path != path:
+            _state = SyncState(path)
+        return _state
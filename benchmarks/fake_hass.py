@@ -0,0 +1,180 @@
+"""In-memory stand-in for the AppDaemon Hass API used by the daily_text apps.
+
+Apps are instantiated without an AppDaemon runtime: make_app() creates the
+object and binds the Hass methods the apps call (get_state, set_state,
+fire_event, listen_event, run_daily...) to a shared FakeHass. Events are
+dispatched synchronously, or on a pool of worker threads like AppDaemon's
+with workers=N (wait_idle() waits for them; callback exceptions are kept in
+callback_errors). state_delay adds a Home Assistant round trip to every
+set_state. Scheduled callbacks are recorded, not run (cancel_timer replaces
+a recorded timer with None).
+"""
+import datetime
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent / "apps" / "daily_text"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+CONFIG_ENTITY = "sensor.daily_text_configuration"
+
+
+class FakeHass:
+    def __init__(self, language="en", months=1, strip_parentheses=True, now=None, verbose=False,
+                 workers=0, state_delay=0.0):
+        self.states = {}
+        self.events = []
+        self.event_listeners = {}
+        self.state_listeners = {}
+        self.timers = []
+        self.now = now
+        self.verbose = verbose
+        self.state_delay = state_delay
+        self.callback_ms = []
+        self.callback_errors = []
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="fake_hass") if workers else None
+        self._pending = []
+        self._lock = threading.RLock()
+        self.set_config(language=language, months=months, strip_parentheses=strip_parentheses, notify=False)
+
+    # ---- Configuration entity ----
+
+    def set_config(self, notify=True, **attributes):
+        old = self.states.get(CONFIG_ENTITY)
+        attrs = dict(old["attributes"]) if old else {}
+        attrs.update(attributes)
+        languages = ",".join(dict.fromkeys([attrs.get("language"), *(attrs.get("languages") or [])]))
+        new = {"state": f"{languages} / {attrs.get('months')} / {attrs.get('strip_parentheses')}",
+               "attributes": attrs}
+        with self._lock:
+            self.states[CONFIG_ENTITY] = new
+            listeners = list(self.state_listeners.get(CONFIG_ENTITY, ()))
+        if notify:
+            for cb in listeners:
+                cb(CONFIG_ENTITY, "all", old, new)
+
+    # ---- Event dispatch ----
+
+    def _run_callback(self, cb, event, data):
+        start = time.perf_counter()
+        try:
+            cb(event, data, {})
+        except Exception:
+            with self._lock:
+                self.callback_errors.append(f"{getattr(cb, '__name__', cb)} raised on {event}:\n{traceback.format_exc()}")
+        with self._lock:
+            self.callback_ms.append((time.perf_counter() - start) * 1000)
+
+    def dispatch(self, event, data, listeners):
+        if self._pool is None:
+            for cb in listeners:
+                cb(event, data, {})
+            return
+        futures = [self._pool.submit(self._run_callback, cb, event, data) for cb in listeners]
+        with self._lock:
+            self._pending = [f for f in self._pending if not f.done()] + futures
+
+    def wait_idle(self):
+        """Wait until every dispatched callback has run, including those they dispatched."""
+        while True:
+            with self._lock:
+                pending = [f for f in self._pending if not f.done()]
+            if not pending:
+                return
+            for future in pending:
+                future.result()
+
+    def close(self):
+        if self._pool is not None:
+            self.wait_idle()
+            self._pool.shutdown()
+
+    # ---- API bound onto the apps ----
+
+    def api(self, app):
+        hass = self
+
+        def log(msg, level="INFO", **kwargs):
+            if hass.verbose:
+                print(f"[{app.name}] {level}: {msg}")
+
+        def get_state(entity_id=None, attribute=None, **kwargs):
+            with hass._lock:
+                state = hass.states.get(entity_id)
+            if state is None:
+                return None
+            if attribute == "all":
+                return state
+            if attribute:
+                return state["attributes"].get(attribute)
+            return state["state"]
+
+        def set_state(entity_id, state=None, attributes=None, **kwargs):
+            if hass.state_delay:
+                time.sleep(hass.state_delay)
+            with hass._lock:
+                hass.states[entity_id] = {"state": state, "attributes": dict(attributes or {})}
+
+        def fire_event(event, **data):
+            with hass._lock:
+                hass.events.append((event, data))
+                listeners = list(hass.event_listeners.get(event, ()))
+            hass.dispatch(event, data, listeners)
+
+        def listen_event(cb, event=None, **kwargs):
+            with hass._lock:
+                hass.event_listeners.setdefault(event, []).append(cb)
+
+        def listen_state(cb, entity_id=None, **kwargs):
+            with hass._lock:
+                hass.state_listeners.setdefault(entity_id, []).append(cb)
+
+        def schedule(kind):
+            def register(cb, *args, **kwargs):
+                with hass._lock:
+                    hass.timers.append((app.name, kind, cb, args))
+                    return len(hass.timers)
+            return register
+
+        def cancel_timer(handle, **kwargs):
+            # Handles are 1-based positions in hass.timers; a cancelled timer is kept as None
+            with hass._lock:
+                if 0 < handle <= len(hass.timers) and hass.timers[handle - 1] is not None:
+                    hass.timers[handle - 1] = None
+                    return True
+            return False
+
+        def now():
+            return hass.now or datetime.datetime.now()
+
+        return {
+            "log": log,
+            "error": lambda msg, **kwargs: log(msg, level="ERROR"),
+            "get_state": get_state,
+            "set_state": set_state,
+            "fire_event": fire_event,
+            "listen_event": listen_event,
+            "listen_state": listen_state,
+            "run_daily": schedule("run_daily"),
+            "run_every": schedule("run_every"),
+            "run_in": schedule("run_in"),
+            "run_at": schedule("run_at"),
+            "cancel_timer": cancel_timer,
+            "datetime": now,
+        }
+
+
+def make_app(cls, hass, name=None, args=None):
+    """Create an app instance wired to hass, without calling initialize()."""
+    # `name` is a read-only property on the AppDaemon base class: override it in a subclass
+    app_cls = type(cls.__name__, (cls,), {"name": name or cls.__name__})
+    app = app_cls.__new__(app_cls)
+    app.args = dict(args or {})
+    for attr, fn in hass.api(app).items():
+        setattr(app, attr, fn)
+    return app
@@ -0,0 +1,126 @@
+"""Build the month pages used by the benchmark suite.
+
+By default the pages are generated offline with the same layout as the
+wol.jw.org daily text pages (div.scalableui > header/h2, p.themeScrp,
+div.bodyTxt), using book abbreviations from the language packs.
+With --record, real pages are downloaded instead (network required).
+"""
+import argparse
+import html
+import json
+import random
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+LANG_DIR = ROOT.parent / "apps" / "daily_text" / "lang"
+FIXTURES_DIR = ROOT / "fixtures"
+
+# Marks the generated pages, so benchmark results say which kind of fixtures they were measured on
+GENERATOR_META = '<meta name="generator" content="make_fixtures.py">'
+
+# Default recorded month: October 2026 (doc_id 110{year}{200 + month - 1})
+YEAR, MONTH = 2026, 10
+
+WORDS = {
+    "en": ("Jehovah loves us and wants us to be happy . We can draw close to him through prayer "
+           "and study . Our brothers need our support , and we can give it willingly . "
+           "Consider the example of the faithful men and women of old").split(),
+    "fr": ("Jéhovah nous aime et veut que nous soyons heureux . Nous pouvons nous approcher de lui "
+           "par la prière et l’étude . Nos frères ont besoin de notre soutien , et nous pouvons le "
+           "donner de bon cœur . Pensons à l’exemple des hommes et des femmes fidèles d’autrefois").split(),
+}
+DAYS = {
+    "en": ["Thursday", "Friday", "Saturday", "Sunday", "Monday", "Tuesday", "Wednesday"],
+    "fr": ["jeudi", "vendredi", "samedi", "dimanche", "lundi", "mardi", "mercredi"],
+}
+MONTH_NAME = {"en": "October", "fr": "octobre"}
+READ = {"en": "Read", "fr": "Lire"}
+
+
+def doc_id(year, month):
+    return f"110{year}{200 + month - 1}"
+
+
+def sentence(rng, lang):
+    words = rng.sample(WORDS[lang], rng.randint(8, 18))
+    text = " ".join(w for w in words if w not in (".", ","))
+    return html.escape(text[0].upper() + text[1:]) + "."
+
+
+def reference(rng, books):
+    book = rng.choice(books)
+    verses = rng.choice([f"{rng.randint(1, 30)}", f"{rng.randint(1, 9)}, {rng.randint(10, 12)}",
+                         f"{rng.randint(1, 9)}-{rng.randint(10, 20)}"])
+    return f"{book} {rng.randint(1, 40)}:{verses}"
+
+
+def link(ref):
+    return f'<a href="/wol/bc/r1/lp-e/0/0" class="b">{html.escape(ref)}</a>'
+
+
+def day_html(rng, lang, books, day):
+    title = f"{DAYS[lang][(day - 1) % 7]} {day} {MONTH_NAME[lang]}" if lang == "fr" \
+        else f"{DAYS[lang][(day - 1) % 7]}, {MONTH_NAME[lang]} {day}"
+    verse = f'<p class="themeScrp"><em>{sentence(rng, lang)}</em>—{link(reference(rng, books))}.</p>'
+
+    paragraphs = []
+    for _ in range(rng.randint(2, 4)):
+        parts = []
+        for _ in range(rng.randint(3, 6)):
+            parts.append(sentence(rng, lang))
+            r = rng.random()
+            if r < 0.3:
+                parts.append(f"({link(reference(rng, books))})")
+            elif r < 0.45:
+                parts.append(f"({link(reference(rng, books))}; {rng.randint(1, 9)}:{rng.randint(1, 20)})")
+            elif r < 0.55:
+                parts.append(f"{READ[lang]} {link(reference(rng, books))}.")
+        paragraphs.append(f'<p class="sb">{" ".join(parts)}</p>')
+    paragraphs.append(f'<p class="sb"><em>w{rng.randint(20, 25)}.{rng.randint(1, 12):02d}</em> '
+                      f'{rng.randint(2, 30)} ¶{rng.randint(1, 20)}</p>')
+
+    return (f'<header><h2>{title}</h2></header>\n{verse}\n'
+            f'<div class="bodyTxt"><div class="section">{"".join(paragraphs)}</div></div>\n')
+
+
+def generate(lang, year, month):
+    with open(LANG_DIR / f"{lang}.json", encoding="utf-8") as f:
+        pack = json.load(f)
+    books = [b for b in pack["book_names"] if not b.startswith("_")]
+    rng = random.Random(f"{lang}-{year}-{month}")
+
+    days = "".join(day_html(rng, lang, books, day) for day in range(1, 32))
+    return (f'<!DOCTYPE html><html lang="{lang}"><head><meta charset="utf-8">{GENERATOR_META}<title>{doc_id(year, month)}</title></head>'
+            f'<body><nav><ul>{"".join(f"<li><a href=/{i}>Menu {i}</a></li>" for i in range(40))}</ul></nav>'
+            f'<div id="article"><div class="scalableui">\n{days}</div></div>'
+            f'<footer><p>Copyright</p></footer></body></html>\n')
+
+
+def record(lang, year, month):
+    import requests
+    with open(LANG_DIR / f"{lang}.json", encoding="utf-8") as f:
+        url = json.load(f)["url"] + doc_id(year, month)
+    response = requests.get(url, timeout=30)
+    response.raise_for_status()
+    response.encoding = "utf-8"
+    return response.text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--record", action="store_true", help="download the real pages instead of generating them")
+    parser.add_argument("--year", type=int, default=YEAR)
+    parser.add_argument("--month", type=int, default=MONTH)
+    parser.add_argument("--lang", nargs="+", default=["en", "fr"])
+    args = parser.parse_args()
+
+    for lang in args.lang:
+        page = record(lang, args.year, args.month) if args.record else generate(lang, args.year, args.month)
+        path = FIXTURES_DIR / lang / f"{doc_id(args.year, args.month)}.html"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(page, encoding="utf-8")
+        print(f"{path.relative_to(ROOT)}: {len(page.encode())} bytes")
+
+
+if __name__ == "__main__":
+    main()
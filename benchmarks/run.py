@@ -0,0 +1,373 @@
+"""Offline benchmark suite for the daily_text AppDaemon apps.
+
+Times each stage separately against the recorded month pages served by a
+local stand-in server (no network access needed):
+
+  fetch      one month, all configured months at once, 304 revalidation
+  parse      html.parser page parse, extract_clean_text_from_html
+  storage    monthly bundle write, single-day read (cached and uncached)
+  refs       parse_references, replace_bible_references, clean_body, full render
+  publish    ExposeDailyTextLovelace / ExposeDailyTextTTS publish, and the midnight
+             swap to states preloaded the evening before
+  end_to_end run_main cold (empty store) and warm (everything cached and
+             recently checked), restart catch-up, reprocess from the raw page cache
+  api        get_texts for the next 7 and 31 days (DAILY_TEXT_GET_TEXTS)
+  audio      audio cache fill after the 3:30 cleanup with a stub synthesizer, checked:
+             upcoming texts cached, past audio evicted, tts_audio_url published,
+             tomorrow's preloaded states refreshed
+  backfill   one past year into the history archive with 1 and 4 workers
+  search     index update for one month, reference and word queries
+  mirror     run_main cold through the LAN mirror (JSON, no HTML parsing)
+
+Results are written as JSON; --compare prints the median ratio against an
+earlier result file and exits with status 1 on a regression.
+
+    python benchmarks/run.py --output bench.json
+    python benchmarks/run.py --compare bench.json
+"""
+import argparse
+import datetime
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from fake_hass import FakeHass, make_app
+
+from bs4 import BeautifulSoup
+
+import store
+from audio_cache import AudioCache
+from base import PublishQueue, clean_body_text, parse_references, render_entry, replace_bible_references, strip_key
+from expose import ExposeDailyTextLovelace, ExposeDailyTextTTS
+from fetch_month import FetchDailyText
+from http_client import MonthFetcher
+from raw_cache import RawPageCache
+from archive import HistoryArchive
+from search import get_search_index
+from sync_state import SyncState
+from mirror import MirrorServer, MonthMirror
+from lang_pack import LanguagePack, load_language_pack
+from server import FixtureServer
+
+ROOT = Path(__file__).resolve().parent
+SYNTHETIC_MARK = b'<meta name="generator" content="make_fixtures.py">'
+
+
+def stats(samples):
+    samples = sorted(samples)
+    return {
+        "n": len(samples),
+        "min": samples[0],
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "p95": samples[min(len(samples) - 1, round(0.95 * (len(samples) - 1)))],
+        "max": samples[-1],
+    }
+
+
+def measure(fn, repeat, setup=None):
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return stats(samples)
+
+
+class StubSynthesizer:
+    """Stands in for the Wyoming client: fixed bytes, no TTS engine needed."""
+
+    extension = "wav"
+
+    def voice(self, lang_code):
+        return "stub"
+
+    def synthesize(self, text, lang_code):
+        return b"RIFF\x00\x00\x00\x00WAVE"
+
+
+def expect(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+class Bench:
+    """One isolated environment (temp data dir, fake HA, local server) per language."""
+
+    def __init__(self, lang, server, months, repeat):
+        self.lang = lang
+        self.server = server
+        self.months = months
+        self.repeat = repeat
+        self.tmp = Path(tempfile.mkdtemp(prefix=f"daily_text_bench_{lang}_"))
+        self.hass = FakeHass(language=lang, months=months)
+        self.page = next(iter(server.pages[lang].values())).decode("utf-8")
+
+    def reset_storage(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+        self.tmp.mkdir(parents=True)
+        store.DATA_DIR = self.tmp / "data"
+        store._stores.clear()
+
+    def make_fetcher(self):
+        self.reset_storage()
+        app = make_app(FetchDailyText, self.hass, "daily_text_fetch")
+        app.rendered_fingerprints = {}
+        app.changed_dates = {}
+        app.config_timer = None
+        app.http = MonthFetcher(workers=4, validators_file=self.tmp / "http_validators.json")
+        app.raw_cache = RawPageCache(store.DATA_DIR / "raw")
+        app.archive = HistoryArchive(store.DATA_DIR / "archive")
+        app.backfill_http = None
+        app.backfill_failed = set()
+        app.backfill_progress = None
+        app.backfill_unsaved = set()
+        app.backfill_batches = 0
+        app.sync_state = SyncState(store.DATA_DIR / "sync_state.json")
+        app.sync_timer = None
+        app.mirror_url = None
+        app.sync_lock = threading.RLock()
+        app.load_config()
+        pack = app.lang_config
+        # Same fingerprint as the real pack, only the URL points at the local server
+        app.lang_config = LanguagePack(pack.code, {**pack, "url": self.server.url_for(self.lang)}, pack.mtime_ns)
+        app.lang_configs[self.lang] = app.lang_config
+        return app
+
+    def run(self):
+        results = {}
+        app = self.make_fetcher()
+        today = datetime.date.today()
+        month_jobs = []
+        for i in range(self.months):
+            target = app.get_target_date(i)
+            month_jobs.append((app.cache_key(target.year, target.month), app.month_url(target.year, target.month), False))
+
+        # ---- fetch ----
+        results["fetch.month"] = measure(lambda: app.http.fetch(*month_jobs[0]), self.repeat)
+        results[f"fetch.all_{self.months}_months"] = measure(lambda: app.http.fetch_all(month_jobs), self.repeat)
+        first = app.http.fetch(*month_jobs[0])
+        app.http.remember(first)
+        results["fetch.not_modified"] = measure(lambda: app.http.fetch(month_jobs[0][0], month_jobs[0][1], True), self.repeat)
+
+        # ---- parse ----
+        results["parse.html"] = measure(lambda: BeautifulSoup(self.page, "html.parser"), self.repeat)
+        block = BeautifulSoup(self.page, "html.parser").find("div", class_="scalableui")
+        elements = block.find_all(["p", "div"], recursive=False)
+        results["parse.extract"] = measure(lambda: [app.extract_clean_text_from_html(e) for e in elements], self.repeat)
+
+        # ---- storage ----
+        app.parse_month(today.year, today.month, self.page)
+        entries = app.store.month_entries(today.year, today.month)
+        results["storage.write_month"] = measure(lambda: app.store.put_month(today.year, today.month, entries), self.repeat)
+        results["storage.read_day"] = measure(lambda: app.store.get(today), self.repeat)
+        results["storage.read_day_uncached"] = measure(lambda: app.store.get(today), self.repeat,
+                                                       setup=lambda: app.store.snapshot().bundles.clear())
+
+        # ---- refs ----
+        raw = [{k: e[k] for k in ("title", "verse", "body")} for e in entries.values()]
+        pack = load_language_pack(self.lang)
+        results["refs.replace_bible_references"] = measure(
+            lambda: [replace_bible_references(e["verse"] + " " + e["body"], pack, True) for e in raw], self.repeat)
+        results["refs.parse"] = measure(
+            lambda: [parse_references(e["verse"] + " " + e["body"], pack) for e in raw], self.repeat)
+        results["refs.clean_body"] = measure(lambda: [clean_body_text(e["body"], pack) for e in raw], self.repeat)
+        results["refs.render_entry"] = measure(lambda: [render_entry(e, pack) for e in raw], self.repeat)
+
+        # ---- publish ----
+        lovelace = make_app(ExposeDailyTextLovelace, self.hass, "daily_text_lovelace")
+        tts = make_app(ExposeDailyTextTTS, self.hass, "daily_text_tts")
+        for expose in (lovelace, tts):
+            expose.publisher = PublishQueue(expose.publish_one)
+            expose.preloaded = {}
+            expose.load_config_from_entity()
+        tts.audio_cache, tts.synthesizer, tts.audio_days = None, None, 0
+        results["publish.lovelace"] = measure(lambda: lovelace.publish_text({}), self.repeat)
+        results["publish.tts"] = measure(lambda: tts.publish_text_tts({}), self.repeat)
+
+        def preload(expose):
+            # As prepared at PRELOAD_TIME the evening before, so the publish below is the midnight swap
+            return lambda: expose.preloaded.update({code: expose.prepare_states(code, today) for code in expose.languages})
+
+        results["publish.rollover_lovelace"] = measure(lambda: lovelace.publish_text({}), self.repeat, setup=preload(lovelace))
+        results["publish.rollover_tts"] = measure(lambda: tts.publish_text_tts({}), self.repeat, setup=preload(tts))
+
+        # ---- end to end ----
+        holder = {}
+
+        def cold():
+            holder["app"] = self.make_fetcher()
+
+        results["end_to_end.run_main_cold"] = measure(lambda: holder["app"].run_main({}), self.repeat, setup=cold)
+        warm = holder["app"]
+        results["end_to_end.run_main_warm"] = measure(lambda: warm.run_main({}), self.repeat)
+        results["end_to_end.catch_up"] = measure(lambda: warm.catch_up({}), self.repeat)
+        results["end_to_end.reprocess"] = measure(warm.reprocess, self.repeat)
+
+        # ---- lookahead API ----
+        results["api.get_texts_7"] = measure(lambda: warm.get_texts(today, 7), self.repeat)
+        results["api.get_texts_31"] = measure(lambda: warm.get_texts(today, 31), self.repeat)
+
+        # ---- audio ----
+        tomorrow = today + datetime.timedelta(days=1)
+        tts.audio_cache = AudioCache(self.tmp / "www", "/local/daily_text")
+        tts.synthesizer, tts.audio_days = StubSynthesizer(), 2
+        entity = f"sensor.daily_text_tts_{self.lang}"
+
+        def audio_setup():
+            shutil.rmtree(self.tmp / "www", ignore_errors=True)
+            tts.audio_cache.put(self.lang, "0" * 16, "wav", b"past day")
+            # Tomorrow as prepared at PRELOAD_TIME, before its audio exists
+            tts.preloaded = {self.lang: tts.prepare_states(self.lang, tomorrow)}
+
+        def audio_fill():
+            tts.on_cleanup_done("DAILY_TEXT_CLEANUP_DONE", {}, {})
+            while tts.audio_queue:
+                tts.audio_step({})
+
+        results["audio.cleanup_fill"] = measure(audio_fill, self.repeat, setup=audio_setup)
+        cached = {path.name for path in (self.tmp / "www" / self.lang).glob("*.wav")}
+        urls = {}
+        for day in (today, tomorrow):
+            text = tts.get_rendered_entry(warm.store.get(day)[0], self.lang)["tts_full"][strip_key(tts.strip_parentheses)]
+            urls[day] = tts.audio_cache.url(self.lang, AudioCache.key(text, "stub"), "wav")
+        expect(None not in urls.values(), f"audio: upcoming texts not cached ({cached})")
+        expect(cached == {url.rsplit("/", 1)[1] for url in urls.values()}, f"audio: past audio not evicted ({cached})")
+        published = self.hass.states[entity]["attributes"]["tts_audio_url"]
+        expect(published == urls[today], f"audio: {entity} publishes {published!r}, expected {urls[today]!r}")
+        _, _, _, states = tts.preloaded[self.lang]
+        preloaded = {attributes["tts_audio_url"] for _, _, attributes in states}
+        expect(preloaded == {urls[tomorrow]}, f"audio: tomorrow's preloaded states not refreshed ({preloaded})")
+        tts.audio_cache, tts.synthesizer, tts.audio_days = None, None, 0
+        tts.preloaded = {}
+
+        # ---- backfill ----
+        def backfill(workers):
+            def setup():
+                shutil.rmtree(store.DATA_DIR / "archive", ignore_errors=True)
+                warm.archive = HistoryArchive(store.DATA_DIR / "archive")
+                warm.start_backfill(today.year - 1, today.year - 1, [self.lang], workers)
+
+            def run():
+                while warm.run_backfill_batch():
+                    pass
+            return measure(run, self.repeat, setup=setup)
+
+        results["backfill.year_w1"] = backfill(1)
+        results["backfill.year_w4"] = backfill(4)
+
+        # ---- search ----
+        index = get_search_index(self.lang, warm.lang_config)
+        reference = pack["book_names"].get("Ps.", "Psalms") + " 23"
+        results["search.update_month"] = measure(lambda: index.update(entries), self.repeat,
+                                                 setup=lambda: index.remove(list(entries)))
+        results["search.reference"] = measure(lambda: index.search(reference), self.repeat)
+        results["search.words"] = measure(lambda: index.search(raw[0]["title"]), self.repeat)
+
+        # ---- mirror ----
+        with tempfile.TemporaryDirectory() as mirror_dir:
+            mirror = MonthMirror(Path(mirror_dir), {self.lang: self.server.url_for(self.lang)}, log=lambda *a, **k: None)
+            with MirrorServer(mirror, "127.0.0.1", 0) as server:
+                def via_mirror():
+                    holder["app"] = self.make_fetcher()
+                    holder["app"].mirror_url = server.url
+
+                via_mirror()
+                holder["app"].run_main({})  # mirror filled once; every instance after it reads JSON only
+                results["mirror.run_main_cold"] = measure(lambda: holder["app"].run_main({}), self.repeat, setup=via_mirror)
+
+        shutil.rmtree(self.tmp, ignore_errors=True)
+        return results
+
+
+def fixture_source(pages):
+    """"synthetic" if any month page of the language was generated by make_fixtures.py, else "recorded"."""
+    return "synthetic" if any(SYNTHETIC_MARK in page for page in pages.values()) else "recorded"
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return None
+
+
+def compare(current, baseline_file, threshold):
+    with open(baseline_file, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = 0
+    old_fixtures = baseline.get("meta", {}).get("fixtures", {})
+    for lang, source in current["meta"]["fixtures"].items():
+        if old_fixtures.get(lang, source) != source:
+            print(f"warning: {lang} measured on {source} fixtures, baseline on {old_fixtures[lang]} ones")
+    print(f"\n{'stage':<45} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for lang, stages in current["results"].items():
+        for stage, result in stages.items():
+            old = baseline.get("results", {}).get(lang, {}).get(stage)
+            if not old:
+                continue
+            ratio = result["median"] / old["median"] if old["median"] else float("inf")
+            flag = "  REGRESSION" if ratio > threshold else ""
+            regressions += bool(flag)
+            print(f"{lang + ' ' + stage:<45} {old['median'] * 1000:>9.2f}ms {result['median'] * 1000:>9.2f}ms {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lang", nargs="+", default=["en", "fr"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--months", type=int, default=4, help="months fetched by run_main")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added by the local server to each response")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="compare against an earlier JSON result file")
+    parser.add_argument("--threshold", type=float, default=1.25, help="median ratio reported as a regression")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "months": args.months,
+            "latency": args.latency,
+        },
+        "results": {},
+    }
+
+    with FixtureServer(latency=args.latency) as server:
+        for lang in args.lang:
+            report["results"][lang] = Bench(lang, server, args.months, args.repeat).run()
+        report["meta"]["server_hits"] = dict(server.hits)
+        report["meta"]["fixtures"] = {lang: fixture_source(server.pages[lang]) for lang in args.lang}
+
+    synthetic = [lang for lang, source in report["meta"]["fixtures"].items() if source == "synthetic"]
+    if synthetic:
+        print(f"note: generated fixtures for {', '.join(synthetic)}; parse timings do not reflect the real "
+              f"wol.jw.org markup (make_fixtures.py --record replaces them)")
+
+    for lang, stages in report["results"].items():
+        for stage, result in stages.items():
+            print(f"{lang} {stage:<40} median {result['median'] * 1000:9.2f}ms  p95 {result['p95'] * 1000:9.2f}ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare and compare(report, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Local stand-in for wol.jw.org serving the recorded month pages.
+
+Pages are served at the same paths as the real site, e.g.
+/en/wol/d/r1/lp-e/<doc_id>, so download_month can be pointed at it by
+swapping the host in lang_config['url']. Unknown doc_ids fall back to
+the first recorded page of the language, so any month can be fetched.
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parent
+FIXTURES_DIR = ROOT / "fixtures"
+LANG_DIR = ROOT.parent / "apps" / "daily_text" / "lang"
+
+
+def load_pages(fixtures_dir=FIXTURES_DIR):
+    """{lang: {doc_id: bytes}} for every recorded page."""
+    pages = {}
+    for path in sorted(fixtures_dir.glob("*/*.html")):
+        pages.setdefault(path.parent.name, {})[path.stem] = path.read_bytes()
+    return pages
+
+
+def url_prefixes(langs):
+    """{path prefix of lang_config['url']: lang}."""
+    prefixes = {}
+    for lang in langs:
+        with open(LANG_DIR / f"{lang}.json", encoding="utf-8") as f:
+            prefixes[urlsplit(json.load(f)["url"]).path] = lang
+    return prefixes
+
+
+class FixtureServer:
+    """Threaded HTTP server with configurable latency, ETag support and request counters."""
+
+    def __init__(self, latency=0.0, host="127.0.0.1", port=0, fixtures_dir=FIXTURES_DIR):
+        self.latency = latency
+        self.pages = load_pages(fixtures_dir)
+        self.prefixes = url_prefixes(self.pages)
+        self.hits = {"200": 0, "304": 0, "404": 0}
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url_for(self, lang):
+        """Replacement for lang_config['url'] pointing at this server."""
+        for prefix, code in self.prefixes.items():
+            if code == lang:
+                return self.base_url + prefix
+        raise KeyError(lang)
+
+    def _count(self, status):
+        with self._lock:
+            self.hits[status] += 1
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                prefix, _, doc_id = self.path.rpartition("/")
+                lang = server.prefixes.get(prefix + "/")
+                pages = server.pages.get(lang)
+                if not pages:
+                    server._count("404")
+                    self.send_error(404)
+                    return
+
+                body = pages.get(doc_id) or next(iter(pages.values()))
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    server._count("304")
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                server._count("200")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args()
+
+    server = FixtureServer(latency=args.latency, port=args.port)
+    for lang in server.pages:
+        print(f"{lang}: {server.url_for(lang)}<doc_id>")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Startup benchmark for the daily_text AppDaemon apps.
+
+Each sample runs in a fresh interpreter (as after an AppDaemon restart or
+module reload) and times, for one app:
+
+  import      importing the app module (AppDaemon itself is imported first
+              and not counted)
+  initialize  initialize() against the in-memory FakeHass, with an empty
+              temporary data directory
+
+It also reports which heavy third-party modules (bs4, requests,
+dateutil.relativedelta) were loaded by the end of initialize(); the expose apps
+must not load any fetch-side dependency. Those are reported as a failure.
+
+    python benchmarks/startup.py --output startup.json
+    python benchmarks/startup.py --compare startup.json
+"""
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+APPS = {
+    "fetch": ("fetch_month", "FetchDailyText", "daily_text_fetch"),
+    "lovelace": ("expose", "ExposeDailyTextLovelace", "daily_text_lovelace"),
+    "tts": ("expose", "ExposeDailyTextTTS", "daily_text_tts"),
+}
+HEAVY = ("bs4", "requests", "dateutil.relativedelta")
+FETCH_ONLY = ("bs4", "requests")
+
+
+def child(app):
+    """Runs in the fresh interpreter: prints one JSON sample on stdout."""
+    import importlib
+    import tempfile
+    import time
+
+    import appdaemon.plugins.hass.hassapi  # noqa: F401  (baseline, not timed)
+    from fake_hass import FakeHass, make_app
+    baseline = {name for name in HEAVY if name in sys.modules}
+
+    module_name, class_name, app_name = APPS[app]
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    imported = time.perf_counter() - start
+
+    import store
+    with tempfile.TemporaryDirectory(prefix="daily_text_startup_") as tmp:
+        store.DATA_DIR = Path(tmp) / "data"
+        instance = make_app(getattr(module, class_name), FakeHass(), app_name)
+        start = time.perf_counter()
+        instance.initialize()
+        initialized = time.perf_counter() - start
+
+    loaded = [name for name in HEAVY if name in sys.modules and name not in baseline]
+    print(json.dumps({"import": imported, "initialize": initialized, "loaded": loaded}))
+
+
+def sample(app):
+    out = subprocess.check_output([sys.executable, __file__, "--child", app], cwd=ROOT, text=True)
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apps", nargs="+", default=list(APPS), choices=list(APPS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="compare against an earlier JSON result file")
+    parser.add_argument("--threshold", type=float, default=1.25, help="median ratio reported as a regression")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+
+    from run import compare, git_revision, stats
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": {"startup": {}},
+        "loaded": {},
+    }
+    failures = 0
+    for app in args.apps:
+        samples = [sample(app) for _ in range(args.repeat)]
+        for phase in ("import", "initialize"):
+            report["results"]["startup"][f"{app}.{phase}"] = stats([s[phase] for s in samples])
+        loaded = samples[-1]["loaded"]
+        report["loaded"][app] = loaded
+        if app != "fetch" and any(name in loaded for name in FETCH_ONLY):
+            failures += 1
+
+    for stage, result in report["results"]["startup"].items():
+        print(f"{stage:<25} median {result['median'] * 1000:9.2f}ms  p95 {result['p95'] * 1000:9.2f}ms")
+    for app, loaded in report["loaded"].items():
+        print(f"{app:<25} loaded: {', '.join(loaded) or '-'}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if failures:
+        print("Expose apps loaded fetch-side dependencies.")
+    if failures or (args.compare and compare(report, args.compare, args.threshold)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""Event-storm stress test for the daily_text AppDaemon apps.
+
+Runs the fetcher and both expose apps against the in-memory FakeHass and the
+local stand-in server, then lets worker threads hammer them the way an
+AppDaemon worker pool would during a burst. Events are dispatched on the
+FakeHass worker threads and every set_state takes a simulated Home Assistant
+round trip, so publish requests overlap and get coalesced:
+
+  config     option changes (months, extra languages), debounce timers fired at once
+  update     DAILY_TEXT_FILES_UPDATED with and without a generation
+  sync       run_main, catch_up, scheduled_cleanup, reprocess
+  churn      month rewrites with new content and prunes, as a changed page would cause;
+             each rewrite tags the titles and comments with a new generation number
+  publish    the midnight timers of both expose apps
+  timers     any run_in callback the apps scheduled, run as soon as it is recorded
+
+Reader threads meanwhile check every store snapshot for torn reads (a date
+listed in the manifest without its entry, a month file that does not match
+the manifest, an entry whose content does not match its hash) and call
+get_texts. Every published sensor state must come from a single generation
+(title and text carry the same tag), at least one publish request must have
+been coalesced, at the end the published sensors must match the store, and
+the publish latency (request to sensor update) must stay under the bounds.
+Exits with status 1 on any failure.
+
+    python benchmarks/stress.py
+    python benchmarks/stress.py --duration 30 --workers 8 --readers 4
+"""
+import argparse
+import datetime
+import itertools
+import random
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from pathlib import Path
+
+from fake_hass import FakeHass, make_app
+
+import store
+from store import entry_hash, get_store
+from expose import ExposeDailyTextLovelace, ExposeDailyTextTTS
+from fetch_month import FetchDailyText
+from http_client import MonthFetcher
+from raw_cache import RawPageCache
+from metrics import METRICS
+from server import FixtureServer
+
+
+class StressFetcher(FetchDailyText):
+    """Fetcher whose month pages come from the stand-in server for every language."""
+
+    server = None
+
+    def month_url(self, year, month, lang_code=None, pack=None):
+        return f"{self.server.url_for(lang_code or self.lang_code)}{self.get_doc_id(year, month)}"
+
+
+class Storm:
+    def __init__(self, server, args):
+        self.args = args
+        self.server = server
+        self.langs = sorted(server.pages)
+        self.tmp = Path(tempfile.mkdtemp(prefix="daily_text_stress_"))
+        store.DATA_DIR = self.tmp / "data"
+        store._stores.clear()
+        self.hass = FakeHass(language=self.langs[0], months=2, workers=args.hass_workers, state_delay=args.state_delay)
+        self.stop = threading.Event()
+        self.errors = []
+        self.counts = {}
+        self.handler_ms = []
+        self._generations = itertools.count(1)
+        self._lock = threading.Lock()
+
+        StressFetcher.server = server
+        self.fetcher = make_app(StressFetcher, self.hass, "daily_text_fetch")
+        self.lovelace = make_app(ExposeDailyTextLovelace, self.hass, "daily_text_lovelace")
+        self.tts = make_app(ExposeDailyTextTTS, self.hass, "daily_text_tts")
+        for app in (self.fetcher, self.lovelace, self.tts):
+            app.initialize()
+        for app in (self.lovelace, self.tts):
+            app.set_state = self.checked_set_state(app.set_state)
+        # These two resolve DATA_DIR at import time: point them at the temp dir too
+        self.fetcher.http.close()
+        self.fetcher.http = MonthFetcher(workers=4, validators_file=store.DATA_DIR / "http_validators.json")
+        self.fetcher.raw_cache = RawPageCache(store.DATA_DIR / "raw")
+        self.fetcher.run_main({})
+
+    # ---- helpers ----
+
+    def count(self, name):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def fail(self, message):
+        with self._lock:
+            self.errors.append(message)
+
+    def checked_set_state(self, set_state):
+        """set_state that first checks the published text comes from a single churn generation."""
+        def wrapper(entity_id, state=None, attributes=None, **kwargs):
+            attributes = attributes or {}
+            # Lovelace: the comment; TTS: the spoken text, which starts with the title
+            body = attributes.get("comment") or attributes.get("tts_full", "").replace(str(state), "", 1)
+            if body:
+                title_tags, body_tags = set(GENERATION_TAG.findall(str(state))), set(GENERATION_TAG.findall(body))
+                if title_tags != body_tags:
+                    self.fail(f"{entity_id} mixes generations: title {sorted(title_tags)}, text {sorted(body_tags)}")
+                self.count("published")
+            return set_state(entity_id, state=state, attributes=attributes, **kwargs)
+        return wrapper
+
+    def run_timers(self):
+        """Run the recorded run_in callbacks, as AppDaemon would once their delay is over."""
+        due = []
+        with self.hass._lock:
+            for i, timer in enumerate(self.hass.timers):
+                if timer is not None and timer[1] == "run_in":
+                    due.append(timer[2])
+                    self.hass.timers[i] = None
+        for cb in due:
+            cb({})
+        return len(due)
+
+    # ---- actions ----
+
+    def action_config(self, rng):
+        extra = rng.sample(self.langs[1:], rng.randint(0, len(self.langs) - 1))
+        self.hass.set_config(months=rng.randint(1, 3), languages=extra)
+        self.run_timers()
+
+    def action_update(self, rng):
+        lang = rng.choice(self.langs)
+        generation = get_store(lang).generation if rng.random() < 0.5 else None
+        start = time.perf_counter()
+        self.hass.api(self.fetcher)["fire_event"](
+            "DAILY_TEXT_FILES_UPDATED", lang=lang, dates=[datetime.date.today().isoformat()], generation=generation)
+        with self._lock:
+            self.handler_ms.append((time.perf_counter() - start) * 1000)
+
+    def action_sync(self, rng):
+        rng.choice([
+            lambda: self.fetcher.run_main({}),
+            lambda: self.fetcher.catch_up({}),
+            lambda: self.fetcher.scheduled_cleanup({}),
+            self.fetcher.reprocess,
+        ])()
+
+    def action_churn(self, rng):
+        lang = rng.choice(self.langs)
+        target = get_store(lang)
+        view = target.snapshot()
+        if not view.months:
+            return
+        key = rng.choice(sorted(view.months))
+        year, month = int(key[:4]), int(key[5:])
+        if rng.random() < 0.2:
+            # Drop the month (window shrinking); the next sync downloads it again
+            first = datetime.date(year, month, 1)
+            target.prune(datetime.date.min, first)
+            return
+        tag = f"gen{next(self._generations)}"
+        entries = {}
+        for day, entry in view.month_entries(year, month).items():
+            # Title and comment of the same generation; the old render is dropped with them
+            entry = {key: value for key, value in entry.items() if key != "rendered"}
+            entry["title"] = f"{GENERATION_TAG.sub('', entry['title']).rstrip()} {tag}"
+            entry["body"] = f"{tag} {GENERATION_TAG.sub('', entry['body']).lstrip()}"
+            entry["hash"] = entry_hash(entry)
+            entries[day] = entry
+        target.put_month(year, month, entries)
+
+    def action_publish(self, rng):
+        start = time.perf_counter()
+        if rng.random() < 0.5:
+            self.lovelace.publish_text({})
+        else:
+            self.tts.publish_text_tts({})
+        with self._lock:
+            self.handler_ms.append((time.perf_counter() - start) * 1000)
+
+    def action_timers(self, rng):
+        self.run_timers()
+
+    # ---- threads ----
+
+    def worker(self, seed):
+        rng = random.Random(seed)
+        actions = [("config", self.action_config, 1), ("update", self.action_update, 6),
+                   ("sync", self.action_sync, 1), ("churn", self.action_churn, 4), ("publish", self.action_publish, 4),
+                   ("timers", self.action_timers, 2)]
+        names, fns, weights = zip(*actions)
+        while not self.stop.is_set():
+            i = rng.choices(range(len(actions)), weights)[0]
+            try:
+                fns[i](rng)
+            except Exception:
+                self.fail(f"{names[i]} raised:\n{traceback.format_exc()}")
+            self.count(names[i])
+
+    def reader(self, seed):
+        rng = random.Random(seed)
+        today = datetime.date.today()
+        while not self.stop.is_set():
+            lang = rng.choice(self.langs)
+            try:
+                self.check_view(lang, get_store(lang).snapshot())
+                if lang in self.fetcher.lang_configs:
+                    texts = self.fetcher.get_texts(today, 31, lang)
+                    dates = [text["date"] for text in texts]
+                    if dates != sorted(set(dates)):
+                        self.fail(f"get_texts returned unordered dates for {lang}: {dates}")
+            except Exception:
+                self.fail(f"reader raised:\n{traceback.format_exc()}")
+            self.count("read")
+
+    def check_view(self, lang, view):
+        for key, dates in list(view.months.items()):
+            time.sleep(0.0005)  # slow reader: writers get in between the manifest and the month
+            bundle = view.bundle(key)
+            if set(bundle) != dates:
+                self.fail(f"{lang} {key}: month file does not match the manifest "
+                          f"({len(bundle)} entries, {len(dates)} dates)")
+        for date in view.dates():
+            entry, error = view.get(date)
+            if error or entry is None:
+                self.fail(f"{lang} {date}: listed but unreadable ({error})")
+            elif entry.get("hash") != entry_hash(entry):
+                self.fail(f"{lang} {date}: content does not match its hash")
+
+    def check_sensors(self):
+        """After the storm: one last publish must leave every sensor on the stored text."""
+        self.run_timers()
+        self.lovelace.publish_text({})
+        self.tts.publish_text_tts({})
+        today = datetime.date.today()
+        for lang in self.lovelace.languages:
+            entry, _ = get_store(lang).get(today)
+            state = self.hass.states.get(f"sensor.daily_text_lovelace_{lang}")
+            expected = self.lovelace.get_rendered_entry(entry, lang)["lovelace"]["title"] if entry else None
+            if state is None or (expected is not None and state["state"] != expected):
+                self.fail(f"sensor.daily_text_lovelace_{lang} is stale: {state and state['state']!r}")
+
+    def run(self):
+        threads = [threading.Thread(target=self.worker, args=(i,)) for i in range(self.args.workers)]
+        threads += [threading.Thread(target=self.reader, args=(1000 + i,)) for i in range(self.args.readers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(self.args.duration)
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+        self.hass.wait_idle()
+        self.check_sensors()
+        self.hass.close()
+        self.errors += self.hass.callback_errors
+        self.handler_ms += self.hass.callback_ms
+        self.fetcher.terminate()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+GENERATION_TAG = re.compile(r"\bgen\d+\b")
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, round(p / 100 * (len(values) - 1)))] if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10, help="seconds of storm")
+    parser.add_argument("--workers", type=int, default=6, help="threads firing events and timers")
+    parser.add_argument("--readers", type=int, default=2, help="threads checking store snapshots")
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds added by the local server to each response")
+    parser.add_argument("--hass-workers", type=int, default=4, help="FakeHass threads running event callbacks")
+    parser.add_argument("--state-delay", type=float, default=0.002, help="seconds added to each set_state")
+    parser.add_argument("--max-p95", type=float, default=250, help="publish latency p95 bound (ms)")
+    parser.add_argument("--max-latency", type=float, default=2000, help="publish latency max bound (ms)")
+    args = parser.parse_args()
+
+    METRICS.reset()
+    with FixtureServer(latency=args.latency) as server:
+        storm = Storm(server, args)
+        storm.run()
+
+    diagnostics = METRICS.snapshot()
+    p95 = diagnostics.get("publish_latency_ms_p95", 0.0)
+    worst = diagnostics.get("publish_latency_ms_max", 0.0)
+    print(f"actions: {', '.join(f'{name} {n}' for name, n in sorted(storm.counts.items()))}")
+    print(f"publish latency (last {diagnostics.get('publish_latency_ms_count', 0)}): p95 {p95:.1f}ms  max {worst:.1f}ms")
+    print(f"event handler time: p95 {percentile(storm.handler_ms, 95):.1f}ms  max {max(storm.handler_ms, default=0):.1f}ms")
+    print(f"coalesced publish requests: {diagnostics.get('publish_coalesced', 0)}")
+
+    failures = list(storm.errors)
+    if not storm.counts.get("published"):
+        failures.append("no sensor state was published")
+    if not diagnostics.get("publish_coalesced"):
+        failures.append("no publish request was coalesced: the bursts never overlapped")
+    if p95 > args.max_p95:
+        failures.append(f"publish latency p95 {p95:.1f}ms > {args.max_p95}ms")
+    if worst > args.max_latency:
+        failures.append(f"publish latency max {worst:.1f}ms > {args.max_latency}ms")
+    for failure in failures[:20]:
+        print(f"FAIL: {failure}")
+    if failures:
+        print(f"{len(failures)} failures")
+        sys.exit(1)
+    print("OK: no torn reads, no mixed generations, publish latency within bounds")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,156 @@
-from homeassistant.core import HomeAssistant
+import asyncio
+import uuid
+
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError
+import voluptuous as vol
+import homeassistant.helpers.config_validation as cv
 from homeassistant.config_entries import ConfigEntry
-from .const import DOMAIN
+from .const import (
+    DOMAIN, SERVICE_REPROCESS, EVENT_REPROCESS, SERVICE_BACKFILL, EVENT_BACKFILL,
+    SERVICE_SEARCH, EVENT_SEARCH, EVENT_SEARCH_RESULT, SERVICE_GET_TEXTS, EVENT_GET_TEXTS, EVENT_TEXTS,
+    MAX_TEXT_DAYS, SERVICE_PROFILE, EVENT_PROFILE, PROFILE_TARGETS, CONF_MODE, MODE_NATIVE, DEFAULT_MODE,
+    CONF_LANGUAGE, CONF_LANGUAGES, DEFAULT_LANGUAGE,
+)
 
 PLATFORMS = ["sensor"]
+APPDAEMON_TIMEOUT = 10  # secondes d'attente d'une réponse des apps AppDaemon
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
+    async def handle_reprocess(call: ServiceCall) -> None:
+        # Mode natif : on recalcule directement les rendus des coordinateurs
+        for data in hass.data.get(DOMAIN, {}).values():
+            if data.get("coordinator"):
+                await data["coordinator"].async_rerender()
+        # Le fetcher AppDaemon écoute cet événement et regénère les textes depuis son cache
+        hass.bus.async_fire(EVENT_REPROCESS, {})
+
+    hass.services.async_register(DOMAIN, SERVICE_REPROCESS, handle_reprocess)
+
+    async def handle_backfill(call: ServiceCall) -> None:
+        # Archive historique : le fetcher AppDaemon télécharge les années demandées en parallèle
+        hass.bus.async_fire(EVENT_BACKFILL, dict(call.data))
+
+    hass.services.async_register(DOMAIN, SERVICE_BACKFILL, handle_backfill, schema=vol.Schema({
+        vol.Required("start_year"): vol.All(vol.Coerce(int), vol.Range(min=2000, max=2100)),
+        vol.Optional("end_year"): vol.All(vol.Coerce(int), vol.Range(min=2000, max=2100)),
+        vol.Optional("workers", default=4): vol.All(vol.Coerce(int), vol.Range(min=1, max=16)),
+    }))
+
+    async def handle_profile(call: ServiceCall) -> None:
+        # Profilage ponctuel : les apps AppDaemon profilent leur prochaine exécution (rapports dans data/profiles)
+        hass.bus.async_fire(EVENT_PROFILE, dict(call.data))
+
+    hass.services.async_register(DOMAIN, SERVICE_PROFILE, handle_profile, schema=vol.Schema({
+        vol.Optional("target", default="all"): vol.In(PROFILE_TARGETS),
+        vol.Optional("memory", default=True): bool,
+        vol.Optional("run_now", default=False): bool,
+    }))
+
+    async def handle_search(call: ServiceCall) -> dict:
+        query = call.data["query"]
+        limit = call.data["limit"]
+        language = call.data.get("language")
+        # Mode natif : index en mémoire du coordinateur; sinon l'index des apps AppDaemon
+        for data in hass.data.get(DOMAIN, {}).values():
+            if data.get("coordinator"):
+                coordinator = data["coordinator"]
+                results = await coordinator.async_search(query, language, limit)
+                return {"query": query, "language": language or coordinator.language, "results": results}
+        reply = await async_appdaemon_request(hass, EVENT_SEARCH, EVENT_SEARCH_RESULT, {
+            "query": query, "language": language, "limit": limit,
+        })
+        return {"query": query, "language": reply.get("language"), "results": reply.get("results", [])}
+
+    hass.services.async_register(DOMAIN, SERVICE_SEARCH, handle_search, schema=vol.Schema({
+        vol.Required("query"): str,
+        vol.Optional("language"): str,
+        vol.Optional("limit", default=5): vol.All(vol.Coerce(int), vol.Range(min=1, max=50)),
+    }), supports_response=SupportsResponse.ONLY)
+
+    async def handle_get_texts(call: ServiceCall) -> dict:
+        days = call.data["days"]
+        language = call.data.get("language")
+        # Mode natif : entrées déjà rendues, en mémoire dans le coordinateur
+        for data in hass.data.get(DOMAIN, {}).values():
+            if data.get("coordinator"):
+                coordinator = data["coordinator"]
+                start = call.data.get("start") or coordinator.today()
+                return {
+                    "language": language or coordinator.language,
+                    "start": start.isoformat(),
+                    "texts": coordinator.get_texts(start, days, language),
+                }
+        start = call.data.get("start")
+        reply = await async_appdaemon_request(hass, EVENT_GET_TEXTS, EVENT_TEXTS, {
+            "start": start.isoformat() if start else None, "days": days, "language": language,
+        })
+        return {"language": reply.get("language"), "start": reply.get("start"), "texts": reply.get("texts", [])}
+
+    hass.services.async_register(DOMAIN, SERVICE_GET_TEXTS, handle_get_texts, schema=vol.Schema({
+        vol.Optional("start"): cv.date,
+        vol.Optional("language"): str,
+        vol.Optional("days", default=7): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_TEXT_DAYS)),
+    }), supports_response=SupportsResponse.ONLY)
     return True
 
+async def async_appdaemon_request(hass: HomeAssistant, event: str, reply_event: str, data: dict) -> dict:
+    """Envoie un événement aux apps AppDaemon et attend la réponse portant le même request_id."""
+    request_id = uuid.uuid4().hex
+    future = hass.loop.create_future()
+
+    @callback
+    def on_reply(reply):
+        if reply.data.get("request_id") == request_id and not future.done():
+            future.set_result(dict(reply.data))
+
+    unsub = hass.bus.async_listen(reply_event, on_reply)
+    try:
+        hass.bus.async_fire(event, {**data, "request_id": request_id})
+        return await asyncio.wait_for(future, APPDAEMON_TIMEOUT)
+    except asyncio.TimeoutError as err:
+        raise HomeAssistantError(f"No reply to {event} from the AppDaemon apps") from err
+    finally:
+        unsub()
+
+def get_mode(config_entry: ConfigEntry) -> str:
+    return config_entry.options.get(CONF_MODE, config_entry.data.get(CONF_MODE, DEFAULT_MODE))
+
+def get_languages(config_entry: ConfigEntry) -> list:
+    """Langue principale puis langues supplémentaires, sans doublon."""
+    primary = config_entry.options.get(CONF_LANGUAGE, config_entry.data.get(CONF_LANGUAGE, DEFAULT_LANGUAGE))
+    extra = config_entry.options.get(CONF_LANGUAGES, config_entry.data.get(CONF_LANGUAGES, []))
+    return list(dict.fromkeys([primary, *extra]))
+
 async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][config_entry.entry_id] = config_entry.data
+    mode = get_mode(config_entry)
+
+    # Mode natif : le coordinateur télécharge et expose les textes, AppDaemon n'est plus nécessaire
+    coordinator = None
+    if mode == MODE_NATIVE:
+        from .coordinator import DailyTextCoordinator  # bs4 n'est importé qu'en mode natif
+        coordinator = DailyTextCoordinator(hass, config_entry)
+        await coordinator.async_config_entry_first_refresh()
+        config_entry.async_on_unload(coordinator.async_shutdown_listeners)
+
+    hass.data[DOMAIN][config_entry.entry_id] = {
+        "data": config_entry.data,
+        "mode": mode,
+        "coordinator": coordinator,
+    }
 
     # Lance la configuration de la ou des plateformes
     await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
+    config_entry.async_on_unload(config_entry.add_update_listener(async_options_updated))
     return True
 
+async def async_options_updated(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    # En mode AppDaemon le capteur de configuration suffit; sinon (ou si le mode change) on recharge
+    previous = hass.data[DOMAIN].get(config_entry.entry_id, {})
+    if previous.get("mode") == MODE_NATIVE or get_mode(config_entry) == MODE_NATIVE:
+        await hass.config_entries.async_reload(config_entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     # Décharge la ou les plateformes
     unloaded = await hass.config_entries.async_unload_platforms(config_entry, PLATFORMS)
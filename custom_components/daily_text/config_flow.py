@@ -2,8 +2,9 @@
 from homeassistant import config_entries
 from homeassistant.core import callback
 import voluptuous as vol
-from .const import DOMAIN, CONF_LANGUAGE, CONF_MONTHS, CONF_STRIP_PARENTHESES, DEFAULT_STRIP_PARENTHESES
-from .options_flow import DailyTextOptionsFlowHandler
+import homeassistant.helpers.config_validation as cv
+from .const import DOMAIN, CONF_LANGUAGE, CONF_MONTHS, CONF_STRIP_PARENTHESES, DEFAULT_STRIP_PARENTHESES, CONF_MODE, DEFAULT_MODE, CONF_LANGUAGES
+from .options_flow import DailyTextOptionsFlowHandler, MODE_OPTIONS
 
 LANGUAGES = {
     "en": "English",
@@ -23,6 +24,8 @@ class DailyTextConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             vol.Required(CONF_STRIP_PARENTHESES, description={"translation_key": CONF_STRIP_PARENTHESES}, default=DEFAULT_STRIP_PARENTHESES): bool,
             vol.Required(CONF_MONTHS, description={"translation_key": CONF_MONTHS}, default=1): vol.All(vol.Coerce(int), vol.Range(min=1, max=4)),
             vol.Required(CONF_LANGUAGE, description={"translation_key": CONF_LANGUAGE}, default="en"): vol.In(LANGUAGES),
+            vol.Optional(CONF_LANGUAGES, description={"translation_key": CONF_LANGUAGES}, default=[]): cv.multi_select(LANGUAGES),
+            vol.Required(CONF_MODE, description={"translation_key": CONF_MODE}, default=DEFAULT_MODE): vol.In(MODE_OPTIONS),
         })
 
         return self.async_show_form(step_id="user", data_schema=schema)
@@ -2,9 +2,32 @@
 DOMAIN = "daily_text"
 
 CONF_LANGUAGE = "language"
+CONF_LANGUAGES = "languages"  # langues supplémentaires tenues à jour en plus de la langue principale
 CONF_MONTHS = "months"
 CONF_STRIP_PARENTHESES = "read_verses"
 
 DEFAULT_LANGUAGE = "en"
 DEFAULT_MONTHS = 1
 DEFAULT_STRIP_PARENTHESES = True
+
+# Services exposés par l'intégration, relayés vers AppDaemon sous forme d'événements
+SERVICE_REPROCESS = "reprocess"
+EVENT_REPROCESS = "DAILY_TEXT_REPROCESS"
+SERVICE_BACKFILL = "backfill"
+EVENT_BACKFILL = "DAILY_TEXT_BACKFILL"
+SERVICE_SEARCH = "search"
+EVENT_SEARCH = "DAILY_TEXT_SEARCH"
+EVENT_SEARCH_RESULT = "DAILY_TEXT_SEARCH_RESULT"
+SERVICE_GET_TEXTS = "get_texts"
+EVENT_GET_TEXTS = "DAILY_TEXT_GET_TEXTS"
+EVENT_TEXTS = "DAILY_TEXT_TEXTS"
+MAX_TEXT_DAYS = 31
+SERVICE_PROFILE = "profile"
+EVENT_PROFILE = "DAILY_TEXT_PROFILE"
+PROFILE_TARGETS = ["all", "run_main", "publish_text_tts"]
+
+# Mode de fonctionnement : apps AppDaemon (historique) ou intégration autonome
+CONF_MODE = "mode"
+MODE_APPDAEMON = "appdaemon"
+MODE_NATIVE = "native"
+DEFAULT_MODE = MODE_APPDAEMON
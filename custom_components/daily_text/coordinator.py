@@ -0,0 +1,307 @@
+# coordinator.py
+"""Mode natif : téléchargement, extraction et exposition des textes sans AppDaemon."""
+import asyncio
+import calendar
+import datetime
+import logging
+import random
+from datetime import timedelta
+
+import aiohttp
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from . import get_languages
+from .const import (
+    DOMAIN, CONF_MONTHS, CONF_STRIP_PARENTHESES, DEFAULT_MONTHS, DEFAULT_STRIP_PARENTHESES,
+)
+from .parser import get_doc_id, parse_month_page
+from .render import day_texts, load_language_pack, render_entry
+from .search import SearchIndex
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+UPDATE_INTERVAL = timedelta(days=7)
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30)
+RETRIES = 3
+WORKERS = 4  # téléchargements simultanés, toutes langues confondues
+
+
+def entry_option(entry, key, default):
+    """Valeur d'une option (options, puis données d'installation, puis défaut)."""
+    if key in entry.options:
+        return entry.options[key]
+    return entry.data.get(key, default)
+
+
+def add_months(date, offset):
+    """Même jour offset mois plus tard, ramené à la fin du mois si besoin (comme relativedelta)."""
+    month_index = date.month - 1 + offset
+    year, month = date.year + month_index // 12, month_index % 12 + 1
+    return datetime.date(year, month, min(date.day, calendar.monthrange(year, month)[1]))
+
+
+def rerender_entries(entries, pack):
+    """Recalcule le rendu de chaque entrée {date iso: entrée} (appel bloquant, dans l'executor)."""
+    return {day: {**entry, "rendered": render_entry(entry, pack)} for day, entry in entries.items()}
+
+
+class DailyTextCoordinator(DataUpdateCoordinator):
+    """
+    Récupère les pages mensuelles avec la session aiohttp de Home Assistant,
+    les analyse dans l'executor et garde les entrées rendues en mémoire
+    (persistées dans .storage pour qu'un redémarrage ne retélécharge rien).
+    Toutes les langues configurées sont tenues à jour ensemble, sur la même session.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry):
+        # data = génération des entrées : les capteurs ne sont réécrits que si un jour a changé
+        super().__init__(hass, _LOGGER, name=DOMAIN, update_interval=UPDATE_INTERVAL, always_update=False)
+        self.entry = entry
+        self.languages = get_languages(entry)
+        self.language = self.languages[0]
+        self.months = int(entry_option(entry, CONF_MONTHS, DEFAULT_MONTHS))
+        self.strip_parentheses = entry_option(entry, CONF_STRIP_PARENTHESES, DEFAULT_STRIP_PARENTHESES)
+        self.lang_packs = {}
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}")
+        self._entries = {code: {} for code in self.languages}
+        self._search = {}
+        self._validators = {}
+        self._semaphore = asyncio.Semaphore(WORKERS)
+        self._last_sync = None
+        self._generation = 0
+        self.changed_dates = {}
+        self._loaded = False
+        self._unsub_midnight = None
+
+    # ---- Cycle de vie ----
+
+    async def async_setup(self):
+        """Charge les packs de langue et les entrées persistées, puis planifie le passage de minuit."""
+        for code in self.languages:
+            pack = await self.hass.async_add_executor_job(load_language_pack, code)
+            if pack is None:
+                raise UpdateFailed(f"Language file not found for {code}")
+            self.lang_packs[code] = pack
+
+        stored = await self._store.async_load() or {}
+        if "language" in stored:
+            # Ancien format (une seule langue) : entrées et validateurs rangés sous cette langue
+            stored = {
+                **stored,
+                "entries": {stored["language"]: stored.get("entries", {})},
+                "validators": {f"{stored['language']}/{k}": v for k, v in stored.get("validators", {}).items()},
+            }
+        # Les langues retirées de la configuration sont gardées : y revenir ne coûte aucun téléchargement
+        for code, entries in stored.get("entries", {}).items():
+            self._entries[code] = entries
+        self._validators = stored.get("validators", {})
+        last_sync = stored.get("last_sync")
+        self._last_sync = dt_util.parse_datetime(last_sync) if last_sync else None
+
+        # Rendus faits avec un autre pack ou une version précédente du rendu : refaits une seule fois
+        stale_found = False
+        for code in self.languages:
+            pack = self.lang_packs[code]
+            stale = {day: entry for day, entry in self._entries[code].items()
+                     if (entry.get("rendered") or {}).get("lang_pack") != pack.fingerprint}
+            if stale:
+                self._entries[code].update(await self.hass.async_add_executor_job(rerender_entries, stale, pack))
+                stale_found = True
+        if stale_found:
+            await self._async_save()
+
+        # Index de recherche construit une fois depuis les entrées, puis mis à jour jour par jour
+        for code in self.languages:
+            self._search[code] = SearchIndex(self.lang_packs[code])
+            await self.hass.async_add_executor_job(self._search[code].update, dict(self._entries[code]))
+        self._loaded = True
+
+        # Les capteurs changent de texte à minuit, sans attendre le prochain téléchargement
+        self._unsub_midnight = async_track_time_change(
+            self.hass, self._async_midnight, hour=0, minute=0, second=0
+        )
+
+    @callback
+    def async_shutdown_listeners(self):
+        if self._unsub_midnight:
+            self._unsub_midnight()
+            self._unsub_midnight = None
+
+    @callback
+    def _async_midnight(self, now):
+        self._prune(now.date())
+        self.async_update_listeners()
+
+    # ---- Lecture ----
+
+    def today(self):
+        return dt_util.now().date()
+
+    def entry_for(self, date, lang_code=None):
+        return self._entries.get(lang_code or self.language, {}).get(date.isoformat())
+
+    # ---- Mise à jour ----
+
+    async def _async_update_data(self):
+        if not self._loaded:
+            await self.async_setup()
+
+        today = self.today()
+        self._prune(today)
+
+        jobs = []
+        for code in self.languages:
+            for i in range(self.months):
+                target = add_months(today, i)
+                missing = self._is_month_missing(code, target.year, target.month, today)
+                key = f"{code}/{get_doc_id(target.year, target.month)}"
+                # Au démarrage, un mois complet et une synchro récente suffisent : pas de réseau
+                if not missing and (key not in self._validators or not self._sync_due()):
+                    continue
+                jobs.append((code, target.year, target.month, key, not missing))
+
+        self.changed_dates = {}
+        if jobs:
+            results = await asyncio.gather(*(self._async_fetch(*job) for job in jobs))
+            for (code, year, month, key, _), (status, html, validators) in zip(jobs, results):
+                if status == 304 or html is None:
+                    continue
+                current = self._entries[code]
+                entries = await self.hass.async_add_executor_job(
+                    parse_month_page, html, year, month, today, self.lang_packs[code], current
+                )
+                if entries is None:
+                    _LOGGER.error("Could not locate main content block for %s %s-%02d", code, year, month)
+                    continue
+                changed = [day for day, entry in entries.items() if current.get(day) is not entry]
+                if changed:
+                    current.update(entries)
+                    self.changed_dates.setdefault(code, []).extend(sorted(changed))
+                    await self.hass.async_add_executor_job(
+                        self._search[code].update, {day: entries[day] for day in changed}
+                    )
+                if validators:
+                    self._validators[key] = validators
+            if self.changed_dates:
+                self._generation += 1
+            # Synchro comptée seulement si le site a répondu (200 ou 304) au moins une fois :
+            # réseau coupé, les mois complets seront revalidés au prochain rafraîchissement
+            if not any(status in (200, 304) for status, _, _ in results):
+                if any(not conditional for *_, conditional in jobs):
+                    raise UpdateFailed("Could not download the daily texts: every request failed")
+                _LOGGER.warning("Could not revalidate the daily texts: every request failed")
+                return self._generation
+            self._last_sync = dt_util.utcnow()
+            await self._async_save()
+
+        return self._generation
+
+    def _sync_due(self):
+        return self._last_sync is None or dt_util.utcnow() - self._last_sync >= UPDATE_INTERVAL
+
+    def _is_month_missing(self, lang_code, year, month, today):
+        entries = self._entries[lang_code]
+        day = max(today, datetime.date(year, month, 1))
+        while day.month == month:
+            if day.isoformat() not in entries:
+                return True
+            day += timedelta(days=1)
+        return False
+
+    def _prune(self, today):
+        first, last = today.isoformat(), add_months(today, self.months).isoformat()
+        for code, entries in self._entries.items():
+            outdated = [k for k in entries if not first <= k < last]
+            for key in outdated:
+                del entries[key]
+            if outdated and code in self._search:
+                self._search[code].remove(outdated)
+
+    async def _async_fetch(self, lang_code, year, month, key, conditional):
+        """Retourne (statut, html, validateurs). Réessaie avec un backoff exponentiel aléatoire."""
+        async with self._semaphore:
+            return await self._async_fetch_url(
+                f"{self.lang_packs[lang_code]['url']}{key.split('/', 1)[1]}",
+                year, month, self._validators.get(key) if conditional else None,
+            )
+
+    async def _async_fetch_url(self, url, year, month, validators):
+        headers = {}
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        session = async_get_clientsession(self.hass)
+        for attempt in range(RETRIES + 1):
+            try:
+                async with session.get(url, headers=headers, timeout=REQUEST_TIMEOUT) as response:
+                    if response.status == 304:
+                        return 304, None, None
+                    if response.status < 500 and response.status != 429:
+                        response.raise_for_status()
+                        html = await response.text(encoding="utf-8")
+                        return response.status, html, {
+                            "etag": response.headers.get("ETag"),
+                            "last_modified": response.headers.get("Last-Modified"),
+                        }
+                    error = f"HTTP {response.status}"
+            except aiohttp.ClientResponseError as err:
+                _LOGGER.error("Failed to fetch page for %s-%02d: %s", year, month, err)
+                return err.status, None, None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                error = str(err) or type(err).__name__
+            if attempt < RETRIES:
+                await asyncio.sleep(random.uniform(0, 2 ** attempt))
+
+        _LOGGER.error("Failed to fetch page for %s-%02d: %s", year, month, error)
+        return 0, None, None
+
+    async def async_search(self, query, lang_code=None, limit=10):
+        """Recherche plein texte dans les entrées en mémoire (service search en mode natif)."""
+        lang_code = lang_code or self.language
+        index = self._search.get(lang_code)
+        if index is None:
+            return []
+        results = await self.hass.async_add_executor_job(index.search, query, limit)
+        for result in results:
+            entry = self._entries[lang_code].get(result["date"]) or {}
+            result["verse"] = entry.get("verse", "").replace("(*", "(").replace("*)", ")")
+        return results
+
+    def get_texts(self, start, days, lang_code=None):
+        """Textes rendus de start à start + days - 1, depuis les entrées en mémoire (jours absents omis)."""
+        entries = self._entries.get(lang_code or self.language, {})
+        texts = []
+        for offset in range(days):
+            date = start + timedelta(days=offset)
+            entry = entries.get(date.isoformat())
+            if entry is not None:
+                texts.append(day_texts(date, entry["rendered"], self.strip_parentheses))
+        return texts
+
+    async def async_rerender(self):
+        """Recalcule les rendus stockés (service reprocess en mode natif)."""
+        for code in self.languages:
+            pack = await self.hass.async_add_executor_job(load_language_pack, code)
+            if pack is None:
+                continue
+            self.lang_packs[code] = pack
+            self._entries[code] = await self.hass.async_add_executor_job(rerender_entries, dict(self._entries[code]), pack)
+        self._generation += 1
+        await self._async_save()
+        self.async_update_listeners()
+
+    async def _async_save(self):
+        await self._store.async_save({
+            "last_sync": self._last_sync.isoformat() if self._last_sync else None,
+            "validators": self._validators,
+            "entries": self._entries,
+        })
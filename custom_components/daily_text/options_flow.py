@@ -2,8 +2,9 @@
 from homeassistant import config_entries
 from homeassistant.core import callback
 import voluptuous as vol
+import homeassistant.helpers.config_validation as cv
 
-from .const import CONF_LANGUAGE, CONF_MONTHS, CONF_STRIP_PARENTHESES
+from .const import CONF_LANGUAGE, CONF_MONTHS, CONF_STRIP_PARENTHESES, CONF_MODE, DEFAULT_MODE, MODE_APPDAEMON, MODE_NATIVE, CONF_LANGUAGES
 
 # Dictionnaire des langues disponibles (clé = code langue, valeur = label visible)
 LANGUAGE_OPTIONS = {
@@ -11,6 +12,12 @@ LANGUAGE_OPTIONS = {
     "fr": "Français",
 }
 
+# Modes de fonctionnement (apps AppDaemon ou intégration autonome)
+MODE_OPTIONS = {
+    MODE_APPDAEMON: "AppDaemon",
+    MODE_NATIVE: "Native",
+}
+
 # Class gérant les options après l'installation
 class DailyTextOptionsFlowHandler(config_entries.OptionsFlow):
     """Handle a config options flow for DailyText."""
@@ -27,6 +34,8 @@ class DailyTextOptionsFlowHandler(config_entries.OptionsFlow):
         # Valeurs actuelles (depuis les options, ou les données de config d’origine si options absentes)
         current_language = self.config_entry.options.get(CONF_LANGUAGE, self.config_entry.data.get(CONF_LANGUAGE, "en"))
         current_months = self.config_entry.options.get(CONF_MONTHS, self.config_entry.data.get(CONF_MONTHS, 1))
+        current_languages = self.config_entry.options.get(CONF_LANGUAGES, self.config_entry.data.get(CONF_LANGUAGES, []))
+        current_mode = self.config_entry.options.get(CONF_MODE, self.config_entry.data.get(CONF_MODE, DEFAULT_MODE))
         current_strip = self.config_entry.options.get(CONF_STRIP_PARENTHESES, self.config_entry.data.get(CONF_STRIP_PARENTHESES, True))
 
         return self.async_show_form(
@@ -35,5 +44,7 @@ class DailyTextOptionsFlowHandler(config_entries.OptionsFlow):
                 vol.Required(CONF_STRIP_PARENTHESES, description={"translation_key": CONF_STRIP_PARENTHESES}, default=current_strip): bool,
                 vol.Required(CONF_MONTHS, description={"translation_key": CONF_MONTHS}, default=current_months): vol.All(vol.Coerce(int), vol.Range(min=1, max=4)),
                 vol.Required(CONF_LANGUAGE, description={"translation_key": CONF_LANGUAGE}, default=current_language): vol.In(LANGUAGE_OPTIONS),
+                vol.Optional(CONF_LANGUAGES, description={"translation_key": CONF_LANGUAGES}, default=current_languages): cv.multi_select(LANGUAGE_OPTIONS),
+                vol.Required(CONF_MODE, description={"translation_key": CONF_MODE}, default=current_mode): vol.In(MODE_OPTIONS),
             })
         )
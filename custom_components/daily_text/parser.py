@@ -0,0 +1,107 @@
+# parser.py
+"""Extraction des textes du jour d'une page mensuelle (mode natif, exécuté dans l'executor).
+
+Même logique que apps/daily_text/extract.py et FetchDailyText.extract_month_entries.
+"""
+import datetime
+import hashlib
+
+from bs4 import BeautifulSoup, CData, NavigableString
+
+from .render import render_entry
+
+# Types de chaînes gardés par get_text() (les commentaires, scripts, etc. sont ignorés)
+TEXT_TYPES = (NavigableString, CData)
+
+_END = object()
+
+def get_doc_id(year, month):
+    month_index = month - 1  # 0-based
+    return f"110{year}{200 + month_index}"
+
+def entry_hash(entry):
+    """Empreinte du contenu brut (titre, verset, commentaire), indépendante du rendu."""
+    content = "\x1f".join((entry.get("title", ""), entry.get("verse", ""), entry.get("body", "")))
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=8).hexdigest()
+
+def extract_clean_text(element):
+    """
+    Transforme un bloc HTML en texte propre en un seul parcours de l'arbre.
+    Un lien <a> est remplacé par (*texte*) sauf si la dernière parenthèse vue avant lui,
+    parmi les chaînes de même niveau, est une parenthèse ouvrante.
+    """
+    pieces = []
+    # Pile de (enfants restant à parcourir, [dernière parenthèse vue à ce niveau])
+    stack = [(iter((element,)), [None])]
+
+    while stack:
+        children, paren = stack[-1]
+        child = next(children, _END)
+        if child is _END:
+            stack.pop()
+            continue
+
+        if isinstance(child, NavigableString):
+            if type(child) in TEXT_TYPES:
+                pieces.append(child)
+            last = max(child.rfind("("), child.rfind(")"))
+            if last >= 0:
+                paren[0] = child[last]
+            continue
+
+        if child.name == "a" and child.string and paren[0] != "(":
+            pieces.append(f"(*{child.string}*)")
+            paren[0] = ")"
+            continue
+
+        stack.append((iter(child.contents), [None]))
+
+    return " ".join("".join(pieces).split())
+
+def parse_month_page(html, year, month, today, lang_pack, stored=None):
+    """
+    Retourne {date iso: entrée rendue} pour les jours du mois à partir de today,
+    ou None si le bloc principal est introuvable. Une entrée de stored au contenu
+    identique (même hash, même pack de langue) est reprise telle quelle, sans nouveau rendu.
+    """
+    stored = stored or {}
+    fingerprint = getattr(lang_pack, "fingerprint", None)
+    soup = BeautifulSoup(html, "html.parser")
+    content_block = soup.find("div", class_="scalableui")
+    if not content_block:
+        return None
+
+    elements = content_block.find_all(["header", "p", "div"], recursive=False)
+    day = 1
+    i = 0
+    entries = {}
+
+    while i < len(elements) - 2:
+        h, p, d = elements[i], elements[i + 1], elements[i + 2]
+        if not (h.name == "header" and h.find("h2") and p.name == "p" and d.get("class") == ["bodyTxt"]):
+            i += 1
+            continue
+
+        try:
+            date = datetime.date(year, month, day)
+        except ValueError:
+            break
+        day += 1
+        i += 3
+        if date < today:
+            continue  # Ignore les jours passés
+
+        entry = {
+            "title": h.find("h2").get_text().replace("\u00A0", " ").strip(),
+            "verse": extract_clean_text(p),
+            "body": extract_clean_text(d),
+        }
+        entry["hash"] = entry_hash(entry)
+        previous = stored.get(date.isoformat())
+        if previous and previous.get("hash") == entry["hash"] and previous.get("rendered", {}).get("lang_pack") == fingerprint:
+            entry = previous
+        else:
+            entry["rendered"] = render_entry(entry, lang_pack)
+        entries[date.isoformat()] = entry
+
+    return entries
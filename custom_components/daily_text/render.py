@@ -0,0 +1,387 @@
+# render.py
+"""Conversion des références bibliques et rendu Lovelace / TTS (mode natif).
+
+Copie du moteur des apps AppDaemon (apps/daily_text/base.py et lang_pack.py) :
+l'intégration et les apps sont distribuées séparément par HACS.
+"""
+from collections.abc import Mapping
+from pathlib import Path
+from types import MappingProxyType
+import json
+import re
+
+LANG_DIR = Path(__file__).resolve().parent / "lang"
+
+_END = ""  # clé marquant la fin d'une abréviation dans le trie (jamais un caractère)
+RENDER_VERSION = 4  # à incrémenter quand le contenu du rendu change : les rendus stockés sont alors refaits
+
+# -------------------- Trie des livres --------------------
+
+class BookTrie:
+    """Arbre de préfixes des noms de livres : la recherche coûte la longueur de la référence."""
+
+    __slots__ = ("_root",)
+
+    def __init__(self, book_names):
+        root = {}
+        for book in book_names:
+            node = root
+            for c in book:
+                node = node.setdefault(c, {})
+            node[_END] = book
+        self._root = root
+
+    def longest_prefix(self, text):
+        """Retourne le nom de livre le plus long qui commence text, ou None."""
+        node = self._root
+        found = node.get(_END)
+        for c in text:
+            node = node.get(c)
+            if node is None:
+                break
+            if _END in node:
+                found = node[_END]
+        return found
+
+# -------------------- Pack de langue compilé --------------------
+
+class LanguagePack(Mapping):
+    """
+    Fichier lang/<code>.json chargé une seule fois, en lecture seule.
+    Se comporte comme le dict d'origine (lang_config["to"], .get(...)) et
+    embarque le trie des livres pour la conversion des références.
+    """
+
+    def __init__(self, code, data, mtime_ns=0):
+        data = dict(data)
+        data["book_names"] = MappingProxyType(dict(data.get("book_names", {})))
+        self.code = code
+        self.mtime_ns = mtime_ns
+        self.fingerprint = f"{code}:{mtime_ns}:{RENDER_VERSION}"
+        self._data = MappingProxyType(data)
+        self._books = BookTrie(data["book_names"])
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def match_book(self, text):
+        return self._books.longest_prefix(text)
+
+
+def load_language_pack(lang_code):
+    """Charge lang/<code>.json (appel bloquant, à faire dans l'executor). None si absent."""
+    lang_file = LANG_DIR / f"{lang_code}.json"
+    try:
+        mtime_ns = lang_file.stat().st_mtime_ns
+        with open(lang_file, encoding="utf-8") as f:
+            return LanguagePack(lang_code, json.load(f), mtime_ns)
+    except FileNotFoundError:
+        return None
+
+def match_book(text, lang_config):
+    return lang_config.match_book(text)
+
+# -------------------- Fonctions utilitaires --------------------
+
+def body_cut(text: str, lang_config) -> int:
+    """Position de coupe de clean_body : juste après le n-ième point en partant de la fin."""
+    threshold = lang_config.get("tts_split_threshold", 3)  # valeur par défaut à 3
+    point_positions = [m.start() for m in re.finditer(r'\.', text)] # Trouver tous les points finaux dans la chaîne
+    if len(point_positions) < threshold:
+        return len(text)  # Pas assez de points, on ne modifie rien
+    return point_positions[-threshold] + 1 # On garde tout jusqu'au 3ᵉ point en partant de la fin
+
+def clean_body_text(text: str, lang_config) -> str:
+    """Version de clean_body utilisable hors d'une app (rendu au moment du téléchargement)."""
+    return text[:body_cut(text, lang_config)].strip()
+
+def clean_part(text):# Nettoyage des espaces insécables
+    text = text.replace('\u00A0', ' ')
+    if not text.isprintable():
+        text = ''.join(c for c in text if c.isprintable())
+    return text.strip()
+
+def is_next_verse(a, b):
+    try:
+        return int(a) + 1 == int(b)
+    except ValueError:
+        return False  # Conversion impossible
+
+# -------------------- Références bibliques --------------------
+
+_GROUP = re.compile(r'\(([^()]+)\)')
+
+class Reference:
+    """
+    Une référence d'un groupe entre parenthèses, telle qu'écrite : livre (abréviation
+    du pack, None si non reconnu), chapitre (None si seuls des versets sont cités) et
+    versets [(début, fin ou None)]. carried : livre repris de la référence précédente ("Ps. 23:1; 24:2").
+    """
+
+    __slots__ = ("text", "book", "chapter", "verses", "carried")
+
+    def __init__(self, text, book=None, chapter=None, verses=(), carried=False):
+        self.text = text
+        self.book = book
+        self.chapter = chapter
+        self.verses = verses
+        self.carried = carried
+
+    def as_dict(self, lang_config):
+        """Forme publiée dans l'attribut references (nombres convertis quand c'est possible)."""
+        def number(value):
+            return int(value) if value and value.isdigit() else value
+        return {
+            "text": self.text,
+            "book": lang_config["book_names"][self.book],
+            "chapter": number(self.chapter.strip()) if self.chapter is not None else None,
+            "verses": [[number(start), number(end if end is not None else start)] for start, end in self.verses],
+        }
+
+class RefGroup:
+    """Groupe "(...)" du texte : ses références, et s'il s'agit d'un lien "(*...*)"."""
+
+    __slots__ = ("raw", "refs", "link", "_speech")
+
+    def __init__(self, raw, refs, link):
+        self.raw = raw
+        self.refs = refs
+        self.link = link
+        self._speech = None
+
+    def speech(self, lang_config):
+        """Lecture du groupe (calculée une fois) : en ligne pour un lien, sinon ". ( ... )"."""
+        if self._speech is None:
+            spoken = "; ".join(spoken_reference(ref, lang_config) for ref in self.refs)
+            self._speech = f" {spoken}" if self.link else f". ( {spoken} )"
+        return self._speech
+
+def parse_reference(part, lang_config, last_book):
+    """Une référence d'un groupe (déjà nettoyée); last_book sert si aucun livre n'est cité."""
+    book = match_book(part, lang_config)  # plus long préfixe, via le trie du pack
+    carried = book is None
+    if carried:
+        if not last_book:
+            return Reference(part)  # Livre inconnu ou impossible à reconstruire
+        book = last_book
+        rest = part
+    else:
+        rest = part[len(book):].strip()
+
+    chapter = None  # cas rare : versets seul
+    if ':' in rest:
+        chapter, rest = rest.split(":", 1)
+
+    # Versets : "1, 2, 5-7" -> [("1", "2"), ("5", "7")]; deux versets consécutifs forment une plage
+    items = [v.strip() for v in rest.strip().split(",")]
+    verses = []
+    i = 0
+    while i < len(items):
+        if i + 1 < len(items) and is_next_verse(items[i], items[i + 1]):
+            verses.append((items[i], items[i + 1]))
+            i += 2
+            continue
+        if "-" in items[i]:
+            start, end = [v.strip() for v in items[i].split("-", 1)]
+            verses.append((start, end))
+        else:
+            verses.append((items[i], None))
+        i += 1
+    return Reference(part, book, chapter, verses, carried)
+
+def parse_references(text, lang_config):
+    """
+    Découpe le texte en une suite de morceaux de texte (str) et de groupes de références
+    (RefGroup), en un seul passage : chaque groupe "(...)" est analysé une fois, puis
+    le rendu TTS, l'affichage Lovelace et l'attribut references en sont tirés.
+    """
+    nodes = []
+    position = 0
+    for match in _GROUP.finditer(text):
+        if match.start() > position:
+            nodes.append(text[position:match.start()])
+        content = match.group(1)
+        refs, last_book = [], None
+        for part in content.strip().split(";"):
+            ref = parse_reference(clean_part(part.strip("* ")), lang_config, last_book)
+            if ref.book and not ref.carried:
+                last_book = ref.book
+            refs.append(ref)
+        nodes.append(RefGroup(match.group(0), refs, "*" in content))
+        position = match.end()
+    if position < len(text):
+        nodes.append(text[position:])
+    return nodes
+
+def truncate_references(nodes, cut):
+    """Morceaux correspondant à text[:cut].strip() (un groupe coupé redevient du texte)."""
+    kept, position = [], 0
+    for node in nodes:
+        if position >= cut:
+            break
+        raw = node.raw if isinstance(node, RefGroup) else node
+        if position + len(raw) <= cut:
+            kept.append(node)
+        else:
+            kept.append(raw[:cut - position])
+        position += len(raw)
+    if kept and isinstance(kept[0], str):
+        kept[0] = kept[0].lstrip()
+    if kept and isinstance(kept[-1], str):
+        kept[-1] = kept[-1].rstrip()
+    return kept
+
+def spoken_reference(ref, lang_config):
+    if ref.book is None:
+        return ref.text
+    long_book = lang_config["book_names"][ref.book]
+    chapter = f"{long_book} {ref.chapter}, " if ref.chapter is not None else ""
+
+    joined = [f"{start} {lang_config['to']} {end}" if end is not None else start for start, end in ref.verses]
+    if len(joined) > 1:
+        joined_text = f"{lang_config['verse_plural']} {', '.join(joined[:-1])} {lang_config['and']} {joined[-1]}"
+    else:
+        joined_text = f"{lang_config['verse_singular']} {joined[0]}"
+
+    spoken = f"{chapter}{joined_text}"
+    if ref.carried:
+        # Même livre, mais nouveau chapitre : "puis chapitre" pour un TTS fluide
+        spoken = spoken.replace(long_book, lang_config["then_chapter"], 1)
+    return spoken
+
+def spoken_text(nodes, lang_config, preserve_non_starred=True):
+    """Texte lu : références converties en toutes lettres, sans les groupes non cliquables si demandé."""
+    parts = []
+    for node in nodes:
+        if isinstance(node, str):
+            parts.append(node)
+        elif node.link or preserve_non_starred:
+            parts.append(node.speech(lang_config))
+    return "".join(parts)
+
+def display_text(nodes):
+    """Texte affiché (Lovelace) : les références restent telles qu'écrites, sans le balisage des liens."""
+    return "".join(strip_link_marks(node if isinstance(node, str) else node.raw) for node in nodes)
+
+def references_attribute(nodes, lang_config):
+    """Références reconnues, dans l'ordre du texte (attribut references des capteurs)."""
+    return [
+        {**ref.as_dict(lang_config), "link": node.link}
+        for node in nodes if isinstance(node, RefGroup)
+        for ref in node.refs if ref.book is not None
+    ]
+
+def replace_bible_references(text, lang_config, preserve_non_starred=True):
+    return spoken_text(parse_references(text, lang_config), lang_config, preserve_non_starred)
+
+
+
+# -------------------- Rendu des textes --------------------
+
+def strip_link_marks(text):
+    """Retire le balisage (*...*) des liens pour l'affichage Lovelace."""
+    return text.replace("(*", "").replace("*)", "")
+
+def render_tts(title, verse, body, lang_config, strip_parentheses):
+    """title, puis verse et body déjà analysés par parse_references."""
+    tts = f"{title}\n{spoken_text(verse, lang_config, True)}\n{spoken_text(body, lang_config, strip_parentheses)}"
+    if not tts.endswith("."):
+        tts += "."
+    return tts
+
+# Saut de ligne et bords de référence : toujours une coupure.
+_CHUNK_BREAK = re.compile(r"\n+|\s+(?=\()|(?<=\))\s*")
+# Fin de phrase possible : point (éventuellement suivi d'un guillemet fermant, « Venez. ») puis espaces.
+# Un point collé à une majuscule ("verset 6.Nous") vient d'un lien suivi du commentaire : c'est aussi une fin de phrase.
+_SENTENCE_END = re.compile(r"(?<=[.!?])(?P<quote>(?:\s?[\"”»’])?)\s+|(?<=[a-zà-ÿ\d][.!?])(?=[A-ZÀ-ÖØ-Þ])")
+_NEXT_CAPITAL = re.compile(r"(?:[\"“«‘—–]\s?)?[A-ZÀ-ÖØ-Þ]")  # majuscule, après un guillemet ou un tiret d'ouverture
+_LAST_WORD = re.compile(r"[^\s\"“«‘(]+$")
+
+def sentence_breaks(tts, abbreviations):
+    """
+    Coupures (début, fin) après les fins de phrase : le mot suivant commence par une
+    majuscule et le mot qui finit par le point n'est pas une abréviation du pack ("Mr.", "M.").
+    """
+    for match in _SENTENCE_END.finditer(tts):
+        if not _NEXT_CAPITAL.match(tts, match.end()):
+            continue  # "e.g. the", "vs. them" : la phrase continue
+        word = _LAST_WORD.search(tts, 0, match.start())
+        if word and word.group().casefold() in abbreviations:
+            continue
+        yield match.start() + len(match.group("quote") or ""), match.end()
+
+def split_tts_chunks(tts, lang_config):
+    """
+    Découpe le texte TTS en morceaux prononçables l'un après l'autre : après chaque
+    fin de phrase (le repère de clean_body), à chaque saut de ligne et autour des
+    références entre parenthèses. Un reste sans lettre ni chiffre (ponctuation seule)
+    rejoint le morceau précédent.
+    """
+    abbreviations = {word.casefold() for word in lang_config.get("abbreviations", ())}
+    breaks = sorted([match.span() for match in _CHUNK_BREAK.finditer(tts)] + list(sentence_breaks(tts, abbreviations)))
+    parts, position = [], 0
+    for start, end in breaks:
+        if start >= position:
+            parts.append(tts[position:start])
+        position = max(position, end)
+    parts.append(tts[position:])
+
+    chunks = []
+    for part in parts:
+        part = part.strip()
+        if not part:
+            continue
+        if chunks and not any(c.isalnum() for c in part):
+            chunks[-1] += part
+        else:
+            chunks.append(part)
+    return chunks
+
+def render_entry(entry, lang_config):
+    """
+    Précalcule les charges utiles publiées à minuit : Lovelace, références, TTS
+    complet et TTS découpé en phrases, pour chaque valeur de strip_parentheses.
+    Le verset et le commentaire ne sont analysés qu'une fois. Le résultat est stocké
+    à côté du texte brut avec l'empreinte du pack de langue qui a servi au rendu.
+    """
+    title = entry.get("title", "Daily text")
+    body_text = entry.get("body", "")
+    verse = parse_references(entry.get("verse", ""), lang_config)
+    body = parse_references(body_text, lang_config)
+    spoken_body = truncate_references(body, body_cut(body_text, lang_config))
+    tts_title = entry.get("title", "Texte du jour")
+    tts_full = {
+        "true": render_tts(tts_title, verse, spoken_body, lang_config, True),
+        "false": render_tts(tts_title, verse, spoken_body, lang_config, False),
+    }
+    return {
+        "lang_pack": getattr(lang_config, "fingerprint", None),
+        "lovelace": {
+            "title": title,
+            "verse": display_text(verse),
+            "comment": display_text(body),
+        },
+        "references": references_attribute(verse + body, lang_config),
+        "tts_full": tts_full,
+        "tts_chunks": {key: split_tts_chunks(tts, lang_config) for key, tts in tts_full.items()},
+    }
+
+def strip_key(strip_parentheses):
+    return "true" if strip_parentheses else "false"
+
+def day_texts(date, rendered, strip_parentheses):
+    """Textes rendus d'un jour : attributs des capteurs Lovelace et TTS réunis (service get_texts)."""
+    key = strip_key(strip_parentheses)
+    return {
+        "date": date.isoformat(),
+        **rendered["lovelace"],
+        "references": rendered["references"],
+        "tts_full": rendered["tts_full"][key],
+        "tts_chunks": rendered["tts_chunks"][key],
+    }
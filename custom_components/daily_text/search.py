@@ -0,0 +1,249 @@
+# search.py
+"""Index inversé des textes stockés (mode natif, en mémoire).
+
+Même index que apps/daily_text/search.py, sans persistance : le coordinateur
+l'alimente depuis ses entrées au démarrage puis à chaque jour modifié.
+"""
+from collections import Counter
+import bisect
+import math
+import re
+import threading
+import unicodedata
+
+from .render import RefGroup, parse_references
+
+MAX_RESULTS = 10
+REF_WEIGHT = 5.0       # une référence biblique trouvée compte plus qu'un mot
+MIN_PREFIX = 4         # "pardon" trouve aussi "pardonner"
+MAX_VERSE_SPAN = 200   # garde-fou pour les plages de versets
+
+_WORD = re.compile(r"\w+")
+_VERSE_NUMBER = re.compile(r"\d+")
+
+# -------------------- Normalisation --------------------
+
+def normalize(text):
+    """Minuscules sans accents : "Éphésiens" et "ephesiens" donnent le même terme."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+def tokenize(text):
+    return [t for t in _WORD.findall(normalize(text)) if len(t) > 1 or t.isdigit()]
+
+def book_term(long_name):
+    return "@" + "_".join(tokenize(long_name))
+
+# -------------------- Références canoniques --------------------
+
+def reference_terms(text, lang_config):
+    """
+    Termes canoniques des références reconnues par parse_references :
+    @livre, @livre:chapitre et @livre:chapitre:verset.
+    """
+    terms = set()
+    if not lang_config:
+        return terms
+    for node in parse_references(text, lang_config):
+        if not isinstance(node, RefGroup):
+            continue
+        for ref in node.refs:
+            if ref.book is None:
+                continue
+            name = book_term(lang_config["book_names"][ref.book])
+            terms.add(name)
+            chapter = (ref.chapter or "").strip()
+            if not chapter.isdigit():
+                continue  # versets seuls : chapitre inconnu
+            terms.add(f"{name}:{chapter}")
+            for start, end in ref.verses:
+                first = verse_number(start)
+                if first is None:
+                    continue
+                last = verse_number(end) if end is not None else first
+                if last is None or last < first:
+                    last = first
+                for verse in range(first, min(last, first + MAX_VERSE_SPAN) + 1):
+                    terms.add(f"{name}:{chapter}:{verse}")
+    return terms
+
+def verse_number(value):
+    """Numéro d'un verset tel qu'écrit ("16", "16a"), None s'il n'y en a pas."""
+    digits = _VERSE_NUMBER.match(value.strip())
+    return int(digits.group()) if digits else None
+
+def entry_terms(entry, lang_config):
+    """Termes d'une entrée : mots du titre, du verset, du commentaire, et références canoniques."""
+    text = " ".join((entry.get("title", ""), entry.get("verse", ""), entry.get("body", "")))
+    terms = Counter(tokenize(text.replace("(*", " ").replace("*)", " ")))
+    for term in reference_terms(entry.get("verse", "") + " " + entry.get("body", ""), lang_config):
+        terms[term] += 1
+    return terms
+
+# -------------------- Index inversé --------------------
+
+class SearchIndex:
+    """
+    Index inversé d'une langue : terme -> {date iso: occurrences}.
+    Mis à jour jour par jour (les anciens termes d'une date sont retirés avant
+    d'ajouter les nouveaux), jamais reconstruit.
+    """
+
+    def __init__(self, lang_config=None):
+        self.lang_config = lang_config
+        self._lock = threading.RLock()
+        self._postings = {}
+        self._docs = {}       # date iso -> {"hash", "title", "terms"}
+        self._vocabulary = None  # liste triée, recalculée après modification
+        self._books = None
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, day):
+        return day in self._docs
+
+    # ---- Mise à jour ----
+
+    def update(self, entries):
+        """Indexe {date iso: entrée}; les dates au hash inchangé sont ignorées. Retourne le nombre de dates indexées."""
+        updated = 0
+        with self._lock:
+            for day, entry in entries.items():
+                doc = self._docs.get(day)
+                if doc and entry.get("hash") and doc.get("hash") == entry.get("hash"):
+                    continue
+                self._remove(day)
+                terms = dict(entry_terms(entry, self.lang_config))
+                self._docs[day] = {"hash": entry.get("hash"), "title": entry.get("title", ""), "terms": terms}
+                for term, count in terms.items():
+                    self._postings.setdefault(term, {})[day] = count
+                updated += 1
+            if updated:
+                self._vocabulary = None
+        return updated
+
+    def remove(self, days):
+        with self._lock:
+            removed = sum(self._remove(day) for day in days)
+            if removed:
+                self._vocabulary = None
+        return removed
+
+    def _remove(self, day):
+        doc = self._docs.pop(day, None)
+        if doc is None:
+            return 0
+        for term in doc["terms"]:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(day, None)
+                if not postings:
+                    del self._postings[term]
+        return 1
+
+    # ---- Recherche ----
+
+    def _book_aliases(self):
+        """
+        (alias normalisés -> terme du livre, noms complets). Une abréviation ("is", "ex")
+        n'est une référence que suivie d'un chapitre; un nom complet l'est aussi seul.
+        """
+        if self._books is None:
+            aliases, full_names = {}, set()
+            for abbreviation, long_name in (self.lang_config or {}).get("book_names", {}).items():
+                if abbreviation.startswith("_"):
+                    continue
+                term = book_term(long_name)
+                aliases[" ".join(tokenize(abbreviation))] = term
+                full = " ".join(tokenize(long_name))
+                aliases[full] = term
+                if len(full) >= MIN_PREFIX:
+                    full_names.add(full)
+            self._books = aliases, full_names
+        return self._books
+
+    def query_terms(self, query):
+        """Découpe la requête en références canoniques (@livre:chapitre[:verset]) et en mots."""
+        tokens = tokenize(query)
+        aliases, full_names = self._book_aliases()
+        refs, words = [], []
+        i = 0
+        while i < len(tokens):
+            match = None
+            # Jusqu'à 3 mots pour un nom de livre ("1 samuel", "song of solomon")
+            for size in (3, 2, 1):
+                candidate = " ".join(tokens[i:i + size])
+                if len(tokens[i:i + size]) < size or candidate.isdigit():
+                    continue
+                followed_by_number = i + size < len(tokens) and tokens[i + size].isdigit()
+                term = aliases.get(candidate) if followed_by_number or candidate in full_names else None
+                if term is None and len(candidate) >= MIN_PREFIX and followed_by_number:
+                    # "psalm 23" -> "psalms 23" (un préfixe seul ne suffit pas : "number" n'est pas "Numbers")
+                    term = next((t for alias, t in aliases.items() if alias.startswith(candidate)), None)
+                if term:
+                    match = (term, size)
+                    break
+            if match is None:
+                words.append(tokens[i])
+                i += 1
+                continue
+
+            term, size = match
+            i += size
+            numbers = []
+            while i < len(tokens) and tokens[i].isdigit() and len(numbers) < 2:
+                numbers.append(tokens[i])
+                i += 1
+            refs.append(":".join([term, *numbers]))
+        return refs, words
+
+    def _expand(self, word):
+        """Le mot lui-même et, s'il est assez long, les termes qui le prolongent."""
+        if len(word) < MIN_PREFIX:
+            return [word] if word in self._postings else []
+        if self._vocabulary is None:
+            self._vocabulary = sorted(t for t in self._postings if not t.startswith("@"))
+        expanded = []
+        for term in self._vocabulary[bisect.bisect_left(self._vocabulary, word):]:
+            if not term.startswith(word):
+                break
+            expanded.append(term)
+        return expanded
+
+    def search(self, query, limit=MAX_RESULTS):
+        """
+        Retourne [{date, title, score, references}] triés par pertinence puis par date.
+        Si la requête cite une référence, seules les dates qui la contiennent sont retenues;
+        les mots servent alors à départager. Sinon, score tf-idf sur les mots.
+        """
+        with self._lock:
+            refs, words = self.query_terms(query)
+            total = len(self._docs) or 1
+            scores = Counter()
+
+            candidates = None
+            for ref in refs:
+                days = set(self._postings.get(ref, ()))
+                candidates = days if candidates is None else candidates & days
+                for day in days:
+                    scores[day] += REF_WEIGHT
+            if refs and not candidates:
+                return []
+
+            for word in words:
+                for term in self._expand(word):
+                    postings = self._postings[term]
+                    idf = math.log(1 + total / len(postings))
+                    for day, count in postings.items():
+                        if candidates is None or day in candidates:
+                            scores[day] += idf * (1 + math.log(count))
+
+            # À score égal, les dates les plus récentes d'abord
+            ranked = sorted(sorted(scores.items(), reverse=True), key=lambda item: -item[1])[:limit]
+            return [{
+                "date": day,
+                "title": self._docs[day]["title"],
+                "score": round(score, 3),
+                "references": sorted(t[1:] for t in self._docs[day]["terms"] if t.startswith("@") and t.count(":") == 1),
+            } for day, score in ranked]
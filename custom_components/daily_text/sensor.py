@@ -1,6 +1,9 @@
 # sensor.py
 from homeassistant.components.sensor import SensorEntity
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from .const import DOMAIN, CONF_LANGUAGE, CONF_MONTHS, CONF_STRIP_PARENTHESES
+from .render import strip_key
+from . import get_languages
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
 
@@ -8,11 +11,30 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
     sensor = DailyTextConfigSensor(config_entry)
     async_add_entities([sensor], update_before_add=True)
 
+    # Mode natif : l'intégration possède aussi les capteurs Lovelace et TTS,
+    # un par langue (suffixés) et un sans suffixe pour la langue principale
+    coordinator = hass.data[DOMAIN][config_entry.entry_id].get("coordinator")
+    if coordinator is not None:
+        entities = []
+        for lang_code in coordinator.languages:
+            entities.append(DailyTextLovelaceSensor(coordinator, config_entry, lang_code, suffixed=True))
+            entities.append(DailyTextTTSSensor(coordinator, config_entry, lang_code, suffixed=True))
+        entities.append(DailyTextLovelaceSensor(coordinator, config_entry, coordinator.language))
+        entities.append(DailyTextTTSSensor(coordinator, config_entry, coordinator.language))
+        async_add_entities(entities)
+
     # Enregistre une fonction de rappel qui sera appelée lors d'une mise à jour
     config_entry.async_on_unload(
         config_entry.add_update_listener(sensor.async_config_entry_updated)
     )
 
+def device_info(config_entry):
+    return {
+        "identifiers": {(DOMAIN, config_entry.entry_id)},
+        "name": "Daily Text",
+        "entry_type": "service",
+    }
+
 class DailyTextConfigSensor(SensorEntity):
     """Sensor to expose Daily Text configuration options."""
 
@@ -25,16 +47,12 @@ class DailyTextConfigSensor(SensorEntity):
     def __init__(self, config_entry):
         self._config_entry = config_entry
 
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, config_entry.entry_id)},
-            "name": "Daily Text",
-            "entry_type": "service",
-        }
+        self._attr_device_info = device_info(config_entry)
 
     @property
     def native_value(self):
         """Return the primary state of the sensor."""
-        return f"{self.language} / {self.months} / {self.strip_parentheses}"
+        return f"{','.join(self.languages)} / {self.months} / {self.strip_parentheses}"
 
     @property
     def extra_state_attributes(self):
@@ -43,6 +61,7 @@ class DailyTextConfigSensor(SensorEntity):
             "strip_parentheses": self.strip_parentheses,
             "months": self.months,
             "language": self.language,
+            "languages": self.languages,
         }
 
     @property
@@ -52,6 +71,10 @@ class DailyTextConfigSensor(SensorEntity):
             or self._config_entry.data.get(CONF_LANGUAGE)
         )
 
+    @property
+    def languages(self):
+        return get_languages(self._config_entry)
+
     @property
     def months(self):
         return (
@@ -70,3 +93,73 @@ class DailyTextConfigSensor(SensorEntity):
     async def async_config_entry_updated(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
         """Appelé quand la config est modifiée pour mettre à jour l'entité."""
         self.async_write_ha_state()
+
+
+class DailyTextEntrySensor(CoordinatorEntity, SensorEntity):
+    """Base des capteurs du mode natif : lit l'entrée du jour dans le coordinateur."""
+
+    _attr_has_entity_name = True
+    _kind = None
+
+    def __init__(self, coordinator, config_entry, lang_code, suffixed=False):
+        super().__init__(coordinator)
+        self.lang_code = lang_code
+        self._attr_device_info = device_info(config_entry)
+        if suffixed:
+            self._attr_name = f"{self._kind} {lang_code}"
+            self._attr_unique_id = f"{DOMAIN}_{self._kind.lower()}_{lang_code}"
+        else:
+            self._attr_name = self._kind
+            self._attr_unique_id = f"{DOMAIN}_{self._kind.lower()}"
+
+    @property
+    def today(self):
+        return self.coordinator.today()
+
+    @property
+    def entry(self):
+        return self.coordinator.entry_for(self.today, self.lang_code)
+
+    @property
+    def native_value(self):
+        entry = self.entry
+        if entry is None:
+            return "No text available"
+        return entry.get("title", "Daily text")
+
+class DailyTextLovelaceSensor(DailyTextEntrySensor):
+    """Texte du jour pour l'affichage Lovelace (équivalent de ExposeDailyTextLovelace)."""
+
+    _attr_icon = "mdi:book-open-variant"
+    _kind = "Lovelace"
+
+    @property
+    def extra_state_attributes(self):
+        entry = self.entry
+        if entry is None:
+            return {"date": self.today.isoformat(), "language": self.lang_code}
+        return {
+            **entry["rendered"]["lovelace"],
+            "references": entry["rendered"]["references"],
+            "date": self.today.isoformat(),
+            "language": self.lang_code,
+        }
+
+class DailyTextTTSSensor(DailyTextEntrySensor):
+    """Texte du jour pour la lecture vocale (équivalent de ExposeDailyTextTTS)."""
+
+    _attr_icon = "mdi:account-voice"
+    _kind = "TTS"
+
+    @property
+    def extra_state_attributes(self):
+        entry = self.entry
+        if entry is None:
+            return {"date": self.today.isoformat(), "language": self.lang_code}
+        key = strip_key(self.coordinator.strip_parentheses)
+        return {
+            "tts_full": entry["rendered"]["tts_full"][key],
+            "tts_chunks": entry["rendered"]["tts_chunks"][key],
+            "date": self.today.isoformat(),
+            "language": self.lang_code,
+        }
@@ -0,0 +1,104 @@
+"""Check that the integration's copies of the AppDaemon engine have not drifted.
+
+custom_components/daily_text ships its own copy of the rendering, parsing and
+search code and of the language packs, because HACS distributes the
+integration and the apps separately. Every top-level function, class method
+and constant that exists on both sides must have the same code (docstrings
+and comments aside), unless it is listed in ADAPTED with the reason. The
+language packs must be identical byte for byte. Exits with status 1 on drift.
+
+    python scripts/check_copies.py
+"""
+import ast
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+APPS = ROOT / "apps" / "daily_text"
+NATIVE = ROOT / "custom_components" / "daily_text"
+
+# copy in the integration -> app modules it is taken from
+COPIES = {
+    "render.py": ["lang_pack.py", "base.py"],
+    "parser.py": ["extract.py", "store.py"],
+    "search.py": ["search.py"],
+}
+
+# Definitions rewritten on purpose for the integration
+ADAPTED = {
+    "render.py:load_language_pack": "no process-wide cache, called in the executor",
+    "render.py:match_book": "packs are always LanguagePack instances",
+    "search.py:SearchIndex.__init__": "in-memory index, no file to load",
+}
+
+
+def definitions(path):
+    """{name: normalized code} for top-level functions, constants and class methods."""
+    found = {}
+    for node in ast.parse(path.read_text(encoding="utf-8")).body:
+        if isinstance(node, ast.ClassDef):
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    found[f"{node.name}.{item.name}"] = normalized(item)
+            node = ast.parse(ast.unparse(node)).body[0]  # the class without its methods
+            node.body = [n for n in node.body if not isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))] or [ast.Pass()]
+            found[node.name] = normalized(node)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            found[node.name] = normalized(node)
+        elif isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            found[node.targets[0].id] = normalized(node)
+    return found
+
+
+def normalized(node):
+    node = ast.parse(ast.unparse(node)).body[0]  # fresh copy, positions dropped
+    for item in ast.walk(node):
+        body = getattr(item, "body", None)
+        if (isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) and body
+                and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant)
+                and isinstance(body[0].value.value, str)):
+            item.body = body[1:] or [ast.Pass()]
+    return ast.dump(node)
+
+
+def check_modules():
+    problems = []
+    for copy, sources in COPIES.items():
+        original = {}
+        for source in sources:
+            original.update(definitions(APPS / source))
+        shared = 0
+        for name, code in definitions(NATIVE / copy).items():
+            if name not in original:
+                continue  # only in the integration (async coordinator helpers...)
+            shared += 1
+            if code != original[name] and f"{copy}:{name}" not in ADAPTED:
+                problems.append(f"{copy}: {name} differs from apps/daily_text/{' or '.join(sources)}")
+        if not shared:
+            problems.append(f"{copy}: nothing in common with apps/daily_text/{' or '.join(sources)}")
+    return problems
+
+
+def check_packs():
+    problems = []
+    app_packs = {p.name: p for p in (APPS / "lang").glob("*.json")}
+    native_packs = {p.name: p for p in (NATIVE / "lang").glob("*.json")}
+    for name in sorted(app_packs.keys() | native_packs.keys()):
+        if name not in native_packs or name not in app_packs:
+            problems.append(f"lang/{name}: only in {'apps' if name in app_packs else 'custom_components'}")
+        elif app_packs[name].read_bytes() != native_packs[name].read_bytes():
+            problems.append(f"lang/{name}: differs between apps and custom_components")
+    return problems
+
+
+def main():
+    problems = check_modules() + check_packs()
+    for problem in problems:
+        print(f"DRIFT: {problem}")
+    if problems:
+        sys.exit(1)
+    print("OK: integration copies match apps/daily_text")
+
+
+if __name__ == "__main__":
+    main()